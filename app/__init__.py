@@ -1,12 +1,13 @@
 from flask import Flask, jsonify, render_template, request
 from flask_jwt_extended import JWTManager
+from flask_jwt_extended.config import config as jwt_config
 from flask_cors import CORS
 from flask_migrate import Migrate
 from datetime import timedelta
 import os
 
 from config import Config
-from app.extensions import db, limiter, cache
+from app.extensions import db, limiter, cache, tiered_cache
 from app.error_handlers import register_error_handlers
 from app.logging_config import setup_logging
 
@@ -32,10 +33,6 @@ def create_app():
     # Configuración de Storage para Rate Limiting (Semana 2, Día 3)
     app.config['RATELIMIT_STORAGE_URI'] = os.environ.get('RATELIMIT_STORAGE_URI', 'memory://')
     
-    # Configuración de Caché (Semana 3, Día 4)
-    app.config['CACHE_TYPE'] = 'SimpleCache'
-    app.config['CACHE_DEFAULT_TIMEOUT'] = 300
-
     database_url = app.config.get('SQLALCHEMY_DATABASE_URI', '')
     if database_url.startswith('postgres://'):
         database_url = database_url.replace('postgres://', 'postgresql+pg8000://', 1)
@@ -53,18 +50,48 @@ def create_app():
     cors.init_app(app, supports_credentials=True)
     limiter.init_app(app)
     cache.init_app(app)
+    # Caché en dos niveles sobre el backend compartido de Flask-Caching (CACHE_TYPE en config.py)
+    tiered_cache.init_app(app, app.extensions['cache'][cache])
+
+    # --- AISLAMIENTO POR RLS (opcional, solo PostgreSQL) ---
+    from app.tenant_rls import init_tenant_rls
+    init_tenant_rls(app, db)
 
     # --- REGISTRAR MANEJADORES DE ERROR (Semana 3, Día 3) ---
     register_error_handlers(app)
 
+    # --- DESGLOSE DE LATENCIA POR FASE (Server-Timing); primero para que 'total' cubra todo el request ---
+    from app.timing import init_request_timing, start_phase, stop_phase
+    init_request_timing(app)
+
+    # --- MÉTRICAS PROMETHEUS (/metrics) ---
+    from app.metrics import init_metrics
+    init_metrics(app)
+
+    # --- CLIENTE HTTP SALIENTE (pool keep-alive, reintentos y circuit breaker por proveedor) ---
+    from app.http_client import init_http_client
+    init_http_client(app)
+
+    # --- CONTADOR DE QUERIES POR REQUEST (antes del middleware para contar la resolución del tenant) ---
+    from app.query_counter import init_query_counter
+    init_query_counter(app)
+
     # --- MIDDLEWARE DE TENANT (Semana 1, Día 1) ---
     from app.middleware import init_tenant_middleware
     init_tenant_middleware(app)
 
     from app import models
+    # Indicadores materializados: importar los módulos registra sus hooks sobre la sesión
+    from app.services import platform_stats, tenant_counters  # noqa: F401
     
-    # --- NUEVA LÓGICA: INYECCIÓN GLOBAL DE USUARIO ---
-    from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity
+    # --- IDENTIDAD CON ALCANCE DE REQUEST ---
+    # Todas las búsquedas del usuario actual pasan por app.auth.load_user (una carga por request).
+    from app.auth import load_user, reset_identity, get_current_user
+    app.before_request(reset_identity)
+
+    # --- PERFILADOR BAJO DEMANDA (MASTER + 'X-Profile: 1'); después de reset_identity para reutilizar el memo ---
+    from app.profiling import init_profiler
+    init_profiler(app)
 
     @app.context_processor
     def inject_user():
@@ -72,36 +99,31 @@ def create_app():
         Inyecta la variable 'user' en todos los templates automáticamente.
         Verifica si existe un token JWT válido (cookie) sin romper la página si no lo hay.
         """
-        try:
-            # Verifica el token de forma opcional (no lanza error si falta)
-            verify_jwt_in_request(optional=True)
- 
-            # Si hay token, buscamos el usuario
-            user_id = get_jwt_identity()
-            if user_id:
-                current_user = models.User.query.get(int(user_id))
-                return {'user': current_user}
-        except Exception as e:
-            app.logger.warning(f"Context processor inject_user failed: {e}")
-            # Si el token es inválido o expiró, simplemente no inyectamos usuario
-            pass
- 
-        return {'user': None}
+        # Reutiliza el usuario ya resuelto por los decoradores (sin nueva consulta)
+        return {'user': get_current_user()}
 
     @jwt.user_identity_loader
     def user_identity_lookup(user):
         return str(user)
 
+    @jwt.decode_key_loader
+    def decode_key_callback(_jwt_header, _jwt_data):
+        # Inicio de la fase 'jwt': el token ya se leyó de la cookie y está por verificarse
+        start_phase('jwt')
+        return jwt_config.decode_key
+
     @jwt.user_lookup_loader
     def user_lookup_callback(_jwt_header, jwt_data):
+        # Firma, expiración y CSRF verificados: la carga del usuario cuenta como 'db', no como 'jwt'
+        stop_phase('jwt')
         identity = jwt_data["sub"]  # "sub" es el ID del usuario
-        return models.User.query.get(int(identity))
+        return load_user(identity)
 
     with app.app_context():
         # --- REGISTRO EXPLÍCITO Y ROBUSTO DE BLUEPRINTS ---
         # Se elimina la capa de abstracción en routes/__init__.py para
         # garantizar que cada blueprint se registre de forma inequívoca.
-        from .routes import public_bp, user_bp, auth_bp, admin_bp, master_bp, api_bp, document_bp, payment_bp, petty_cash_bp, google_drive_bp
+        from .routes import public_bp, user_bp, auth_bp, admin_bp, master_bp, api_bp, document_bp, payment_bp, petty_cash_bp, google_drive_bp, export_bp
 
         app.register_blueprint(public_bp)
         app.register_blueprint(user_bp)
@@ -113,35 +135,26 @@ def create_app():
         app.register_blueprint(payment_bp)
         app.register_blueprint(petty_cash_bp)
         app.register_blueprint(google_drive_bp)
+        app.register_blueprint(export_bp)
 
-    @cache.memoize(timeout=300) # 5 minutos cache
-    def get_tenant_config(tenant):
-        if not tenant:
-            return None
-        # Import locally to avoid circular import if models is imported at top
-        from app.models import CondominiumConfig 
-        config = CondominiumConfig.query.get(tenant)
-        if not config:
-            return None
-        return config
+    # Personalización del condominio, cacheada en su espacio de nombres (app.services.branding_service)
+    from app.services.branding_service import branding_service
+    app.get_tenant_config = branding_service.get
 
-    app.get_tenant_config = get_tenant_config
+    # --- COMANDOS CLI (flask exports gc, ...) ---
+    from app.cli import init_cli
+    init_cli(app)
 
     @app.teardown_appcontext
     def shutdown_session(exception=None):
         db.session.remove()
 
-    # --- ESTA ES LA CORRECCIÓN DE SEGURIDAD ---
-    @app.after_request
-    def add_security_headers(response):
-        """
-        Añade cabeceras a cada respuesta para prevenir el caché en el navegador.
-        Esto soluciona el problema de poder usar el botón "atrás" después de cerrar sesión.
-        """
-        response.headers['Cache-Control'] = 'no-store, no-cache, must-revalidate, max-age=0'
-        response.headers['Pragma'] = 'no-cache'
-        response.headers['Expires'] = '-1'
-        return response
+    # --- POLÍTICA DE CACHÉ HTTP ---
+    # 'no-store' por defecto: evita volver con el botón "atrás" a páginas autenticadas después
+    # de cerrar sesión. Estáticos versionados, CSS de marca, PDFs y páginas públicas de firma
+    # se cachean o revalidan según app.cache_policy.CACHE_POLICIES.
+    from app.cache_policy import init_cache_policy
+    init_cache_policy(app)
     
     @app.errorhandler(429)
     def ratelimit_handler(e):
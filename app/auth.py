@@ -7,9 +7,48 @@ from werkzeug.security import check_password_hash, generate_password_hash
 from app.models import User, Condominium
 from app.forms import LoginForm, RegistrationForm
 from app.extensions import limiter, db
+from app.metrics import LOGINS
 
 auth_bp = Blueprint('auth', __name__)
 
+def load_user(user_id):
+    """
+    Resolver de identidad con alcance de request.
+    Carga el User como máximo una vez por request y lo memoiza en `g`; lo comparten
+    el user_lookup_loader de JWT, los decoradores, get_current_user() y el
+    context processor inject_user.
+    """
+    if not user_id:
+        return None
+    user_id = int(user_id)
+
+    memo = g.get('_identity')
+    if memo is not None and memo[0] == user_id:
+        g.identity_memo_hits = g.get('identity_memo_hits', 0) + 1
+        return memo[1]
+
+    user = User.query.get(user_id)
+    g._identity = (user_id, user)
+    g.identity_db_lookups = g.get('identity_db_lookups', 0) + 1
+
+    if current_app.debug:
+        # Más de una carga por request significa que alguien se saltó el memo (o cambió la identidad).
+        assert g.identity_db_lookups == 1, (
+            f"Identidad cargada {g.identity_db_lookups} veces en el mismo request ({request.endpoint})"
+        )
+    return user
+
+def reset_identity():
+    """Limpia el memo de identidad al inicio de cada request."""
+    g.pop('_identity', None)
+    g.identity_db_lookups = 0
+    g.identity_memo_hits = 0
+
+def get_memoized_user():
+    """Retorna el usuario ya resuelto en este request sin disparar ninguna carga."""
+    memo = g.get('_identity')
+    return memo[1] if memo else None
+
 def get_current_user():
     """
     Devuelve la instancia User asociada con el JWT actual si existe,
@@ -21,9 +60,8 @@ def get_current_user():
         identity = get_jwt_identity()
         if not identity:
             return None
-        # La identidad se guarda como str(user.id), por eso se convierte a int
-        user = User.query.get(int(identity))
-        return user
+        # La identidad se guarda como str(user.id); load_user la convierte y la memoiza
+        return load_user(identity)
     except Exception as e:
         current_app.logger.debug(f"get_current_user error: {e}")
         return None
@@ -46,6 +84,7 @@ def login():
  
             if user and check_password_hash(user.password_hash, form.password.data):
                 if user.status != 'active':
+                    LOGINS.labels(channel='web', result='inactive').inc()
                     flash('Tu cuenta se encuentra pendiente de aprobación o ha sido desactivada.', 'warning')
                     current_app.logger.warning(f"Login denied for inactive/pending user: {email_lower}")
                     return render_template('auth/login.html', form=form)
@@ -70,9 +109,11 @@ def login():
                     
                     log_context = f"en subdominio {g.condominium.subdomain}" if g.condominium else "en dominio global"
                     current_app.logger.info(f"Successful login for user_id={user.id} in context: {log_context}.")
+                    LOGINS.labels(channel='web', result='success').inc()
                     return response
             # Mensaje de error genérico fuera del bloque `if user` para evitar enumeración de usuarios
             flash('Usuario o contraseña incorrectos.', 'danger')
+            LOGINS.labels(channel='web', result='failure').inc()
             current_app.logger.warning(f"Failed login attempt for email: {email_lower}.")
  
         except Exception as e:
@@ -0,0 +1,112 @@
+"""
+Política de caché HTTP por endpoint o blueprint.
+
+Por defecto toda respuesta sale con 'no-store' (páginas autenticadas: el botón "atrás"
+no debe mostrar contenido después de cerrar sesión). La tabla CACHE_POLICIES declara
+las excepciones; se busca primero el endpoint exacto y luego el blueprint.
+
+Los archivos estáticos se sirven con una URL versionada (?v=<hash del contenido>,
+agregada por url_for) y por eso pueden marcarse immutable. Las políticas con
+validate=True responden 304 a un GET condicional (ETag / Last-Modified).
+"""
+import hashlib
+import os
+from dataclasses import dataclass
+
+from flask import request
+from werkzeug.security import safe_join
+
+STATIC_VERSION_PARAM = 'v'
+ONE_YEAR = 31536000
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    cache_control: str
+    validate: bool = False  # Agregar ETag y resolver If-None-Match / If-Modified-Since con 304
+
+
+NO_STORE = CachePolicy('no-store, no-cache, must-revalidate, max-age=0')
+IMMUTABLE = CachePolicy(f'public, max-age={ONE_YEAR}, immutable', validate=True)
+REVALIDATE_PUBLIC = CachePolicy('public, no-cache', validate=True)
+REVALIDATE_PRIVATE = CachePolicy('private, no-cache', validate=True)
+
+# Clave: endpoint ('document.download_unsigned') o blueprint ('document').
+CACHE_POLICIES = {
+    'static': IMMUTABLE,
+    'public.branding_css': IMMUTABLE,
+    # PDF del documento: solo lo descargan usuarios del condominio; se revalida con ETag/Last-Modified
+    'document.download_unsigned': REVALIDATE_PRIVATE,
+    # Páginas públicas de recolección de firmas (sin sesión; los mensajes flash cambian el ETag)
+    'document.public_signature': REVALIDATE_PRIVATE,
+    'document.public_signature_thanks': REVALIDATE_PRIVATE,
+}
+
+
+def policy_for(endpoint):
+    """Política de caché del endpoint: entrada exacta, luego la del blueprint, luego NO_STORE."""
+    if not endpoint:
+        return NO_STORE
+    if endpoint == 'static' and not request.args.get(STATIC_VERSION_PARAM):
+        return REVALIDATE_PUBLIC  # Sin versión en la URL el archivo puede cambiar bajo la misma URL
+    if endpoint in CACHE_POLICIES:
+        return CACHE_POLICIES[endpoint]
+    return CACHE_POLICIES.get(endpoint.rpartition('.')[0], NO_STORE)
+
+
+def apply_cache_policy(response):
+    policy = policy_for(request.endpoint)
+    # Redirecciones y errores nunca se cachean
+    if response.status_code not in (200, 304):
+        policy = NO_STORE
+
+    if policy.validate and request.method in ('GET', 'HEAD') and response.status_code == 200:
+        # send_file ya agrega ETag/Last-Modified y resuelve el 304; el resto se valida por hash del cuerpo
+        if not response.direct_passthrough and not response.is_streamed:
+            if 'ETag' not in response.headers:
+                response.add_etag()
+            response.make_conditional(request)
+
+    response.headers['Cache-Control'] = policy.cache_control
+    if policy is NO_STORE:
+        response.headers['Pragma'] = 'no-cache'
+        response.headers['Expires'] = '-1'
+    return response
+
+
+class StaticVersions:
+    """Hash corto del contenido de cada archivo estático, recalculado cuando cambia su mtime."""
+
+    def __init__(self, static_folder):
+        self.static_folder = static_folder
+        self._hashes = {}
+
+    def get(self, filename):
+        path = safe_join(self.static_folder, filename)
+        if path is None:
+            return None
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+        cached = self._hashes.get(filename)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        with open(path, 'rb') as f:
+            digest = hashlib.sha256(f.read()).hexdigest()[:12]
+        self._hashes[filename] = (mtime, digest)
+        return digest
+
+
+def init_cache_policy(app):
+    versions = StaticVersions(app.static_folder)
+
+    @app.url_defaults
+    def version_static_urls(endpoint, values):
+        """url_for('static', filename=...) agrega ?v=<hash>: la URL cambia cuando cambia el archivo."""
+        if endpoint == 'static' and 'filename' in values and STATIC_VERSION_PARAM not in values:
+            version = versions.get(values['filename'])
+            if version:
+                values[STATIC_VERSION_PARAM] = version
+
+    app.after_request(apply_cache_policy)
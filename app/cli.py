@@ -0,0 +1,66 @@
+"""
+Comandos de mantenimiento (flask <grupo> <comando>).
+"""
+import click
+from flask.cli import AppGroup
+
+exports_cli = AppGroup('exports', help="Exportaciones en segundo plano.")
+stats_cli = AppGroup('stats', help="Indicadores materializados.")
+payments_cli = AppGroup('payments', help="Pagos en línea.")
+petty_cash_cli = AppGroup('petty-cash', help="Caja chica.")
+
+
+@exports_cli.command('gc')
+def exports_gc():
+    """Borra los archivos vencidos y marca como fallidos los jobs interrumpidos."""
+    from app.services.export_service import ExportService
+    removed, interrupted = ExportService.collect_garbage()
+    click.echo(f"Archivos borrados: {removed}. Jobs interrumpidos: {interrupted}.")
+
+
+@stats_cli.command('rebuild')
+def stats_rebuild():
+    """Recalcula platform_stats desde cero (reparación tras cargas con SQL directo)."""
+    from app.services.platform_stats import platform_stats
+    for key, value in platform_stats.rebuild().items():
+        click.echo(f"{key}: {value}")
+
+
+@payments_cli.command('reconcile')
+@click.option('--older-than', type=int, help="Minutos desde la creación del pago (por defecto RECONCILE_STALE_MINUTES).")
+@click.option('--workers', type=int, help="Consultas simultáneas a PayPhone.")
+@click.option('--rate', type=float, help="Consultas por segundo por condominio (0 = sin límite).")
+@click.option('--batch-size', type=int, help="Pagos por commit.")
+@click.option('--limit', type=int, help="Máximo de pagos a conciliar en esta corrida.")
+def payments_reconcile(older_than, workers, rate, batch_size, limit):
+    """Confirma con PayPhone los pagos que quedaron PENDING (el usuario no volvió al callback)."""
+    from datetime import timedelta
+    from app.services.reconciliation_service import ReconciliationService
+
+    def progress(report):
+        click.echo(f"{report.processed}/{report.total} pagos ({report.throughput:.1f}/s)")
+
+    report = ReconciliationService.reconcile(
+        older_than=timedelta(minutes=older_than) if older_than is not None else None,
+        workers=workers, rate=rate, batch_size=batch_size, limit=limit, progress=progress,
+    )
+    updated = ", ".join(f"{status}: {count}" for status, count in sorted(report.updated.items())) or "ninguno"
+    click.echo(f"Actualizados: {updated}. Sin cambios: {report.unchanged}. Omitidos: {report.skipped}. "
+               f"Errores: {report.errors}.")
+    click.echo(f"{report.processed} pagos en {report.elapsed:.2f}s ({report.throughput:.1f} pagos/s).")
+
+
+@petty_cash_cli.command('close')
+def petty_cash_close():
+    """Cierra los meses vencidos de caja chica de todos los condominios."""
+    from app.services.petty_cash_service import PettyCashService
+    closed = {condominium_id: periods
+              for condominium_id, periods in PettyCashService.close_all_periods().items() if periods}
+    click.echo(f"Condominios: {len(closed)}. Períodos cerrados: {sum(len(p) for p in closed.values())}.")
+
+
+def init_cli(app):
+    app.cli.add_command(exports_cli)
+    app.cli.add_command(stats_cli)
+    app.cli.add_command(payments_cli)
+    app.cli.add_command(petty_cash_cli)
@@ -4,14 +4,18 @@ from flask_jwt_extended import jwt_required, get_jwt_identity, verify_jwt_in_req
 
 def login_required(f):
     """
-    Decorador simple que solo verifica que un usuario esté autenticado vía JWT.
-    Es un alias para @jwt_required() para mantener la consistencia.
+    Decorador simple que verifica que un usuario esté autenticado vía JWT.
+    La vista recibe al usuario autenticado como primer argumento (current_user).
     """
     @wraps(f)
     @jwt_required()
     def decorated_function(*args, **kwargs):
-        # La validación la hace @jwt_required, aquí solo pasamos la ejecución.
-        return f(*args, **kwargs)
+        # Importación local para romper dependencias circulares
+        from app.auth import load_user
+        current_user = load_user(get_jwt_identity())
+        if not current_user:
+            abort(401, "Sesión inválida.")
+        return f(current_user, *args, **kwargs)
     return decorated_function
 
 # El decorador admin_tenant_required ya está aquí y es correcto.
@@ -29,9 +33,8 @@ def admin_tenant_required(f):
     @jwt_required()
     def decorated_function(*args, **kwargs):
         # Importación local para romper dependencias circulares
-        from app.models import User
-        user_id = get_jwt_identity()
-        user = User.query.get(int(user_id)) if user_id else None
+        from app.auth import load_user
+        user = load_user(get_jwt_identity())
 
         condominium = getattr(g, 'condominium', None)
 
@@ -40,7 +43,9 @@ def admin_tenant_required(f):
 
         if not (user and user.role == 'ADMIN' and condominium.admin_user_id == user.id):
             abort(403, "Acceso denegado. No eres el administrador de este condominio.")
-        
+
+        # El slug de la URL ya fue resuelto por el middleware (g.condominium); las vistas no lo reciben.
+        kwargs.pop('tenant_slug', None)
         return f(*args, **kwargs)
     return decorated_function
 
@@ -55,9 +60,8 @@ def master_required(f):
     @jwt_required()
     def decorated_function(*args, **kwargs):
         # Importación local para romper dependencias circulares
-        from app.models import User
-        user_id = get_jwt_identity()
-        user = User.query.get(int(user_id)) if user_id else None
+        from app.auth import load_user
+        user = load_user(get_jwt_identity())
 
         if not (user and user.role == 'MASTER'):
             abort(403, "Acceso denegado. Se requiere rol de MASTER.")
@@ -71,31 +75,41 @@ def master_required(f):
 
 def module_required(module_name):
     """
-    Decorador factory para verificar si un módulo específico está activo
-    para el condominio actual en el contexto `g`.
+    Decorador factory para rutas de un módulo contratable (ej. 'documents').
+    Autentica como login_required (la vista recibe current_user) y verifica que el
+    módulo esté habilitado para el condominio del contexto (`g.condominium`) o, en
+    rutas sin slug, para el condominio del usuario. La verificación usa los
+    entitlements cacheados por condominio: en un acierto no consulta la base de datos.
+    MASTER tiene acceso a todos los módulos.
     """
     def wrapper(f):
         @wraps(f)
-        # Este decorador asume que otro decorador como @admin_tenant_required ya se ha ejecutado
-        # y ha validado el usuario y el condominio.
+        @jwt_required()
         def decorated_function(*args, **kwargs):
-            condominium = getattr(g, 'condominium', None)
-            if not condominium:
-                abort(403, "Se requiere un contexto de condominio para verificar el módulo.")
+            # Importaciones locales para evitar ciclos
+            from app.auth import load_user
+            from app.services.entitlement_service import entitlement_service
+            from app.services.tenant_service import tenant_resolver
+
+            current_user = load_user(get_jwt_identity())
+            if not current_user:
+                abort(401, "Sesión inválida.")
 
-            # Importación local para evitar ciclos
-            from app.models import Module
+            if current_user.role != 'MASTER':
+                condominium = getattr(g, 'condominium', None)
+                if not condominium and current_user.tenant:
+                    condominium = tenant_resolver.resolve(current_user.tenant)
+                condominium_id = condominium.id if condominium else current_user.condominium_id
+                if not condominium_id:
+                    abort(403, "Se requiere un contexto de condominio para verificar el módulo.")
 
-            # Verificar si el módulo está activo para este condominio
-            module_is_active = Module.query.filter_by(
-                condominium_id=condominium.id,
-                name=module_name,
-                is_active=True
-            ).first()
+                entitlements = entitlement_service.get(condominium_id)
+                if module_name in entitlements.maintenance:
+                    abort(503, entitlements.maintenance[module_name])
+                if not entitlements.allows(module_name):
+                    abort(403, f"El módulo '{module_name}' no está activo o no existe para este condominio.")
 
-            if not module_is_active:
-                abort(403, f"El módulo '{module_name}' no está activo o no existe para este condominio.")
-            
-            return f(*args, **kwargs)
+            kwargs.pop('tenant_slug', None)
+            return f(current_user, *args, **kwargs)
         return decorated_function
     return wrapper
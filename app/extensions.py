@@ -3,7 +3,9 @@ from app.tenant_query import TenantQuery
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 from flask_caching import Cache
+from app.tiered_cache import TieredCache
 
 db = SQLAlchemy(query_class=TenantQuery)
 limiter = Limiter(key_func=get_remote_address)
 cache = Cache()
+tiered_cache = TieredCache() # LRU local + backend compartido de 'cache' (ver app/tiered_cache.py)
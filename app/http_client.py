@@ -0,0 +1,211 @@
+"""
+Cliente HTTP saliente compartido por las integraciones (PayPhone, Nexxit, WhatsApp).
+
+- Una requests.Session por proveedor: las conexiones quedan abiertas (keep-alive) en el
+  pool del adaptador y las llamadas siguientes al mismo host no repiten TCP+TLS.
+- Reintentos con backoff exponencial y jitter solo en llamadas idempotentes (GET, HEAD,
+  OPTIONS, PUT, DELETE o las declaradas con idempotent=True) ante errores de conexión,
+  timeouts y respuestas 502/503/504.
+- Un circuit breaker por proveedor: tras HTTP_BREAKER_THRESHOLD fallos seguidos las
+  llamadas fallan de inmediato con CircuitOpenError durante HTTP_BREAKER_RESET segundos;
+  luego pasa una llamada de prueba que lo cierra o lo vuelve a abrir.
+- Latencia, fallos y reintentos por proveedor en /metrics; el tiempo de red cuenta en la
+  fase 'http' de app.timing.
+
+Sesiones y breakers son por proceso: cada worker de gunicorn tiene los suyos.
+"""
+import os
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from app.metrics import HTTP_CLIENT_CIRCUIT_OPEN, HTTP_CLIENT_ERRORS, HTTP_CLIENT_LATENCY, HTTP_CLIENT_RETRIES
+from app.timing import timed
+
+IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'})
+RETRY_STATUSES = frozenset({502, 503, 504})
+
+# Valores por defecto; init_http_client(app) los toma de la configuración (ver config.py)
+DEFAULTS = {
+    'HTTP_CONNECT_TIMEOUT': 3.05,
+    'HTTP_RETRIES': 2,
+    'HTTP_BACKOFF': 0.25,
+    'HTTP_BACKOFF_MAX': 2.0,
+    'HTTP_BREAKER_THRESHOLD': 5,
+    'HTTP_BREAKER_RESET': 30.0,
+    'HTTP_POOL_SIZE': 10,
+}
+
+_settings = dict(DEFAULTS)
+_clients = {}
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """El proveedor acumula fallos seguidos: la llamada se rechaza sin salir a la red."""
+
+
+class CircuitBreaker:
+    """closed -> (threshold fallos seguidos) -> open -> (reset_timeout) -> half_open -> closed u open."""
+
+    def __init__(self, threshold, reset_timeout):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._probe_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return 'closed'
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return 'half_open'
+        return 'open'
+
+    def allow(self):
+        with self._lock:
+            state = self.state
+            if state == 'closed':
+                return True
+            now = time.monotonic()
+            # Una sola llamada de prueba por intervalo; las demás siguen fallando rápido hasta conocer
+            # su resultado (si la prueba nunca reporta, otra pasa al cumplirse reset_timeout)
+            if state == 'half_open' and (self._probe_at is None or now - self._probe_at >= self.reset_timeout):
+                self._probe_at = now
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._probe_at = None
+
+    def record_failure(self):
+        """Registra un fallo; retorna True si el circuito queda abierto."""
+        with self._lock:
+            self.failures += 1
+            self._probe_at = None
+            if self.opened_at is not None or self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+            return self.opened_at is not None
+
+
+class HttpClient:
+    """
+    Cliente de un proveedor. 'timeout' es el timeout de lectura por defecto (s); el de
+    conexión es HTTP_CONNECT_TIMEOUT. 'retries' reemplaza HTTP_RETRIES para este proveedor.
+    """
+
+    def __init__(self, provider, timeout, retries=None):
+        self.provider = provider
+        self.timeout = timeout
+        self.retries = retries
+        self._session = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self.configure()
+
+    def configure(self):
+        """Aplica la configuración vigente y reinicia breaker y sesión."""
+        self.settings = dict(_settings)
+        self.breaker = CircuitBreaker(self.settings['HTTP_BREAKER_THRESHOLD'], self.settings['HTTP_BREAKER_RESET'])
+        HTTP_CLIENT_CIRCUIT_OPEN.labels(provider=self.provider).set(0)
+        self.close()
+
+    @property
+    def session(self):
+        with self._lock:
+            # Tras un fork (gunicorn --preload) el proceso hijo no reutiliza los sockets del padre
+            if self._session is None or self._pid != os.getpid():
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_maxsize=self.settings['HTTP_POOL_SIZE'])
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                self._session, self._pid = session, os.getpid()
+            return self._session
+
+    def close(self):
+        with self._lock:
+            if self._session is not None and self._pid == os.getpid():
+                self._session.close()
+            self._session = None
+
+    def _backoff(self, attempt):
+        # Jitter completo: evita que los reintentos de varios workers lleguen juntos
+        ceiling = min(self.settings['HTTP_BACKOFF_MAX'], self.settings['HTTP_BACKOFF'] * 2 ** attempt)
+        time.sleep(random.uniform(0, ceiling))
+
+    def _observe(self, outcome, started):
+        HTTP_CLIENT_LATENCY.labels(provider=self.provider, outcome=outcome).observe(time.perf_counter() - started)
+
+    def _failed(self, kind, started):
+        self._observe('error', started)
+        HTTP_CLIENT_ERRORS.labels(provider=self.provider, kind=kind).inc()
+        if self.breaker.record_failure():
+            HTTP_CLIENT_CIRCUIT_OPEN.labels(provider=self.provider).set(1)
+
+    def request(self, method, url, idempotent=None, timeout=None, **kwargs):
+        """
+        requests.Session.request con timeout, reintentos y breaker del proveedor.
+        Las respuestas 4xx/5xx se retornan (el llamador decide con raise_for_status());
+        los errores de red y CircuitOpenError se propagan como RequestException.
+        """
+        method = method.upper()
+        if idempotent is None:
+            idempotent = method in IDEMPOTENT_METHODS
+        retries = self.retries if self.retries is not None else self.settings['HTTP_RETRIES']
+        attempts = 1 + (retries if idempotent else 0)
+        timeout = (self.settings['HTTP_CONNECT_TIMEOUT'], timeout or self.timeout)
+
+        for attempt in range(attempts):
+            if not self.breaker.allow():
+                HTTP_CLIENT_ERRORS.labels(provider=self.provider, kind='circuit_open').inc()
+                raise CircuitOpenError(f"Proveedor '{self.provider}' no disponible (circuito abierto)")
+
+            started = time.perf_counter()
+            try:
+                with timed('http'):
+                    response = self.session.request(method, url, timeout=timeout, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                self._failed('timeout' if isinstance(e, requests.exceptions.Timeout) else 'connection', started)
+                if attempt + 1 >= attempts:
+                    raise
+            else:
+                if response.status_code < 500:
+                    self.breaker.record_success()
+                    HTTP_CLIENT_CIRCUIT_OPEN.labels(provider=self.provider).set(0)
+                    self._observe('ok', started)
+                    return response
+                self._failed('status_5xx', started)
+                if response.status_code not in RETRY_STATUSES or attempt + 1 >= attempts:
+                    return response
+                response.close()
+
+            HTTP_CLIENT_RETRIES.labels(provider=self.provider).inc()
+            self._backoff(attempt)
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+
+def http_client(provider, timeout, retries=None):
+    """Cliente compartido del proveedor (se crea en el primer uso del módulo que lo declara)."""
+    client = _clients.get(provider)
+    if client is None:
+        client = _clients[provider] = HttpClient(provider, timeout, retries=retries)
+    return client
+
+
+def init_http_client(app):
+    """Toma HTTP_* de la configuración y reinicia los clientes ya creados."""
+    _settings.update({key: app.config[key] for key in DEFAULTS if key in app.config})
+    for client in _clients.values():
+        client.configure()
@@ -1,6 +1,7 @@
 import structlog
 import logging
 import sys
+from app.query_counter import add_query_stats
 
 def setup_logging(app):
     """
@@ -16,6 +17,7 @@ def setup_logging(app):
     structlog.configure(
         processors=[
             structlog.contextvars.merge_contextvars,
+            add_query_stats, # db_queries / db_time_ms del request en curso
             structlog.processors.add_log_level,
             structlog.processors.TimeStamper(fmt="iso"),
             structlog.processors.JSONRenderer()
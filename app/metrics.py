@@ -0,0 +1,162 @@
+"""
+Métricas Prometheus de la aplicación (expuestas en /metrics).
+
+Con varios workers de gunicorn cada proceso tiene sus propios contadores: si
+PROMETHEUS_MULTIPROC_DIR está definido (ver gunicorn.conf.py), prometheus_client
+guarda los valores en archivos mmap de ese directorio y /metrics los agrega
+con MultiProcessCollector. Sin la variable (dev, tests) se usa el registro en memoria.
+"""
+import os
+
+from flask import g, request
+from prometheus_client import (
+    CollectorRegistry, Counter, Gauge, Histogram, REGISTRY, CONTENT_TYPE_LATEST, generate_latest, multiprocess
+)
+from sqlalchemy import event, inspect
+
+from app.extensions import db
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+REQUEST_LATENCY = Histogram(
+    'condomanager_request_duration_seconds', 'Latencia de requests por endpoint',
+    ['endpoint', 'method', 'status'], buckets=LATENCY_BUCKETS
+)
+# Opcional (METRICS_TENANT_LABELS): sin endpoint para que la cardinalidad sea solo la de tenants
+TENANT_REQUEST_LATENCY = Histogram(
+    'condomanager_tenant_request_duration_seconds', 'Latencia de requests por condominio',
+    ['tenant'], buckets=LATENCY_BUCKETS
+)
+
+LOGINS = Counter('condomanager_logins_total', 'Intentos de login', ['channel', 'result'])
+PAYMENTS = Counter('condomanager_payments_total', 'Pagos registrados o actualizados, por estado', ['status'])
+SIGNATURES = Counter('condomanager_signatures_collected_total', 'Firmas públicas registradas')
+PDFS = Counter('condomanager_pdfs_generated_total', 'PDFs de documentos generados o almacenados', ['kind'])
+
+# Llamadas HTTP salientes por proveedor (app.http_client). 'outcome': ok / error
+HTTP_CLIENT_LATENCY = Histogram(
+    'condomanager_http_client_duration_seconds', 'Latencia de llamadas HTTP salientes por proveedor',
+    ['provider', 'outcome'], buckets=LATENCY_BUCKETS
+)
+HTTP_CLIENT_ERRORS = Counter(
+    'condomanager_http_client_errors_total', 'Fallos de llamadas HTTP salientes (timeout, connection, status_5xx, circuit_open)',
+    ['provider', 'kind']
+)
+HTTP_CLIENT_RETRIES = Counter('condomanager_http_client_retries_total', 'Reintentos de llamadas HTTP salientes', ['provider'])
+# 'livemax': 1 si el circuito está abierto en algún proceso vivo
+HTTP_CLIENT_CIRCUIT_OPEN = Gauge(
+    'condomanager_http_client_circuit_open', 'Circuito abierto (1) o cerrado (0) por proveedor',
+    ['provider'], multiprocess_mode='livemax'
+)
+
+# 'livesum': suma de los procesos vivos; un worker reciclado deja de contar
+DB_POOL_CONNECTIONS = Gauge(
+    'condomanager_db_pool_connections', 'Conexiones DBAPI abiertas por el pool', multiprocess_mode='livesum'
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    'condomanager_db_pool_checked_out', 'Conexiones del pool en uso', multiprocess_mode='livesum'
+)
+
+OTHER_TENANT = '__other__'
+
+
+def tenant_label(app, slug):
+    """
+    Etiqueta de tenant con cardinalidad acotada: los primeros METRICS_TENANT_LABEL_LIMIT
+    slugs vistos por el proceso conservan su nombre, el resto se agrupa en '__other__'.
+    """
+    seen = app.extensions['metrics_tenants']
+    if slug in seen:
+        return slug
+    if len(seen) < app.config.get('METRICS_TENANT_LABEL_LIMIT', 50):
+        seen.add(slug)
+        return slug
+    return OTHER_TENANT
+
+
+def metrics_payload():
+    """(cuerpo, content-type) en formato de exposición de Prometheus."""
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def _track_pool(engine):
+    @event.listens_for(engine, 'connect')
+    def pool_connect(dbapi_connection, connection_record):
+        DB_POOL_CONNECTIONS.inc()
+
+    @event.listens_for(engine, 'close')
+    def pool_close(dbapi_connection, connection_record):
+        DB_POOL_CONNECTIONS.dec()
+
+    @event.listens_for(engine, 'checkout')
+    def pool_checkout(dbapi_connection, connection_record, connection_proxy):
+        DB_POOL_CHECKED_OUT.inc()
+
+    @event.listens_for(engine, 'checkin')
+    def pool_checkin(dbapi_connection, connection_record):
+        DB_POOL_CHECKED_OUT.dec()
+
+
+def _collect_model_events(session, flush_context):
+    """Anota pagos (nuevos o con cambio de estado) y firmas nuevas; se cuentan solo si el commit prospera."""
+    from app.models import Payment, ResidentSignature
+
+    pending = session.info.setdefault('metrics_pending', [])
+    for obj in session.new:
+        if isinstance(obj, Payment):
+            pending.append((PAYMENTS, obj.status))
+        elif isinstance(obj, ResidentSignature):
+            pending.append((SIGNATURES, None))
+    for obj in session.dirty:
+        if isinstance(obj, Payment) and inspect(obj).attrs.status.history.has_changes():
+            pending.append((PAYMENTS, obj.status))
+
+
+def _emit_model_events(session):
+    for metric, status in session.info.pop('metrics_pending', ()):
+        if status is None:
+            metric.inc()
+        else:
+            metric.labels(status=status).inc()
+
+
+def _discard_model_events(session):
+    session.info.pop('metrics_pending', None)
+
+
+event.listen(db.session, 'after_flush', _collect_model_events)
+event.listen(db.session, 'after_commit', _emit_model_events)
+event.listen(db.session, 'after_rollback', _discard_model_events)
+
+
+def init_metrics(app):
+    """
+    Histogramas de latencia por endpoint/estado (y opcionalmente por tenant),
+    contadores de negocio sobre commits de la sesión y gauges del pool de conexiones.
+    """
+    app.extensions['metrics_tenants'] = set()
+
+    with app.app_context():
+        _track_pool(db.engine)
+
+    @app.after_request
+    def observe_request_latency(response):
+        # Reutiliza el reloj de app.timing (iniciado en el primer before_request)
+        timing = g.get('request_timing')
+        if timing is None:
+            return response
+
+        elapsed = timing.total_ms() / 1000
+        REQUEST_LATENCY.labels(
+            endpoint=request.endpoint or 'unmatched', method=request.method, status=response.status_code
+        ).observe(elapsed)
+
+        condominium = g.get('condominium')
+        if app.config.get('METRICS_TENANT_LABELS') and condominium:
+            TENANT_REQUEST_LATENCY.labels(tenant=tenant_label(app, condominium.subdomain)).observe(elapsed)
+        return response
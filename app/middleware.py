@@ -1,7 +1,42 @@
-from flask import request, g, abort, current_app
-from app.models import Condominium
+from flask import request, g, abort, current_app, url_for
+from app.extensions import db
+from app.services.tenant_service import tenant_resolver, CurrentTenant
+from app.services.branding_service import branding_service
+from app.tenant_rls import bind_current_tenant
+from app.timing import timed
+
+# Espacios de nombres que NO son tenants aunque no tengan una ruta registrada propia.
+RESERVED_PATH_SEGMENTS = {'static', 'api', 'master', 'auth', 'google_drive', 'global'}
+
+
+def _reserved_segments(app):
+    """
+    Primer segmento de toda ruta fija registrada (ej. 'ingresar', 'dashboard', 'documentos').
+    Esas rutas no llevan slug de tenant; sin esta exclusión el middleware las buscaba
+    como condominio y respondía 404.
+    """
+    segments = set(RESERVED_PATH_SEGMENTS)
+    for rule in app.url_map.iter_rules():
+        first = rule.rule.split('/')[1] if rule.rule.count('/') else ''
+        if first and not first.startswith('<'):
+            segments.add(first)
+    return frozenset(segments)
+
+
+def _current_branding():
+    """Marca del condominio del request o, en rutas sin slug, la del condominio del usuario."""
+    condominium = getattr(g, 'condominium', None)
+    subdomain = condominium.subdomain if condominium else None
+    if not subdomain:
+        from app.auth import get_memoized_user
+        user = get_memoized_user()
+        subdomain = user.tenant if user else None
+    return branding_service.get(subdomain)
+
 
 def init_tenant_middleware(app):
+    reserved = {}
+
     @app.before_request
     def resolve_tenant():
         # --- ARQUITECTURA PATH-BASED PARA RAILWAY ---
@@ -9,9 +44,10 @@ def init_tenant_middleware(app):
         # Ej: /algarrobos/admin/panel -> parts[1] es 'algarrobos'
         subdomain = None
         path_parts = request.path.split('/')
-        # ARQUITECTURA: Se añade 'global' a la lista de exclusión para permitir rutas públicas.
-        # Esta lista define los "espacios de nombres" que NO son tenants.
-        if len(path_parts) > 1 and path_parts[1] not in ['static', 'api', 'master', 'auth', 'google_drive', 'global']:
+        # Los blueprints se registran después del middleware: la lista se calcula en el primer request.
+        if 'segments' not in reserved:
+            reserved['segments'] = _reserved_segments(app)
+        if len(path_parts) > 1 and path_parts[1] and path_parts[1] not in reserved['segments']:
             # Asumimos que el primer segmento es el slug del tenant
             # Se excluyen rutas de sistema para no confundirlas con un tenant.
             subdomain = path_parts[1]
@@ -26,12 +62,14 @@ def init_tenant_middleware(app):
         g.environment = 'production' # Default seguro
 
         if subdomain:
-            tenant = Condominium.query.filter_by(subdomain=subdomain).first()
+            # OPTIMIZACIÓN: Snapshot cacheado en proceso; la fila completa solo se carga si la vista la necesita.
+            with timed('tenant'):
+                tenant = tenant_resolver.resolve(subdomain)
             
             if not tenant:
                 abort(404, description="Condominio no encontrado con el slug proporcionado en la URL.")
             
-            g.condominium = tenant
+            g.condominium = CurrentTenant(tenant)
             g.environment = tenant.environment # 'production', 'demo', 'internal'
 
         else:
@@ -47,6 +85,9 @@ def init_tenant_middleware(app):
             
             g.condominium = None
 
+        # Modo RLS: la conexión ya tomada por el resolver recibe el tenant del request
+        bind_current_tenant(db.session)
+
     @app.before_request
     def bridge_csrf_form_to_header():
         """
@@ -71,7 +112,8 @@ def init_tenant_middleware(app):
         csrf_token = request.cookies.get('csrf_access_token')
         return dict(
             current_condominium=getattr(g, 'condominium', None),
-            csrf_token=csrf_token
+            csrf_token=csrf_token,
+            branding=_current_branding()
         )
 
     @app.context_processor
@@ -79,23 +121,16 @@ def init_tenant_middleware(app):
         """
         Inyecta una función url_for inteligente en las plantillas.
         Añade automáticamente el 'tenant_slug' a las rutas que lo requieran.
+        En rutas sin slug (ej. /documentos) usa el condominio del usuario autenticado.
         """
         def url_for_tenant(endpoint, **values):
-            if g.condominium and 'tenant_slug' not in values:
-                if endpoint.split('.')[0] in ['admin', 'petty_cash', 'google_drive']:
-                    values['tenant_slug'] = g.condominium.subdomain
-            return url_for(endpoint, **values)
-        return dict(url_for_tenant=url_for_tenant)
-
-    @app.context_processor
-    def inject_url_helpers():
-        """
-        Inyecta una función url_for inteligente en las plantillas.
-        Añade automáticamente el 'tenant_slug' a las rutas que lo requieran.
-        """
-        def url_for_tenant(endpoint, **values):
-            if g.condominium and 'tenant_slug' not in values:
-                if endpoint.split('.')[0] in ['admin', 'petty_cash', 'google_drive']:
+            if 'tenant_slug' not in values and endpoint.split('.')[0] in ['admin', 'petty_cash', 'google_drive']:
+                if g.condominium:
                     values['tenant_slug'] = g.condominium.subdomain
+                else:
+                    from app.auth import get_memoized_user
+                    user = get_memoized_user()
+                    if user and user.tenant:
+                        values['tenant_slug'] = user.tenant
             return url_for(endpoint, **values)
         return dict(url_for_tenant=url_for_tenant)
@@ -1,4 +1,5 @@
 from app.extensions import db
+from app.tenant_query import register_tenant_models, apply_tenant_criteria
 from sqlalchemy import Boolean, Date, event
 from flask import g
 from datetime import datetime
@@ -20,7 +21,11 @@ class PlatformBankAccount(db.Model):
 # 1. USER (primero, para que las FK lo encuentren)
 class User(db.Model):
     __tablename__ = 'users'
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        # Panel admin: usuarios por condominio y estado
+        db.Index('ix_users_condominium_status', 'condominium_id', 'status'),
+        {'extend_existing': True}
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     cedula = db.Column(db.String(20), unique=True, nullable=False)
@@ -179,7 +184,11 @@ class Condominium(db.Model):
 # 4. USER SPECIAL ROLE
 class UserSpecialRole(db.Model):
     __tablename__ = 'user_special_roles'
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        # Documentos: rol activo del usuario en el condominio
+        db.Index('ix_user_special_roles_user_condominium_active', 'user_id', 'condominium_id', 'is_active'),
+        {'extend_existing': True}
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -191,6 +200,8 @@ class UserSpecialRole(db.Model):
     is_active = db.Column(Boolean, default=True)
     created_at = db.Column(db.DateTime, default=datetime.now)
 
+    user = db.relationship('User', foreign_keys=[user_id])
+
 # 5. INVOICE
 class Invoice(db.Model):
     __tablename__ = 'invoices'
@@ -245,6 +256,10 @@ import string
 
 class Document(db.Model):
     __tablename__ = 'documents'
+    __table_args__ = (
+        # Dashboard: documentos recientes del condominio
+        db.Index('ix_documents_condominium_created', 'condominium_id', 'created_at'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(300), nullable=False)
     content = db.Column(db.Text, nullable=False)
@@ -266,7 +281,7 @@ class Document(db.Model):
     # Para recolección de firmas públicas
     collect_signatures_from_residents = db.Column(db.Boolean, default=False)
     public_signature_link = db.Column(db.String(100), unique=True)
-    signature_count = db.Column(db.Integer, default=0)
+    signature_count = db.Column(db.Integer, default=0) # DEPRECADO: usar tenant_counters ('signatures:<id>')
     
     # Nomenclatura Oficial
     document_code = db.Column(db.String(50), unique=True) # Ej: OF20251230PUNTA0001
@@ -291,6 +306,10 @@ class DocumentSignature(db.Model):
 
 class ResidentSignature(db.Model):
     __tablename__ = 'resident_signatures'
+    __table_args__ = (
+        # Firma pública: ¿esta cédula ya firmó el documento?
+        db.Index('ix_resident_signatures_document_cedula', 'document_id', 'cedula'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     document_id = db.Column(db.Integer, db.ForeignKey('documents.id'), nullable=False)
     full_name = db.Column(db.String(200), nullable=False)
@@ -346,6 +365,13 @@ class CondominiumModule(db.Model):
 # --- MÓDULO DE PAGOS (PAYPHONE) ---
 class Payment(db.Model):
     __tablename__ = 'payments'
+    __table_args__ = (
+        # Finanzas: pagos del condominio por estado, ordenados por fecha
+        db.Index('ix_payments_condominium_status_created', 'condominium_id', 'status', 'created_at'),
+        # Listados paginados por keyset sobre (created_at, id): del condominio y de un usuario
+        db.Index('ix_payments_condominium_created_id', 'condominium_id', 'created_at', 'id'),
+        db.Index('ix_payments_user_created_id', 'user_id', 'created_at', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     amount = db.Column(db.Numeric(10, 2), nullable=False) # Decimal exacto
@@ -359,7 +385,7 @@ class Payment(db.Model):
     # PayPhone Data
     payphone_transaction_id = db.Column(db.String(100)) # ID de PayPhone
     client_transaction_id = db.Column(db.String(100), unique=True) # Nuestro ID único
-    status = db.Column(db.String(20), default='PENDING') # PENDING, APPROVED, CANCELED, REJECTED, PENDING_REVIEW
+    status = db.Column(db.String(20), default='PENDING') # PENDING, CONFIRMING, APPROVED, CANCELED, REJECTED, PENDING_REVIEW
     response_json = db.Column(db.JSON) # Guardar respuesta completa para auditoría
     
     # Nuevos Campos para Pagos Manuales
@@ -374,7 +400,7 @@ class Payment(db.Model):
     unit_id = db.Column(db.Integer, db.ForeignKey('units.id'), nullable=True)
     condominium_id = db.Column(db.Integer, db.ForeignKey('condominiums.id'), nullable=False)
     
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow) # Clave del keyset
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # Relaciones ORM
@@ -383,14 +409,37 @@ class Payment(db.Model):
     unit = db.relationship('Unit', backref='payments')
     condominium = db.relationship('Condominium', backref='payments')
 
+class PaymentCallbackAttempt(db.Model):
+    """
+    Cada callback de PayPhone recibido para un pago y cómo se resolvió:
+    CONFIRMED (consultó a la pasarela), DUPLICATE (pago ya finalizado), IN_FLIGHT (otro
+    callback lo estaba confirmando) o ERROR (falló la consulta a la pasarela).
+    La conciliación (flask payments reconcile) registra RECONCILED o ERROR.
+    """
+    __tablename__ = 'payment_callback_attempts'
+
+    id = db.Column(db.Integer, primary_key=True)
+    payment_id = db.Column(db.Integer, db.ForeignKey('payments.id'), nullable=False, index=True)
+    condominium_id = db.Column(db.Integer, db.ForeignKey('condominiums.id'), nullable=False)
+    payphone_id = db.Column(db.String(100)) # 'id' recibido en el callback
+    outcome = db.Column(db.String(20), nullable=False)
+    remote_status = db.Column(db.String(30)) # transactionStatus de PayPhone (solo CONFIRMED)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    payment = db.relationship('Payment', backref='callback_attempts')
+
 # --- MÓDULO DE CAJA CHICA ---
 class PettyCashTransaction(db.Model):
     __tablename__ = 'petty_cash_transactions'
+    __table_args__ = (
+        # Saldo del período abierto (SUM desde el último cierre) e historial paginado por keyset
+        db.Index('ix_petty_cash_condominium_date_id', 'condominium_id', 'transaction_date', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     description = db.Column(db.String(255), nullable=False)
     amount = db.Column(db.Numeric(10, 2), nullable=False) # Positivo=Ingreso, Negativo=Gasto
-    transaction_date = db.Column(db.DateTime, default=datetime.utcnow)
+    transaction_date = db.Column(db.DateTime, nullable=False, default=datetime.utcnow) # Clave del keyset
     category = db.Column(db.String(50), nullable=False) # 'REPOSICION', 'TRANSPORTE', 'SUMINISTROS', 'ALIMENTACION', 'OTROS'
     receipt_url = db.Column(db.String(500)) # Ruta de la imagen del recibo
     
@@ -400,6 +449,89 @@ class PettyCashTransaction(db.Model):
     user = db.relationship('User', backref='petty_cash_entries')
     condominium = db.relationship('Condominium', backref='petty_cash_entries')
 
+class PettyCashPeriod(db.Model):
+    """
+    Cierre mensual de caja chica: saldo inicial + movimientos del mes = saldo final.
+    Un período cerrado queda sellado (no admite movimientos con fecha dentro de él).
+    """
+    __tablename__ = 'petty_cash_periods'
+    __table_args__ = (
+        db.UniqueConstraint('condominium_id', 'period_start', name='uq_petty_cash_periods_condominium_start'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    condominium_id = db.Column(db.Integer, db.ForeignKey('condominiums.id'), nullable=False)
+    period_start = db.Column(Date, nullable=False) # Primer día del mes
+    period_end = db.Column(Date, nullable=False) # Primer día del mes siguiente (exclusivo)
+    opening_balance = db.Column(db.Numeric(12, 2), nullable=False, default=0)
+    income = db.Column(db.Numeric(12, 2), nullable=False, default=0)
+    expenses = db.Column(db.Numeric(12, 2), nullable=False, default=0) # Negativo (suma de egresos)
+    closing_balance = db.Column(db.Numeric(12, 2), nullable=False, default=0)
+    transaction_count = db.Column(db.Integer, nullable=False, default=0)
+    closed_at = db.Column(db.DateTime, default=datetime.utcnow)
+    closed_by = db.Column(db.Integer, db.ForeignKey('users.id'))
+
+    user = db.relationship('User')
+
+# --- EXPORTACIONES EN SEGUNDO PLANO ---
+class ExportJob(db.Model):
+    __tablename__ = 'export_jobs'
+
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(30), nullable=False) # 'payments', 'users', 'signatures' (ver app.services.export_service)
+    params = db.Column(db.JSON, default=dict)
+    status = db.Column(db.String(20), default='PENDING', nullable=False) # PENDING, RUNNING, DONE, FAILED, EXPIRED
+    rows_written = db.Column(db.Integer, default=0, nullable=False)
+    total_rows = db.Column(db.Integer)
+    file_name = db.Column(db.String(255)) # Nombre de descarga
+    file_path = db.Column(db.String(500)) # Ruta del archivo generado (EXPORTS_DIR)
+    file_size = db.Column(db.Integer)
+    error = db.Column(db.Text)
+
+    requested_by = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    condominium_id = db.Column(db.Integer, db.ForeignKey('condominiums.id'), nullable=True) # NULL = reporte global (MASTER)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+    expires_at = db.Column(db.DateTime, index=True)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow) # Latido: cada lote escrito
+
+    requester = db.relationship('User')
+
+    @property
+    def progress(self):
+        """Porcentaje completado (0-100); None mientras no se conoce el total."""
+        if self.status == 'DONE':
+            return 100
+        if not self.total_rows:
+            return None
+        return min(99, int(100 * self.rows_written / self.total_rows))
+
+# --- INDICADORES MATERIALIZADOS ---
+class PlatformStat(db.Model):
+    """
+    Indicador global de la plataforma (una fila por clave), mantenido por los hooks de
+    app.services.platform_stats. Se reconstruye con 'flask stats rebuild'.
+    """
+    __tablename__ = 'platform_stats'
+
+    key = db.Column(db.String(50), primary_key=True) # 'total_condos', 'pending_payments', ...
+    value = db.Column(db.Integer, default=0) # NULL = invalidado, se recalcula al leer
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class TenantCounter(db.Model):
+    """
+    Contador de un condominio para los paneles ('units', 'documents:signed', ...),
+    mantenido por los hooks de app.services.tenant_counters.
+    """
+    __tablename__ = 'tenant_counters'
+
+    condominium_id = db.Column(db.Integer, db.ForeignKey('condominiums.id'), primary_key=True)
+    name = db.Column(db.String(80), primary_key=True)
+    value = db.Column(db.Integer, default=0) # NULL = invalidado, se recalcula al leer
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
 # --- EVENTOS DE INYECCIÓN DE TENANT ---
 
 @event.listens_for(db.session, 'before_flush')
@@ -414,3 +546,9 @@ def auto_inject_tenant(session, flush_context, instances):
                 # Solo si no se ha asignado manualmente
                 if not obj.condominium_id:
                     obj.condominium_id = g.condominium.id
+
+# Filtro de tenant sobre todos los SELECT ORM (joins y eager loads incluidos)
+event.listen(db.session, 'do_orm_execute', apply_tenant_criteria)
+
+# Registro de modelos aislados por condominio, calculado una sola vez
+TENANT_MODELS = register_tenant_models(db.Model)
@@ -0,0 +1,212 @@
+"""
+Perfilador por muestreo bajo demanda.
+
+Un usuario MASTER agrega la cabecera 'X-Profile: 1' (o '?_profile=1') a cualquier
+request: un hilo muestrea la pila del hilo que atiende el request cada
+PROFILER_INTERVAL_MS, y al terminar se guardan en PROFILES_DIR las pilas colapsadas
+(formato de flamegraph.pl / speedscope), un flamegraph SVG y los metadatos.
+Los perfiles se listan en /master/perfiles.
+"""
+import html
+import json
+import os
+import re
+import secrets
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+from flask import g, request
+
+PROFILE_HEADER = 'X-Profile'
+PROFILE_PARAM = '_profile'
+PROFILE_ID_PATTERN = re.compile(r'^\d{8}-\d{6}-[0-9a-f]{6}$')
+
+
+class SamplingProfiler:
+    """Muestrea la pila de un hilo desde otro hilo; el hilo perfilado no paga ningún hook por llamada."""
+
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='request-profiler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            self.stacks[self._collapse(frame)] += 1
+            self.samples += 1
+
+    @staticmethod
+    def _collapse(frame):
+        """Pila en formato colapsado: 'raiz;...;hoja' con 'modulo:funcion' por marco."""
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            module = os.path.splitext(os.path.basename(code.co_filename))[0]
+            names.append(f"{module}:{code.co_name}")
+            frame = frame.f_back
+        return ';'.join(reversed(names))
+
+
+def collapsed_text(stacks):
+    return ''.join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+
+def render_flamegraph(stacks, title, width=1200, frame_height=16):
+    """SVG autocontenido (sin dependencias): ancho de cada marco proporcional a sus muestras."""
+    root = {'name': 'all', 'value': 0, 'children': {}}
+    for stack, count in stacks.items():
+        root['value'] += count
+        node = root
+        for name in stack.split(';'):
+            node = node['children'].setdefault(name, {'name': name, 'value': 0, 'children': {}})
+            node['value'] += count
+
+    rects = []
+    max_depth = 0
+
+    def place(node, x, depth):
+        nonlocal max_depth
+        max_depth = max(max_depth, depth)
+        rects.append((node, x, depth))
+        child_x = x
+        for child in sorted(node['children'].values(), key=lambda n: n['name']):
+            place(child, child_x, depth + 1)
+            child_x += child['value']
+
+    place(root, 0, 0)
+    total = root['value'] or 1
+    scale = width / total
+    top = 40
+    height = top + (max_depth + 1) * frame_height + 10
+
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" font-family="monospace" font-size="11">',
+        f'<text x="{width / 2}" y="20" text-anchor="middle" font-size="14">{html.escape(title)}</text>',
+    ]
+    for node, x, depth in rects:
+        w = node['value'] * scale
+        if w < 0.5:
+            continue
+        y = height - 10 - (depth + 1) * frame_height
+        name = html.escape(node['name'])
+        pct = 100.0 * node['value'] / total
+        # Paleta cálida determinista por nombre para que la misma función conserve su color
+        hue = 20 + (sum(node['name'].encode()) % 40)
+        parts.append(
+            f'<g><title>{name} ({node["value"]} muestras, {pct:.1f}%)</title>'
+            f'<rect x="{x * scale:.1f}" y="{y}" width="{w:.1f}" height="{frame_height - 1}" fill="hsl({hue},85%,60%)"/>'
+        )
+        if w > 40:
+            label = name if len(node['name']) * 7 < w else html.escape(node['name'][:max(int(w / 7) - 2, 1)]) + '..'
+            parts.append(f'<text x="{x * scale + 3:.1f}" y="{y + frame_height - 4}">{label}</text>')
+        parts.append('</g>')
+    parts.append('</svg>')
+    return '\n'.join(parts)
+
+
+def profiles_dir(app):
+    return app.config.get('PROFILES_DIR') or os.path.join(app.instance_path, 'profiles')
+
+
+def save_profile(app, profiler, meta):
+    """Escribe <id>.collapsed, <id>.svg y <id>.json; conserva solo los PROFILES_KEEP más recientes."""
+    directory = profiles_dir(app)
+    os.makedirs(directory, exist_ok=True)
+    profile_id = meta['id']
+
+    with open(os.path.join(directory, f"{profile_id}.collapsed"), 'w') as f:
+        f.write(collapsed_text(profiler.stacks))
+    title = f"{meta['method']} {meta['path']} - {meta['duration_ms']} ms, {profiler.samples} muestras"
+    with open(os.path.join(directory, f"{profile_id}.svg"), 'w') as f:
+        f.write(render_flamegraph(profiler.stacks, title))
+    with open(os.path.join(directory, f"{profile_id}.json"), 'w') as f:
+        json.dump(meta, f)
+
+    for old in list_profiles(app)[app.config.get('PROFILES_KEEP', 100):]:
+        for ext in ('collapsed', 'svg', 'json'):
+            path = os.path.join(directory, f"{old['id']}.{ext}")
+            if os.path.exists(path):
+                os.remove(path)
+
+
+def list_profiles(app, limit=None):
+    """Metadatos de los perfiles guardados, del más reciente al más antiguo."""
+    directory = profiles_dir(app)
+    if not os.path.isdir(directory):
+        return []
+    ids = sorted((name[:-5] for name in os.listdir(directory) if name.endswith('.json')), reverse=True)
+    profiles = []
+    for profile_id in ids[:limit]:
+        with open(os.path.join(directory, f"{profile_id}.json")) as f:
+            profiles.append(json.load(f))
+    return profiles
+
+
+def _profile_requested():
+    return request.headers.get(PROFILE_HEADER) == '1' or request.args.get(PROFILE_PARAM) == '1'
+
+
+def init_profiler(app):
+    """
+    Activa el muestreo para los requests marcados por un MASTER. La verificación de rol
+    reutiliza el usuario memoizado del request (app.auth.load_user), así la vista no lo recarga.
+    """
+    @app.before_request
+    def start_profiler():
+        if not _profile_requested():
+            return
+        from app.auth import get_current_user
+        user = get_current_user()
+        if not (user and user.role == 'MASTER'):
+            return  # Sin privilegios la marca se ignora; el request sigue normal
+
+        profiler = SamplingProfiler(threading.get_ident(), app.config.get('PROFILER_INTERVAL_MS', 5) / 1000)
+        g.profiler = (profiler, time.perf_counter(), user.id)
+        profiler.start()
+
+    @app.after_request
+    def save_request_profile(response):
+        state = g.pop('profiler', None)
+        if state is None:
+            return response
+
+        profiler, started, user_id = state
+        profiler.stop()
+        now = datetime.utcnow()
+        meta = {
+            'id': f"{now:%Y%m%d-%H%M%S}-{secrets.token_hex(3)}",
+            'created_at': now.isoformat(timespec='seconds'),
+            'endpoint': request.endpoint,
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'duration_ms': round((time.perf_counter() - started) * 1000, 1),
+            'samples': profiler.samples,
+            'user_id': user_id,
+        }
+        save_profile(app, profiler, meta)
+        response.headers['X-Profile-Id'] = meta['id']
+        return response
+
+    @app.teardown_request
+    def stop_profiler(exception=None):
+        # Si la vista lanzó una excepción after_request no corre: no dejar el hilo muestreando
+        state = g.pop('profiler', None)
+        if state is not None:
+            state[0].stop()
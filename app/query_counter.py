@@ -0,0 +1,97 @@
+import re
+import time
+from collections import Counter
+
+import structlog
+from flask import g, request, has_app_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = structlog.get_logger()
+
+_WHITESPACE = re.compile(r'\s+')
+# Listas IN expandidas: "(?, ?, ?)" / "(%s, %s)" -> "(?)" para que el tamaño de la lista no cambie la forma
+_PARAM_LIST = re.compile(r'\((?:\s*(?:\?|%s|%\(\w+\)s|:\w+|\$\d+)\s*,)+\s*(?:\?|%s|%\(\w+\)s|:\w+|\$\d+)\s*\)')
+
+
+def statement_shape(statement):
+    """Normaliza un SQL a su 'forma': mismos parámetros enlazados, distinto valor = misma forma."""
+    return _PARAM_LIST.sub('(?)', _WHITESPACE.sub(' ', statement).strip())
+
+
+class QueryStats:
+    """Contadores de SQL de un request: sentencias, tiempo total y repeticiones por forma."""
+    __slots__ = ('count', 'total_ms', 'shapes')
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.shapes = Counter()
+
+    def record(self, statement, elapsed_ms):
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.shapes[statement_shape(statement)] += 1
+
+    def repeated(self, threshold):
+        """Formas ejecutadas al menos 'threshold' veces: probable N+1."""
+        return {shape: n for shape, n in self.shapes.items() if n >= threshold}
+
+
+def current_query_stats():
+    """QueryStats del request en curso (o None fuera de un request instrumentado)."""
+    if has_app_context():
+        return g.get('query_stats')
+    return None
+
+
+def add_query_stats(logger_, method_name, event_dict):
+    """Procesador de structlog: agrega db_queries/db_time_ms a cada log emitido durante un request."""
+    stats = current_query_stats()
+    if stats is not None:
+        event_dict.setdefault('db_queries', stats.count)
+        event_dict.setdefault('db_time_ms', round(stats.total_ms, 2))
+    return event_dict
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _start_timer(conn, cursor, statement, parameters, context, executemany):
+    conn.info['query_start'] = time.perf_counter()
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _record_query(conn, cursor, statement, parameters, context, executemany):
+    stats = current_query_stats()
+    if stats is not None:
+        stats.record(statement, (time.perf_counter() - conn.info['query_start']) * 1000)
+
+
+def init_query_counter(app):
+    """
+    Cuenta las sentencias SQL de cada request (instrumentación a nivel de Engine)
+    y advierte cuando una misma forma se repite N veces (QUERY_N_PLUS_ONE_THRESHOLD).
+    """
+    @app.before_request
+    def start_query_stats():
+        g.query_stats = QueryStats()
+
+    @app.after_request
+    def report_query_stats(response):
+        stats = g.get('query_stats')
+        if stats is None:
+            return response
+
+        repeated = stats.repeated(app.config.get('QUERY_N_PLUS_ONE_THRESHOLD', 5))
+        for shape, times in repeated.items():
+            logger.warning(
+                "n_plus_one_suspected",
+                endpoint=request.endpoint,
+                repeats=times,
+                statement=shape[:300]
+            )
+        return response
+
+    @app.teardown_request
+    def stop_query_stats(exception=None):
+        # Las queries fuera del request (p.ej. en tests que reutilizan el app context) no se atribuyen a él
+        g.pop('query_stats', None)
@@ -8,4 +8,5 @@ from .api_routes import api_bp
 from .document_routes import document_bp
 from .payment_routes import payment_bp
 from .petty_cash_routes import petty_cash_bp
-from .google_drive_routes import google_drive_bp
\ No newline at end of file
+from .google_drive_routes import google_drive_bp
+from .export_routes import export_bp
\ No newline at end of file
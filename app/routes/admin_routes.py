@@ -1,18 +1,21 @@
 from flask import (
     Blueprint, render_template, redirect, url_for,
-    current_app, flash, request, session, abort, Response, g
+    current_app, flash, request, session, abort, g, jsonify
 )
 from flask_jwt_extended import jwt_required
-from sqlalchemy import func
+from sqlalchemy import func, select
 from sqlalchemy.orm.attributes import flag_modified
 from sqlalchemy.orm import joinedload # Optimización N+1
 from app import db
 from app.models import User, Condominium, Unit, UserSpecialRole, Payment # Se mantiene esta
 from app.decorators import admin_tenant_required
+from app.auth import get_current_user
 from app.utils.validation import validate_file # Importar validación
+from app.utils.csv_stream import csv_response, stream_rows
+from app.services.branding_service import branding_service
+from app.services.tenant_counters import tenant_counters
+from app.utils.pagination import paginate_request
 from datetime import date, datetime
-import io
-import csv
 import os # Importar os a nivel de módulo
 from werkzeug.utils import secure_filename # Importar secure_filename a nivel de módulo
 
@@ -32,7 +35,7 @@ def reject_user(user_id): # Renombrado para consistencia
 
 @admin_bp.route('/<tenant_slug>/admin/panel', methods=['GET', 'POST'])
 @admin_tenant_required
-def admin_condominio_panel(tenant_slug):
+def admin_condominio_panel():
     """
     Panel de gestión específico para un condominio.
     Muestra las unidades y opciones de gestión.
@@ -209,36 +212,35 @@ def reportes_condominio():
         tipo_reporte = request.form.get('tipo_reporte')
         
         if tipo_reporte == 'residentes':
-            # Generar CSV de Residentes
-            output = io.StringIO()
-            writer = csv.writer(output)
-            writer.writerow(['Unidad', 'Nombre', 'Email', 'Teléfono', 'Rol', 'Estado'])
-            
-            # OPTIMIZACIÓN: Eager load de unit para el CSV
-            residentes = User.query.filter_by(condominium_id=condominium_id).filter(
-                User.tenant == condominium.subdomain,
-                User.status == 'active'
-            ).options(joinedload(User.unit))\
-             .order_by(User.unit_id).all()
-            
-            for res in residentes:
-                unidad = res.unit.property_number if res.unit else 'Sin Asignar'
-                writer.writerow([unidad, res.name, res.email, res.cellphone, res.role, res.status])
-                
-            output.seek(0)
-            return Response(
-                output.getvalue().encode('utf-8-sig'), # UTF-8 con BOM
-                mimetype="text/csv",
-                headers={"Content-Disposition": f"attachment;filename=residentes_{condominium.name}.csv"}
+            # Generar CSV de Residentes por streaming (solo columnas, leídas por lotes)
+            rows = stream_rows(
+                select(Unit.property_number, User.first_name, User.last_name, User.email,
+                       User.cellphone, User.role, User.status)
+                .select_from(User)
+                .outerjoin(Unit, User.unit_id == Unit.id)
+                .where(User.condominium_id == condominium_id,
+                       User.tenant == condominium.subdomain,
+                       User.status == 'active')
+                .order_by(User.unit_id)
+            )
+
+            def resident_rows():
+                for property_number, first_name, last_name, email, cellphone, role, status in rows:
+                    unidad = property_number or 'Sin Asignar'
+                    yield [unidad, f"{first_name} {last_name}", email, cellphone, role, status]
+
+            return csv_response(
+                f"residentes_{condominium.name}.csv",
+                ['Unidad', 'Nombre', 'Email', 'Teléfono', 'Rol', 'Estado'],
+                resident_rows()
             )
             
-    # Estadísticas para la vista
-    total_unidades = Unit.query.filter_by(condominium_id=condominium_id).count()
-    total_residentes = User.query.filter_by(condominium_id=condominium_id, status='active').count()
+    # Estadísticas para la vista (tenant_counters)
+    counts = tenant_counters.get(condominium_id, ('units', 'residents_active'))
     
     return render_template('admin/reportes.html', 
                            condominium=condominium,
-                           stats={'unidades': total_unidades, 'residentes': total_residentes})
+                           stats={'unidades': counts['units'], 'residentes': counts['residents_active']})
 
 @admin_bp.route('/<tenant_slug>/admin/configuracion-pagos', methods=['GET', 'POST'])
 @admin_tenant_required
@@ -276,13 +278,16 @@ def configuracion_pagos():
             
         return redirect(url_for('admin.configuracion_pagos', tenant_slug=condo.subdomain))
         
-    # Obtener historial de pagos recibidos para este condominio
+    # Historial de pagos recibidos para este condominio, paginado por keyset
     # OPTIMIZACIÓN: Eager load de user y unit
-    transactions = Payment.query.filter_by(condominium_id=condominium_id).order_by(Payment.created_at.desc())\
-        .options(joinedload(Payment.user), joinedload(Payment.unit))\
-        .all()
+    transactions_page = paginate_request(
+        Payment.query.filter_by(condominium_id=condominium_id)
+        .options(joinedload(Payment.user), joinedload(Payment.unit)),
+        Payment
+    )
         
-    return render_template('admin/config_pagos.html', condominium=condo, transactions=transactions)
+    return render_template('admin/config_pagos.html', condominium=condo,
+                           transactions=transactions_page.items, transactions_page=transactions_page)
 
 @admin_bp.route('/<tenant_slug>/admin/finanzas', methods=['GET'])
 @admin_tenant_required
@@ -293,24 +298,56 @@ def finanzas():
     condo = g.condominium
     condominium_id = condo.id
     
-    # Pagos pendientes de revisión (Transferencias)
-    # OPTIMIZACIÓN: Eager load de user y unit
-    pending_payments = Payment.query.filter_by(condominium_id=condominium_id).filter_by(
-        status='PENDING_REVIEW'
-    ).options(joinedload(Payment.user), joinedload(Payment.unit))\
-     .order_by(Payment.created_at.asc()).all()
+    # Pagos pendientes de revisión (Transferencias), los más antiguos primero
+    # OPTIMIZACIÓN: Eager load de user y unit; una página por keyset (cursor 'pendientes')
+    pending_page = paginate_request(
+        Payment.query.filter_by(condominium_id=condominium_id, status='PENDING_REVIEW')
+        .options(joinedload(Payment.user), joinedload(Payment.unit)),
+        Payment, param='pendientes', descending=False
+    )
     
-    # Historial de pagos procesados (Últimos 50)
-    # OPTIMIZACIÓN: Eager load de user y unit
-    history_payments = Payment.query.filter_by(condominium_id=condominium_id).filter(
-        Payment.status != 'PENDING_REVIEW'
-    ).options(joinedload(Payment.user), joinedload(Payment.unit))\
-     .order_by(Payment.created_at.desc()).limit(50).all()
+    # Historial de pagos procesados, los más recientes primero (cursor 'historial')
+    history_page = paginate_request(
+        Payment.query.filter_by(condominium_id=condominium_id).filter(Payment.status != 'PENDING_REVIEW')
+        .options(joinedload(Payment.user), joinedload(Payment.unit)),
+        Payment, param='historial'
+    )
     
     return render_template('admin/finanzas.html', 
                            condominium=condo, 
-                           pending_payments=pending_payments,
-                           history_payments=history_payments)
+                           pending_payments=pending_page.items,
+                           pending_page=pending_page,
+                           pending_total=tenant_counters.get(condominium_id, ('pending_payments',))['pending_payments'],
+                           history_payments=history_page.items,
+                           history_page=history_page)
+
+def _payment_json(payment):
+    return {
+        'id': payment.id,
+        'created_at': payment.created_at.isoformat(),
+        'amount': str(payment.amount),
+        'status': payment.status,
+        'payment_method': payment.payment_method,
+        'description': payment.description,
+        'reference': payment.reference,
+        'user': payment.user.name if payment.user else None,
+        'unit': payment.unit.property_number if payment.unit else None,
+    }
+
+@admin_bp.route('/<tenant_slug>/admin/api/pagos', methods=['GET'])
+@admin_tenant_required
+def api_pagos():
+    """
+    Pagos del condominio en JSON, paginados por keyset.
+    Parámetros: status (opcional, ej. PENDING_REVIEW), cursor, per_page.
+    """
+    query = Payment.query.filter_by(condominium_id=g.condominium.id)\
+        .options(joinedload(Payment.user), joinedload(Payment.unit))
+    status = request.args.get('status')
+    if status:
+        query = query.filter_by(status=status)
+    page = paginate_request(query, Payment, descending=status != 'PENDING_REVIEW')
+    return jsonify(page.to_dict(_payment_json))
 
 @admin_bp.route('/<tenant_slug>/admin/pagos/aprobar/<int:payment_id>', methods=['POST'])
 @admin_tenant_required
@@ -439,6 +476,8 @@ def personalizar_condominio():
 
     try:
         db.session.commit()
+        # La personalización está cacheada en el espacio de nombres del condominio
+        branding_service.invalidate(condo.subdomain)
         flash("Personalización actualizada correctamente.", "success")
     except Exception as e:
         db.session.rollback()
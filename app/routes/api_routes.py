@@ -1,9 +1,11 @@
 from flask import Blueprint, jsonify, request, make_response, url_for, current_app, g
 from flask_jwt_extended import jwt_required, create_access_token, set_access_cookies, current_user
 from app.auth import get_current_user
-from app.models import Condominium, User, Unit
+from app.models import Condominium, User
+from app.services.platform_stats import platform_stats
 from app import db, models
 from app.extensions import limiter
+from app.metrics import LOGINS
 from werkzeug.security import check_password_hash # ✅ Importar la función correcta
 from datetime import timedelta
 import traceback
@@ -42,11 +44,15 @@ def api_login():
         if not user or not check_password_hash(user.password_hash, password): # ✅ Usar el hashing seguro
             # Si no se encuentra, es porque las credenciales son incorrectas O porque intenta loguearse en el subdominio equivocado.
             current_app.logger.warning(f"Login failed for {email}. Tenant: {tenant}")
+            LOGINS.labels(channel='api', result='failure').inc()
             return jsonify({"error": "Credenciales incorrectas o acceso desde un subdominio no autorizado."}), 401
 
         if user.status != 'active':
+            LOGINS.labels(channel='api', result='inactive').inc()
             return jsonify({"error": f"Tu cuenta está en estado '{user.status}'"}), 403
 
+        LOGINS.labels(channel='api', result='success').inc()
+
         # Crear token y establecerlo en una cookie
         access_token = create_access_token(identity=user.id, expires_delta=timedelta(hours=12)) # 12 horas
         
@@ -111,12 +117,8 @@ def api_master_estadisticas():
     user = get_current_user()
     if not user or user.role != 'MASTER':
         return jsonify({"error": "Acceso denegado"}), 403
-    return jsonify({
-        "total_condominios": Condominium.query.count(),
-        "total_usuarios": User.query.count(),
-        "usuarios_pendientes": User.query.filter_by(status='pending').count(),
-        "unidades_totales": Unit.query.count(),
-    })
+    stats = platform_stats.snapshot()
+    return jsonify({key: stats[key] for key in ('total_condominios', 'total_usuarios', 'usuarios_pendientes', 'unidades_totales')})
 
 @api_bp.route('/condominiums', methods=['GET'])
 def get_condominiums():
@@ -1,7 +1,7 @@
 # app/routes/document_routes.py
 from flask import (
     Blueprint, render_template, request, flash, redirect, url_for,
-    send_file, current_app, abort, make_response, jsonify
+    send_file, current_app, abort, jsonify
 )
 from flask_jwt_extended import jwt_required
 from sqlalchemy.orm import joinedload # Optimización
@@ -10,12 +10,12 @@ from app.models import Document, DocumentSignature, User, Condominium, ResidentS
 from app.decorators import login_required, module_required
 from app.services.document_service import DocumentService
 from app.exceptions import BusinessError
+from app.services.export_service import ExportService
+from app.services.tenant_counters import tenant_counters
 from werkzeug.utils import secure_filename
 import os
 import uuid
 from datetime import datetime
-import io
-import csv
 import json
 
 document_bp = Blueprint('document', __name__, url_prefix='/documentos')
@@ -53,13 +53,18 @@ def index(current_user):
 
     # 3. Obtener documentos (Todos pueden verlos, la restricción es al CREAR)
     docs = []
+    counts = {}
     if condominium:
         # OPTIMIZACIÓN: Eager load de created_by para evitar N+1 al mostrar autor
-        docs = Document.query.order_by(Document.created_at.desc())\
+        # /documentos no lleva slug de tenant: el filtro por condominio debe ser explícito
+        docs = Document.query.filter_by(condominium_id=condominium.id)\
+            .order_by(Document.created_at.desc())\
             .options(joinedload(Document.created_by))\
             .all()
+        counts = tenant_counters.get(condominium.id, [f"signatures:{doc.id}" for doc in docs])
     
-    return render_template('documents/index.html', documents=docs, has_premium_access=has_premium_access)
+    return render_template('documents/index.html', documents=docs, has_premium_access=has_premium_access,
+                           counts=counts)
 
 @document_bp.route('/nuevo', methods=['GET', 'POST'])
 @module_required('documents') 
@@ -118,7 +123,10 @@ def view(current_user, doc_id):
     if not user_condo or doc.condominium_id != user_condo.id:
         abort(403)
         
-    return render_template('documents/view.html', doc=doc)
+    signature_name = f"signatures:{doc.id}"
+    signature_count = tenant_counters.get(user_condo.id, (signature_name,)).get(signature_name, 0)
+    return render_template('documents/view.html', doc=doc, signature_count=signature_count,
+                           export_job=request.args.get('export_job', type=int))
 
 @document_bp.route('/<int:doc_id>/descargar-sin-firmar')
 @login_required
@@ -132,9 +140,12 @@ def download_unsigned(current_user, doc_id):
     if not user_condo or doc.condominium_id != user_condo.id:
         abort(403)
         
-    if not doc.pdf_unsigned_path or not os.path.exists(os.path.join('app', doc.pdf_unsigned_path)):
+    if not doc.pdf_unsigned_path or not os.path.exists(os.path.join(current_app.root_path, doc.pdf_unsigned_path)):
         DocumentService.generate_unsigned_pdf(doc)
-    return send_file(os.path.join('app', doc.pdf_unsigned_path), as_attachment=True, download_name=f"{doc.title}_SIN_FIRMAR.pdf")
+    # Ruta absoluta: send_file resuelve las relativas contra app.root_path, no contra el cwd.
+    # send_file agrega ETag/Last-Modified y responde 304 (política en app.cache_policy).
+    return send_file(os.path.join(current_app.root_path, doc.pdf_unsigned_path), as_attachment=True,
+                     download_name=f"{doc.title}_SIN_FIRMAR.pdf")
 
 @document_bp.route('/<int:doc_id>/firmar', methods=['GET', 'POST'])
 @module_required('documents')
@@ -275,8 +286,7 @@ def public_signature(public_link):
                 phone=request.form.get('phone', '').strip(),
                 ip_address=request.remote_addr
             )
-            db.session.add(sig)
-            doc.signature_count = (doc.signature_count or 0) + 1
+            db.session.add(sig) # El total por documento lo suma tenant_counters en la misma transacción
             db.session.commit()
             flash("¡FIRMA REGISTRADA CORRECTAMENTE! Gracias por tu apoyo.", "success")
         
@@ -298,16 +308,8 @@ def download_signatures(current_user, doc_id):
     if not user_condo or doc.condominium_id != user_condo.id:
         abort(403)
 
-    signatures = ResidentSignature.query.filter_by(document_id=doc.id).order_by(ResidentSignature.signed_at.asc()).all()
-    
-    output = io.StringIO()
-    writer = csv.writer(output)
-    writer.writerow(['Nombre Completo', 'Cédula', 'Teléfono', 'Fecha de Firma', 'IP'])
-    for sig in signatures:
-        writer.writerow([sig.full_name, sig.cedula, sig.phone, sig.signed_at.strftime('%Y-%m-%d %H:%M:%S'), sig.ip_address])
-    
-    output.seek(0)
-    response = make_response(output.getvalue())
-    response.headers["Content-Disposition"] = f"attachment; filename=firmas_{doc.title.replace(' ', '_')}.csv"
-    response.headers["Content-type"] = "text/csv"
-    return response
+    # Las peticiones populares juntan miles de firmas: el CSV se genera en segundo plano
+    job = ExportService.enqueue('signatures', {'document_id': doc.id, 'title': doc.title}, current_user,
+                                condominium_id=user_condo.id)
+    flash("Generando el CSV de firmas; el enlace de descarga aparecerá aquí.", "info")
+    return redirect(url_for('document.view', doc_id=doc.id, export_job=job.id))
@@ -0,0 +1,32 @@
+from flask import Blueprint, jsonify, send_file, abort
+from app import db
+from app.models import ExportJob
+from app.decorators import login_required
+from app.services.export_service import ExportService
+import os
+
+export_bp = Blueprint('exports', __name__, url_prefix='/exportaciones')
+
+@export_bp.route('/<int:job_id>')
+@login_required
+def status(current_user, job_id):
+    """
+    Estado de un job de exportación (JSON), consultado periódicamente por el panel.
+    """
+    job = db.session.get(ExportJob, job_id)
+    if not ExportService.can_access(job, current_user):
+        abort(404)
+    return jsonify(ExportService.status_payload(job))
+
+@export_bp.route('/descargar/<token>')
+@login_required
+def download(current_user, token):
+    """
+    Descarga del archivo generado mediante el enlace firmado (vence en EXPORT_LINK_TTL).
+    """
+    job = ExportService.job_for_token(token)
+    if not ExportService.can_access(job, current_user):
+        abort(404)
+    if job.status != 'DONE' or not job.file_path or not os.path.exists(job.file_path):
+        abort(410, "La exportación ya no está disponible.")
+    return send_file(job.file_path, mimetype='text/csv', as_attachment=True, download_name=job.file_name)
@@ -1,18 +1,26 @@
 from flask import (
     Blueprint, render_template, redirect,
-    current_app, flash, Response, jsonify, request, url_for, session, g
+    current_app, flash, Response, jsonify, request, url_for, session, g, abort, send_from_directory
 )
 from flask_jwt_extended import jwt_required
 from sqlalchemy import or_
 from sqlalchemy.orm.attributes import flag_modified
 from sqlalchemy.orm import joinedload # Optimización N+1
 from app.auth import get_current_user
-from app.models import Condominium, User, CondominiumConfig, Unit, PlatformBankAccount
+from app.models import Condominium, User, CondominiumConfig, PlatformBankAccount
 from app import db, models
 from datetime import datetime
 import io
 import csv
 from app.decorators import master_required
+from app.services.report_definitions import CONDOMINIUMS_DETAILED, ADMINS_BY_CONDOMINIUM, MASTER_REPORTS
+from app.services.platform_stats import platform_stats
+from app.services.tenant_counters import tenant_counters
+from app.services.export_service import ExportService
+from app.services.tenant_service import tenant_resolver
+from app.services.entitlement_service import entitlement_service
+from app.services.catalog_service import CatalogService
+from app.profiling import list_profiles, profiles_dir, PROFILE_ID_PATTERN
 
 master_bp = Blueprint('master', __name__)
 
@@ -29,177 +37,48 @@ def master_panel():
 @master_required
 def reports():
     current_user = get_current_user()
-    # Generación de estadísticas en tiempo real
-    # ✅ REGLA: Las métricas de negocio deben excluir entornos internos/de prueba.
-    production_envs = ['production', 'demo'] # Definir qué se considera "real"
     
-    total_condos = Condominium.query.filter(Condominium.environment.in_(production_envs)).count()
-    active_condos = Condominium.query.filter(Condominium.status=='ACTIVO', Condominium.environment.in_(production_envs)).count()
-    inactive_condos = total_condos - active_condos
-    
-    # Contar solo usuarios de condominios de producción/demo
-    total_users = db.session.query(User).join(Condominium, User.tenant == Condominium.subdomain).filter(Condominium.environment.in_(production_envs)).count()
-    # Usuarios con roles de gestión (ADMIN o MASTER)
-    management_users = User.query.filter(or_(User.role=='ADMIN', User.role=='MASTER')).count()
-    
-    # Métrica de Mora / Deuda (Pagos pendientes de revisión o rechazados)
-    pending_payments_count = db.session.query(models.Payment).join(Condominium).filter(Condominium.environment.in_(production_envs), models.Payment.status=='PENDING_REVIEW').count()
-    
-    # Documentos Totales (Métrica real solicitada)
-    total_docs = db.session.query(models.Document).join(Condominium).filter(Condominium.environment.in_(production_envs)).count()
-    
-    # Lógica de exportación (POST)
+    # Lógica de exportación (POST): reportes declarativos (app.services.report_definitions)
     if request.method == 'POST':
         action = request.form.get('action')
+        today = datetime.now().strftime('%Y%m%d')
         
         if action == 'export_condos':
-            # ... (existing code) ...
-            output = io.StringIO()
-            writer = csv.writer(output)
-            # Cabeceras Detalladas
-            writer.writerow(['ID', 'Nombre Legal', 'RUC', 'Dirección Completa', 'Latitud', 'Longitud', 'Celular Admin', 'Administrador', 'Estado', 'Módulos Activos'])
-            
-            # OPTIMIZACIÓN: Eager load del admin_user
-            condos = Condominium.query.order_by(Condominium.name)\
-                .options(joinedload(Condominium.admin_user))\
-                .all()
-                
-            for c in condos:
-                admin_name = c.admin_user.name if c.admin_user else 'N/A'
-                admin_cell = c.admin_user.cellphone if c.admin_user else 'N/A'
-                
-                # Determinar módulos activos
-                active_modules_list = []
-                if c.has_documents_module: active_modules_list.append("Documentos")
-                if c.has_billing_module: active_modules_list.append("Cobranza")
-                if c.has_requests_module: active_modules_list.append("Requerimientos")
-                
-                writer.writerow([
-                    c.id, 
-                    c.legal_name, 
-                    c.ruc, 
-                    c.get_full_address(), 
-                    c.latitude, 
-                    c.longitude, 
-                    admin_cell, 
-                    admin_name,
-                    c.status,
-                    ", ".join(active_modules_list)
-                ])
-            
-            output.seek(0)
-            return Response(
-                output.getvalue().encode('utf-8-sig'), 
-                mimetype="text/csv",
-                headers={"Content-Disposition": f"attachment;filename=reporte_condominios_detallado_{datetime.now().strftime('%Y%m%d')}.csv"}
-            )
+            return CONDOMINIUMS_DETAILED.csv_response(f"reporte_condominios_detallado_{today}.csv")
 
         elif action == 'export_admins':
-            output = io.StringIO()
-            writer = csv.writer(output)
-            writer.writerow(['Condominio', 'RUC Condominio', 'Nombre Admin', 'Email Admin', 'Celular Admin', 'Cédula Admin'])
-            
-            admins = User.query.filter_by(role='ADMIN').all()
-            for admin in admins:
-                # Buscar condominios de este admin
-                # Nota: Esto sigue siendo N+1 pero es un reporte administrativo de bajo volumen.
-                # Para optimizarlo requeriría refactorizar modelos para tener backref explícito
-                condos_managed = Condominium.query.filter_by(admin_user_id=admin.id).all()
-                
-                for condo in condos_managed:
-                     writer.writerow([
-                        condo.name,
-                        condo.ruc,
-                        admin.name,
-                        admin.email,
-                        admin.cellphone,
-                        admin.cedula
-                    ])
-                
-                if not condos_managed:
-                    writer.writerow([
-                        "Sin Asignar",
-                        "N/A",
-                        admin.name,
-                        admin.email,
-                        admin.cellphone,
-                        admin.cedula
-                    ])
-            
-            output.seek(0)
-            return Response(
-                output.getvalue().encode('utf-8-sig'), 
-                mimetype="text/csv",
-                headers={"Content-Disposition": f"attachment;filename=reporte_administradores_por_condominio_{datetime.now().strftime('%Y%m%d')}.csv"}
-            )
+            # Una sola sentencia (LEFT JOIN condominios); antes una query por administrador
+            return ADMINS_BY_CONDOMINIUM.csv_response(f"reporte_administradores_por_condominio_{today}.csv")
 
-        elif action == 'export_payments':
-            output = io.StringIO()
-            writer = csv.writer(output)
-            writer.writerow(['ID Pago', 'Fecha', 'Condominio', 'Usuario', 'Unidad', 'Monto', 'Método', 'Estado', 'Referencia'])
-            
-            # Últimos 5000 pagos
-            # OPTIMIZACIÓN: Eager load de relaciones críticas
-            payments = models.Payment.query.order_by(models.Payment.created_at.desc())\
-                .options(joinedload(models.Payment.condominium), joinedload(models.Payment.user), joinedload(models.Payment.unit))\
-                .limit(5000).all()
-                
-            for p in payments:
-                writer.writerow([
-                    p.id,
-                    p.created_at.strftime('%Y-%m-%d'),
-                    p.condominium.name if p.condominium else 'N/A',
-                    p.user.name if p.user else 'N/A',
-                    p.unit.property_number if p.unit else 'N/A',
-                    p.amount,
-                    p.payment_method,
-                    p.status,
-                    p.reference
-                ])
-                
-            output.seek(0)
-            return Response(
-                output.getvalue().encode('utf-8-sig'), 
-                mimetype="text/csv",
-                headers={"Content-Disposition": f"attachment;filename=reporte_pagos_global_{datetime.now().strftime('%Y%m%d')}.csv"}
-            )
-            
-        elif action == 'export_users':
-            output = io.StringIO()
-            writer = csv.writer(output)
-            # Cabeceras
-            writer.writerow(['ID', 'Nombre', 'Email', 'Rol', 'Estado', 'Tenant/Condominio', 'Fecha Registro'])
-            
-            users = User.query.order_by(User.created_at.desc()).all()
-            for u in users:
-                writer.writerow([
-                    u.id,
-                    u.name,
-                    u.email,
-                    u.role,
-                    u.status,
-                    u.tenant or 'N/A',
-                    u.created_at.strftime('%Y-%m-%d') if u.created_at else ''
-                ])
-                
-            output.seek(0)
-            return Response(
-                output.getvalue().encode('utf-8-sig'),
-                mimetype="text/csv",
-                headers={"Content-Disposition": f"attachment;filename=reporte_usuarios_global_{datetime.now().strftime('%Y%m%d')}.csv"}
-            )
+        elif action in ('export_payments', 'export_users'):
+            # Reportes sin tope de filas: se generan en segundo plano (app.services.export_service)
+            job = ExportService.enqueue(action.replace('export_', ''), {}, current_user)
+            flash("La exportación se está generando; podrás descargarla en esta página.", "info")
+            return redirect(url_for('master.reports', export_job=job.id))
+
+    # Indicadores materializados en platform_stats (excluyen entornos internos/de prueba)
+    stats = platform_stats.snapshot()
+    stats['inactive_condos'] = stats['total_condos'] - stats['active_condos']
 
     return render_template('master/reports.html', 
                            user=current_user,
-                           stats={
-                               'total_condos': total_condos,
-                               'active_condos': active_condos,
-                               'inactive_condos': inactive_condos,
-                               'total_users': total_users,
-                               'management_users': management_users,
-                               'pending_payments': pending_payments_count,
-                               'total_docs': total_docs
-                           })
+                           stats=stats,
+                           export_job=request.args.get('export_job', type=int))
+
+@master_bp.route('/master/reportes/<name>.<fmt>')
+@master_required
+def report_view(name, fmt):
+    """
+    Reporte global en CSV, JSON o tabla HTML.
+    """
+    report = MASTER_REPORTS.get(name)
+    if report is None or fmt not in ('csv', 'json', 'html'):
+        abort(404)
+    if fmt == 'csv':
+        return report.csv_response(f"{name}_{datetime.now().strftime('%Y%m%d')}.csv")
+    if fmt == 'json':
+        return jsonify(report.json())
+    return render_template('master/report_table.html', user=get_current_user(), report=report, table=report.html())
 
 @master_bp.route('/master/condominios', methods=['GET'])
 @master_required
@@ -234,11 +113,12 @@ def supervise_condominium(condominium_id):
         flash('Condominio no encontrado.', 'danger')
         return redirect(url_for('master.master_condominios'))
 
-    # Calcular estadísticas
+    # Estadísticas desde tenant_counters (usuarios por condominium_id)
+    counts = tenant_counters.get(condominium.id, ('units', 'residents_active', 'residents_pending'))
     stats = {
-        'total_units': Unit.query.filter_by(condominium_id=condominium.id).count(),
-        'active_users': User.query.filter_by(tenant=condominium.subdomain, status='active').count(),
-        'pending_users': User.query.filter_by(tenant=condominium.subdomain, status='pending').count()
+        'total_units': counts['units'],
+        'active_users': counts['residents_active'],
+        'pending_users': counts['residents_pending']
     }
 
     return render_template('master/supervise_condominium.html', 
@@ -740,6 +620,9 @@ def manage_module_catalog():
                 module.maintenance_message = None
 
             db.session.commit()
+            # Estado y mantenimiento del catálogo afectan a todos los condominios
+            entitlement_service.clear()
+            CatalogService.invalidate()
         except Exception as e:
             db.session.rollback()
             flash(f'Error al guardar el módulo: {e}', 'danger')
@@ -768,6 +651,7 @@ def master_importar_condos_csv():
             csv_reader = csv.DictReader(stream)
             created_count = 0
             errors = []
+            imported_subdomains = []
 
             for row in csv_reader:
                 if Condominium.query.filter_by(subdomain=row['subdomain']).first() or Condominium.query.filter_by(ruc=row['ruc']).first():
@@ -785,8 +669,10 @@ def master_importar_condos_csv():
                     subdomain=row['subdomain'], status='ACTIVO', admin_user_id=admin.id, created_by=current_user.id
                 )
                 db.session.add(new_condo)
+                imported_subdomains.append(new_condo.subdomain)
                 created_count += 1
             db.session.commit()
+            tenant_resolver.invalidate(*imported_subdomains)
             flash(f'{created_count} condominios creados exitosamente. Errores: {len(errors)}', 'success')
             if errors:
                 flash(f"Detalles de errores: {'; '.join(errors)}", 'warning')
@@ -806,6 +692,7 @@ def editar_condominio(condo_id):
     administradores = User.query.filter(User.role.in_(['ADMIN', 'MASTER'])).all()
 
     if request.method == 'POST':
+        previous_subdomain = condo_to_edit.subdomain
         try:
             # Actualización robusta de campos
             if request.form.get('name'): condo_to_edit.name = request.form.get('name')
@@ -859,6 +746,7 @@ def editar_condominio(condo_id):
             # Ahora la configuración se hace exclusivamente vía 'configure_condo_modules'.
             
             db.session.commit()
+            tenant_resolver.invalidate(previous_subdomain, condo_to_edit.subdomain)
             flash('Condominio actualizado exitosamente.', 'success')
             return redirect(url_for('master.master_condominios'))
         except Exception as e:
@@ -903,6 +791,7 @@ def inactivar_condominio(condo_id):
     condo_to_inactivate = Condominium.query.get_or_404(condo_id)
     condo_to_inactivate.status = 'INACTIVO'
     db.session.commit()
+    tenant_resolver.invalidate(condo_to_inactivate.subdomain)
     flash(f'El condominio "{condo_to_inactivate.name}" ha sido inactivado.', 'success')
     return redirect(url_for('master.master_condominios'))
 
@@ -1072,6 +961,23 @@ def master_document_audit():
         
     return render_template('master/document_audit.html', user=current_user, documents=documents)
 
+@master_bp.route('/master/perfiles', methods=['GET'])
+@master_required
+def master_perfiles():
+    """Perfiles capturados con 'X-Profile: 1' (app/profiling.py), del más reciente al más antiguo."""
+    current_user = get_current_user()
+    profiles = list_profiles(current_app, limit=100)
+    return render_template('master/perfiles.html', user=current_user, profiles=profiles)
+
+@master_bp.route('/master/perfiles/<profile_id>.<ext>', methods=['GET'])
+@master_required
+def master_perfil_archivo(profile_id, ext):
+    if not PROFILE_ID_PATTERN.match(profile_id) or ext not in ('svg', 'collapsed'):
+        abort(404)
+    mimetype = 'image/svg+xml' if ext == 'svg' else 'text/plain'
+    return send_from_directory(profiles_dir(current_app), f"{profile_id}.{ext}", mimetype=mimetype,
+                               as_attachment=(ext == 'collapsed'))
+
 @master_bp.route('/master/condominios/guardar-config-modulo/<int:condo_id>', methods=['POST'])
 @master_required
 def save_condo_module_config(condo_id):
@@ -1095,5 +1001,6 @@ def save_condo_module_config(condo_id):
     config.pricing_type = request.form.get('pricing_type')
     
     db.session.commit()
+    entitlement_service.invalidate(condo.id)
     flash(f'Configuración del módulo actualizada para {condo.name}.', 'success')
     return redirect(url_for('master.configure_condo_modules', condo_id=condo.id))
@@ -64,6 +64,8 @@ def callback_pago():
             flash(f"✅ Pago de ${payment.amount} realizado con ÉXITO. Referencia: {payment.id}", "success")
         elif payment.status == 'CANCELED':
             flash("El pago fue cancelado.", "warning")
+        elif payment.status == 'CONFIRMING':
+            flash("Tu pago se está verificando con la pasarela. Revisa tu historial en unos instantes.", "info")
         else:
             flash("El pago no pudo ser procesado o fue rechazado.", "error")
             
@@ -1,8 +1,10 @@
 from flask import Blueprint, render_template, request, redirect, url_for, flash, current_app, g
 from flask_jwt_extended import jwt_required
-from app.models import db, PettyCashTransaction
+from app.models import db, PettyCashTransaction, PettyCashPeriod
 from app.auth import get_current_user
 from app.decorators import admin_tenant_required
+from app.services.petty_cash_service import PettyCashService
+from app.utils.pagination import paginate_request
 from app.utils.validation import validate_file, validate_amount
 import datetime
 import os
@@ -15,25 +17,56 @@ petty_cash_bp = Blueprint('petty_cash', __name__)
 def index():
     """
     Panel principal de Caja Chica.
-    Muestra el saldo actual y el historial de movimientos.
+    Muestra el saldo actual, los cierres mensuales y el historial de movimientos (paginado).
     """
     condo = g.condominium
     
-    transactions = PettyCashTransaction.query.filter_by(condominium_id=condo.id)\
-        .order_by(PettyCashTransaction.transaction_date.desc()).all()
+    transactions_page = paginate_request(
+        PettyCashTransaction.query.filter_by(condominium_id=condo.id),
+        PettyCashTransaction, column='transaction_date'
+    )
     
-    # Calcular saldo
-    balance = sum(t.amount for t in transactions)
+    # Saldo = último cierre + movimientos del período abierto (no recorre el historial)
+    periods = PettyCashPeriod.query.filter_by(condominium_id=condo.id)\
+        .order_by(PettyCashPeriod.period_start.desc()).limit(12).all()
+    last_period = periods[0] if periods else None
+    balance = PettyCashService.balance(condo.id, last_period=last_period)
     
     # Fecha actual para el input date
     now_date = datetime.datetime.utcnow().strftime('%Y-%m-%d')
     
     return render_template('admin/petty_cash.html', 
                            condominium=condo, 
-                           transactions=transactions, 
+                           transactions=transactions_page.items, 
+                           transactions_page=transactions_page,
+                           periods=periods,
+                           open_since=last_period.period_end if last_period else None,
                            balance=balance, 
                            now_date=now_date)
 
+@petty_cash_bp.route('/<tenant_slug>/admin/caja-chica/cerrar', methods=['POST'])
+@admin_tenant_required
+def cerrar_periodo():
+    """
+    Cierra los meses completos aún abiertos: guarda su saldo final y los sella.
+    """
+    condo = g.condominium
+    user = get_current_user()
+    
+    try:
+        periods = PettyCashService.close_periods(condo.id, user.id)
+    except Exception as e:
+        db.session.rollback()
+        flash(f"Error al cerrar el período: {str(e)}", "error")
+        return redirect(url_for('petty_cash.index', tenant_slug=condo.subdomain))
+    
+    if periods:
+        months = ", ".join(p.period_start.strftime('%m/%Y') for p in periods)
+        flash(f"Período cerrado: {months}. Saldo final ${periods[-1].closing_balance:.2f}.", "success")
+    else:
+        flash("No hay meses completos pendientes de cierre.", "info")
+    return redirect(url_for('petty_cash.index', tenant_slug=condo.subdomain))
+
 @petty_cash_bp.route('/<tenant_slug>/admin/caja-chica/nuevo', methods=['POST'])
 @admin_tenant_required
 def nuevo_movimiento():
@@ -69,6 +102,9 @@ def nuevo_movimiento():
             except ValueError:
                 flash("Formato de fecha inválido", "error")
                 return redirect(url_for('petty_cash.index', tenant_slug=condo.subdomain))
+        
+        # VALIDACIÓN BACKEND: no se registran movimientos en un mes ya cerrado
+        PettyCashService.ensure_open(condo.id, tx_date)
             
         # Procesar archivo
         receipt_url = None
@@ -1,12 +1,14 @@
 from flask import (
     Blueprint, request, render_template, redirect, url_for,
-    current_app, flash, make_response, g
+    current_app, flash, make_response, g, abort
 )
 from flask_jwt_extended import (
     create_access_token, set_access_cookies, unset_jwt_cookies
 )
 from app.models import User, db, Condominium
 from app.extensions import limiter
+from app.metrics import metrics_payload
+from app.services.branding_service import branding_service
 from werkzeug.security import generate_password_hash # ✅ Importar la función correcta
 from datetime import datetime, timedelta
 import secrets # Para generar tokens seguros
@@ -20,6 +22,24 @@ def home():
     config = current_app.get_tenant_config(tenant_subdomain)
     return render_template('home.html', config=config)
 
+@public_bp.route('/marca/<subdomain>/<version>.css')
+def branding_css(subdomain, version):
+    """
+    Hoja de estilos de la marca del condominio. La URL lleva el hash del contenido,
+    así que se cachea indefinidamente; si la marca cambió se redirige a la versión vigente.
+    """
+    branding = branding_service.get(subdomain)
+    if branding is None:
+        abort(404)
+    if version != branding.version:
+        return redirect(url_for('public.branding_css', subdomain=subdomain, version=branding.version))
+
+    response = make_response(branding.stylesheet())
+    response.mimetype = 'text/css'
+    response.set_etag(branding.version)
+    # Cache-Control immutable: ver app.cache_policy
+    return response.make_conditional(request)
+
 @public_bp.route('/solicitar-demo', methods=['GET', 'POST'])
 def demo_request():
     config = current_app.get_tenant_config(getattr(g, 'condominium', None).subdomain if getattr(g, 'condominium', None) else None)
@@ -131,3 +151,13 @@ def verify_email(token):
 @public_bp.route('/health')
 def health():
     return "OK", 200
+
+@public_bp.route('/metrics')
+def metrics():
+    token = current_app.config.get('METRICS_TOKEN')
+    if not token and current_app.config.get('METRICS_REQUIRE_TOKEN'):
+        abort(404) # Sin token configurado las métricas no se publican
+    if token and not secrets.compare_digest(request.headers.get('Authorization', ''), f"Bearer {token}"):
+        abort(401)
+    body, content_type = metrics_payload()
+    return body, 200, {'Content-Type': content_type}
@@ -8,9 +8,10 @@ from app.models import db, User, Document, Condominium, Unit, DocumentSignature,
 from app.extensions import limiter
 from app.services.user_service import UserService
 from app.services.payment_service import PaymentService
+from app.services.tenant_counters import tenant_counters
+from app.utils.pagination import paginate_request
 from app.exceptions import BusinessError
 import os
-from datetime import datetime, timedelta
 
 user_bp = Blueprint('user', __name__)
 
@@ -48,13 +49,8 @@ def dashboard():
             condo_id = condo.id
             
     if condo_id:
-        # Contar documentos firmados/enviados en los últimos 7 días
-        seven_days_ago = datetime.utcnow() - timedelta(days=7)
-        new_docs_count = Document.query.filter(
-            Document.condominium_id == condo_id,
-            Document.created_at >= seven_days_ago,
-            Document.status.in_(['signed', 'sent']) # Solo contar documentos públicos oficiales
-        ).count()
+        # Documentos firmados/enviados (públicos oficiales) de los últimos 7 días, desde tenant_counters
+        new_docs_count = tenant_counters.published_since(condo_id, days=7)
 
     return render_template('user/dashboard.html', 
                            user=user, 
@@ -176,12 +172,13 @@ def reportes():
     # Buscar documentos firmados por el usuario
     signed_docs = DocumentSignature.query.filter_by(user_id=user.id).order_by(DocumentSignature.signed_at.desc()).all()
     
-    # Buscar pagos del usuario
-    payments = Payment.query.filter_by(user_id=user.id).order_by(Payment.created_at.desc()).all()
+    # Pagos del usuario, paginados por keyset (cursor 'pagos')
+    payments_page = paginate_request(Payment.query.filter_by(user_id=user.id), Payment, param='pagos')
     
     return render_template('services/reportes.html', 
                            mensaje="Mi Historial", 
                            config=config, 
                            user=user,
                            signed_docs=signed_docs,
-                           payments=payments)
+                           payments=payments_page.items,
+                           payments_page=payments_page)
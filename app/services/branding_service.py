@@ -0,0 +1,74 @@
+import hashlib
+import re
+from dataclasses import dataclass
+
+from flask import current_app
+
+from app.extensions import db, tiered_cache
+from app.models import CondominiumConfig
+from app.services.tenant_service import tenant_namespace
+
+DEFAULT_PRIMARY_COLOR = '#2c5aa0'
+# El color llega desde un formulario y termina dentro de una hoja de estilos: solo hex
+_HEX_COLOR = re.compile(r'^#(?:[0-9a-fA-F]{3}|[0-9a-fA-F]{6})$')
+
+
+@dataclass(frozen=True)
+class TenantBranding:
+    """
+    Personalización visual del condominio (CondominiumConfig) como valor inmutable y
+    serializable: se guarda en el caché compartido y sobrevive al fin del request.
+    """
+    tenant: str
+    primary_color: str
+    logo_url: str
+    commercial_name: str
+
+    @property
+    def safe_primary_color(self):
+        color = (self.primary_color or '').strip()
+        return color if _HEX_COLOR.match(color) else DEFAULT_PRIMARY_COLOR
+
+    def stylesheet(self):
+        """Hoja de estilos del condominio; sobreescribe las variables por defecto de base.html."""
+        return f":root {{\n    --primary: {self.safe_primary_color};\n}}\n"
+
+    @property
+    def version(self):
+        """Hash del contenido de la hoja de estilos: cambia la URL cuando cambia el color."""
+        return hashlib.sha256(self.stylesheet().encode()).hexdigest()[:12]
+
+
+class BrandingService:
+    """
+    slug -> TenantBranding sobre el caché de dos niveles, en el espacio de nombres del
+    condominio. invalidate() se llama al guardar la personalización (admin).
+    """
+
+    @staticmethod
+    def _ttl():
+        return current_app.config.get('BRANDING_CACHE_TTL', 300)
+
+    def get(self, subdomain):
+        """TenantBranding del condominio o None si no tiene personalización."""
+        if not subdomain:
+            return None
+
+        def load():
+            config = db.session.get(CondominiumConfig, subdomain)
+            if not config:
+                return None
+            return TenantBranding(config.tenant, config.primary_color, config.logo_url, config.commercial_name)
+
+        return tiered_cache.get_or_load(tenant_namespace(subdomain), 'branding', load, timeout=self._ttl())
+
+    def prime(self, subdomain, branding):
+        """Guarda la marca ya leída por otra consulta (TenantResolver la trae junto con el condominio)."""
+        tiered_cache.set(tenant_namespace(subdomain), 'branding', branding, timeout=self._ttl())
+
+    def invalidate(self, subdomain):
+        if subdomain:
+            tiered_cache.bump(tenant_namespace(subdomain))
+
+
+branding_service = BrandingService()
@@ -1,13 +1,24 @@
-from app.extensions import cache
+from app.extensions import tiered_cache
 from app.models import Module
 
+CATALOG_NAMESPACE = 'catalog'
+
 class CatalogService:
     @staticmethod
-    @cache.cached(timeout=3600, key_prefix='global_active_modules')
     def get_active_modules():
         """
-        Retorna la lista de módulos activos globalmente.
-        Cacheado por 1 hora ya que esto raramente cambia.
+        Retorna la lista de módulos activos globalmente (dicts, serializables para el caché compartido).
+        Cacheado por 1 hora ya que esto raramente cambia; invalidate() al editar el catálogo.
         """
-        return Module.query.filter_by(status='ACTIVE').all()
+        def load():
+            return [
+                {'id': m.id, 'code': m.code, 'name': m.name, 'description': m.description,
+                 'base_price': m.base_price, 'billing_cycle': m.billing_cycle, 'pricing_type': m.pricing_type}
+                for m in Module.query.filter_by(status='ACTIVE').order_by(Module.name).all()
+            ]
+        return tiered_cache.get_or_load(CATALOG_NAMESPACE, 'active_modules', load, timeout=3600)
+
+    @staticmethod
+    def invalidate():
+        tiered_cache.bump(CATALOG_NAMESPACE)
 
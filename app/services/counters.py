@@ -0,0 +1,253 @@
+"""
+Contadores materializados, mantenidos de forma incremental por hooks de la sesión ORM.
+
+Cada Counter declara el modelo que cuenta, los campos que lee y un predicado. En cada
+flush se calcula el delta de los objetos nuevos (+1), eliminados (-1) y modificados
+(predicado con los valores anteriores vs. los nuevos) y el CounterStore lo aplica con
+UPDATE ... SET value = value + delta dentro de la misma transacción: si la transacción
+se revierte, el contador también.
+
+Lo que no pasa por objetos del ORM (UPDATE/DELETE masivos con Query.update(), cambios
+en tablas de las que depende el predicado) invalida las filas afectadas; el store las
+recalcula con COUNT(*) en la siguiente lectura. Las escrituras con SQL directo (scripts,
+migraciones) no se detectan: para eso está la reconstrucción completa por CLI.
+"""
+from dataclasses import dataclass
+
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm.base import NO_VALUE
+
+from app.extensions import db
+from app.models import Condominium, Document
+from app.tenant_query import get_tenant_id, is_tenant_model
+
+_STORES = []
+
+
+@dataclass(frozen=True)
+class Counter:
+    """
+    'counts(valores, lookup)' decide si un objeto suma al contador; 'valores' es un dict
+    con los 'fields' del objeto. 'scope(valores, lookup)' separa contadores del mismo
+    nombre (ej. por condominio); sin scope es un contador global. 'detail(valores)'
+    desglosa el contador (ej. documentos por estado): cada objeto suma al total y a su
+    desglose.
+    'depends_on' son (modelo, campos) de otras tablas que también leen el predicado:
+    cualquier cambio en ellos invalida el contador.
+    """
+    name: str
+    model: type
+    fields: tuple
+    counts: object
+    scope: object = None
+    detail: object = None
+    depends_on: tuple = ()
+
+    def bucket(self, values, lookup):
+        """(scope, nombre, desglose) al que suma el objeto, o None si no cuenta."""
+        if not self.counts(values, lookup):
+            return None
+        return (self.scope(values, lookup) if self.scope else None,
+                self.name,
+                self.detail(values) if self.detail else None)
+
+
+class CondominiumLookup:
+    """Datos de condominios que leen los predicados, consultados una vez por flush."""
+
+    def __init__(self, connection):
+        self._connection = connection
+        self._environments = {}
+        self._document_condominiums = {}
+
+    def document_condominium(self, document_id):
+        if document_id not in self._document_condominiums:
+            table = Document.__table__
+            self._document_condominiums[document_id] = self._connection.execute(
+                select(table.c.condominium_id).where(table.c.id == document_id)
+            ).scalar()
+        return self._document_condominiums[document_id]
+
+    def environment(self, condominium_id=None, subdomain=None):
+        table = Condominium.__table__
+        if condominium_id is not None:
+            key, criteria = ('id', condominium_id), table.c.id == condominium_id
+        elif subdomain is not None:
+            key, criteria = ('subdomain', subdomain), table.c.subdomain == subdomain
+        else:
+            return None
+        if key not in self._environments:
+            # Core sobre la tabla: sin filtro de tenant ni autoflush dentro del flush
+            self._environments[key] = self._connection.execute(
+                select(table.c.environment).where(criteria)
+            ).scalar()
+        return self._environments[key]
+
+
+class CounterStore:
+    """
+    Tabla de contadores. Las subclases implementan apply() (sumar deltas) e
+    invalidate() (descartar contadores para recalcularlos al leer; con 'condominium_id'
+    solo los de ese condominio, si el store separa por condominio).
+    """
+    counters = ()
+
+    def apply(self, connection, deltas):
+        raise NotImplementedError
+
+    def invalidate(self, connection, counters, condominium_id=None):
+        raise NotImplementedError
+
+
+def register_store(store):
+    _STORES.append(store)
+    return store
+
+
+def wrote_in_transaction(session):
+    """
+    Indica si la transacción en curso de la sesión ya escribió (flush o UPDATE/DELETE masivo).
+    Sus filas de contadores pueden estar bloqueadas por ella misma: un recálculo en otra
+    conexión esperaría para siempre.
+    """
+    return session.info.get('counter_writes', False)
+
+
+def _values(obj, fields, old):
+    """Valores de 'fields' antes (old=True) o después del flush en curso."""
+    if not old:
+        return {field: getattr(obj, field) for field in fields}
+    attrs = inspect(obj).attrs
+    values = {}
+    for field in fields:
+        history = attrs[field].history
+        if history.deleted:
+            values[field] = history.deleted[0]
+        else:
+            value = attrs[field].loaded_value
+            values[field] = None if value is NO_VALUE else value
+    return values
+
+
+def _previous_values(obj, fields, connection):
+    """
+    Valores previos de un objeto modificado o eliminado, leídos antes del flush. Si estaba
+    expirado (p.ej. tras un commit) el ORM no conoce el valor anterior de los atributos:
+    se leen de la fila, que todavía no cambió.
+    """
+    state = inspect(obj)
+    unknown = []
+    for field in fields:
+        history = state.attrs[field].history
+        if not history.deleted and (history.added or state.attrs[field].loaded_value is NO_VALUE):
+            unknown.append(field)
+    values = _values(obj, fields, old=True)
+    if unknown and state.identity is not None:
+        mapper = state.mapper
+        criteria = [column == value for column, value in zip(mapper.primary_key, state.identity)]
+        row = connection.execute(
+            select(*[mapper.get_property(field).columns[0] for field in unknown]).where(*criteria)
+        ).first()
+        if row is not None:
+            values.update(zip(unknown, row))
+    return values
+
+
+def _changed(obj, fields):
+    attrs = inspect(obj).attrs
+    return any(attrs[field].history.has_changes() for field in fields)
+
+
+def _add(deltas, bucket, amount):
+    if bucket is not None:
+        deltas[bucket] = deltas.get(bucket, 0) + amount
+
+
+def _stale(store, obj, deleted=False, new=False):
+    """Contadores del store cuyo predicado lee campos de 'obj' que cambiaron."""
+    return {counter for counter in store.counters
+            for model, fields in counter.depends_on
+            if isinstance(obj, model) and (deleted or new or _changed(obj, fields))}
+
+
+@event.listens_for(db.session, 'before_flush')
+def _count_previous(session, flush_context, instances):
+    """Bajas y valores anteriores de los modificados: antes del flush, con la fila sin cambiar."""
+    pending = session.info['counter_pending'] = {}
+    if not _STORES or not (session.deleted or session.dirty):
+        return
+    connection = session.connection()
+    lookup = CondominiumLookup(connection)
+    for store in _STORES:
+        deltas, stale = pending.setdefault(id(store), ({}, set()))
+        for obj in session.deleted:
+            for counter in store.counters:
+                if isinstance(obj, counter.model):
+                    _add(deltas, counter.bucket(_previous_values(obj, counter.fields, connection), lookup), -1)
+            stale |= _stale(store, obj, deleted=True)
+        for obj in session.dirty:
+            for counter in store.counters:
+                if isinstance(obj, counter.model) and _changed(obj, counter.fields):
+                    _add(deltas, counter.bucket(_previous_values(obj, counter.fields, connection), lookup), -1)
+
+
+@event.listens_for(db.session, 'after_flush')
+def _count_flushed(session, flush_context):
+    """Altas y valores nuevos de los modificados: ya tienen ids y defaults asignados."""
+    pending = session.info.pop('counter_pending', {})
+    session.info['counter_writes'] = True
+    if not _STORES:
+        return
+    connection = session.connection()
+    lookup = CondominiumLookup(connection)
+    for store in _STORES:
+        deltas, stale = pending.get(id(store), ({}, set()))
+        for obj in session.new:
+            for counter in store.counters:
+                if isinstance(obj, counter.model):
+                    _add(deltas, counter.bucket(_values(obj, counter.fields, old=False), lookup), 1)
+            stale |= _stale(store, obj, new=True)
+        for obj in session.dirty:
+            for counter in store.counters:
+                if isinstance(obj, counter.model) and _changed(obj, counter.fields):
+                    _add(deltas, counter.bucket(_values(obj, counter.fields, old=False), lookup), 1)
+            stale |= _stale(store, obj)
+
+        # Un contador invalidado se recalcula completo: sus deltas ya no aplican
+        stale_names = {counter.name for counter in stale}
+        deltas = {bucket: delta for bucket, delta in deltas.items() if delta and bucket[1] not in stale_names}
+        if deltas:
+            store.apply(connection, deltas)
+        if stale:
+            store.invalidate(connection, stale)
+
+
+@event.listens_for(db.session, 'do_orm_execute')
+def _invalidate_bulk(orm_execute_state):
+    """UPDATE/DELETE/INSERT masivos no pasan por objetos: invalidan los contadores del modelo."""
+    if orm_execute_state.is_select:
+        return
+    orm_execute_state.session.info['counter_writes'] = True
+    if not _STORES:
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is None:
+        return
+    # UPDATE/DELETE de un modelo de tenant con el filtro activo solo tocan filas del condominio actual
+    condominium_id = None
+    if ((orm_execute_state.is_update or orm_execute_state.is_delete) and is_tenant_model(mapper.class_)
+            and not orm_execute_state.execution_options.get('skip_tenant_filter', False)):
+        condominium_id = get_tenant_id()
+    connection = orm_execute_state.session.connection()
+    for store in _STORES:
+        stale = {counter for counter in store.counters
+                 if issubclass(mapper.class_, counter.model)
+                 or any(issubclass(mapper.class_, model) for model, _ in counter.depends_on)}
+        if stale:
+            store.invalidate(connection, stale, condominium_id=condominium_id)
+
+
+@event.listens_for(db.session, 'after_transaction_end')
+def _forget_writes(session, transaction):
+    if transaction.parent is None:
+        session.info.pop('counter_writes', None)
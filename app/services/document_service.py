@@ -10,6 +10,7 @@ import io
 from flask import current_app
 from app.exceptions import ValidationError, BusinessError, ResourceNotFoundError
 import structlog
+from app.metrics import PDFS
 
 logger = structlog.get_logger()
 
@@ -74,6 +75,7 @@ class DocumentService:
         
         with open(path, 'wb') as f:
             f.write(buffer.getvalue())
+        PDFS.labels(kind='unsigned').inc()
         
         doc.pdf_unsigned_path = os.path.join('static', 'uploads', 'documents', 'unsigned', filename)
         db.session.commit()
@@ -160,6 +162,7 @@ class DocumentService:
         path = os.path.join(UPLOAD_FOLDER, 'signed', filename)
         os.makedirs(os.path.dirname(path), exist_ok=True)
         file.save(path)
+        PDFS.labels(kind='physical').inc()
 
         doc.pdf_signed_path = os.path.join('static', 'uploads', 'documents', 'signed', filename)
         doc.signature_type = 'physical'
@@ -246,6 +249,7 @@ class DocumentService:
             
             with open(local_path, 'wb') as f:
                 f.write(file_content)
+            PDFS.labels(kind='electronic').inc()
                 
             doc.pdf_signed_path = os.path.join('static', 'uploads', 'documents', 'signed', filename)
             doc.signature_type = 'uanataca'
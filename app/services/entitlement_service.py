@@ -0,0 +1,141 @@
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy import and_, select
+
+from app.extensions import db
+from app.models import Condominium, CondominiumModule, Module
+
+# Flags heredados de Condominium -> código del módulo en el catálogo
+LEGACY_MODULE_FLAGS = {
+    'documents': 'has_documents_module',
+    'billing': 'has_billing_module',
+    'requests': 'has_requests_module',
+}
+
+
+@dataclass(frozen=True)
+class Entitlements:
+    """
+    Módulos habilitados de un condominio, compilados desde el catálogo (Module),
+    la configuración por condominio (CondominiumModule) y los flags has_*_module.
+    'valid_until' es el próximo instante en que el resultado cambia solo por el paso
+    del tiempo (fin de un trial, inicio o fin de una ventana de mantenimiento).
+    """
+    modules: frozenset = frozenset()
+    maintenance: dict = field(default_factory=dict)  # código -> mensaje, módulos contratados en mantenimiento
+    valid_until: datetime = None
+
+    def allows(self, code):
+        return code in self.modules
+
+
+def compile_entitlements(condominium_id, now=None):
+    """Calcula los módulos habilitados del condominio con dos consultas."""
+    now = now or datetime.utcnow()
+
+    flags = db.session.execute(
+        select(*[getattr(Condominium, column) for column in LEGACY_MODULE_FLAGS.values()])
+        .where(Condominium.id == condominium_id)
+    ).first()
+    if flags is None:
+        return Entitlements()
+    flagged = {code for code, enabled in zip(LEGACY_MODULE_FLAGS, flags) if enabled}
+
+    rows = db.session.execute(
+        select(
+            Module.code, Module.status, Module.maintenance_mode, Module.maintenance_start,
+            Module.maintenance_end, Module.maintenance_message,
+            CondominiumModule.status, CondominiumModule.trial_ends_at
+        )
+        .outerjoin(CondominiumModule, and_(
+            CondominiumModule.module_id == Module.id, CondominiumModule.condominium_id == condominium_id
+        ))
+        .execution_options(skip_tenant_filter=True)
+    ).all()
+
+    modules = set(flagged)
+    maintenance = {}
+    transitions = []
+    for code, module_status, in_maintenance, maint_start, maint_end, message, condo_status, trial_ends_at in rows:
+        # Una configuración explícita del condominio manda sobre el flag heredado
+        if condo_status == 'ACTIVE':
+            contracted = True
+        elif condo_status == 'TRIAL':
+            contracted = trial_ends_at is None or trial_ends_at > now
+            if contracted and trial_ends_at:
+                transitions.append(trial_ends_at)
+        elif condo_status is not None:
+            contracted = False
+        else:
+            contracted = code in flagged
+
+        if module_status == 'ARCHIVED' or not contracted:
+            modules.discard(code)
+            continue
+
+        if in_maintenance:
+            starts, ends = maint_start or now, maint_end
+            if starts > now:
+                transitions.append(starts)
+            elif ends is None or ends > now:
+                maintenance[code] = message or "Módulo en mantenimiento."
+                modules.discard(code)
+                if ends:
+                    transitions.append(ends)
+                continue
+        modules.add(code)
+
+    return Entitlements(frozenset(modules), maintenance, min(transitions) if transitions else None)
+
+
+class EntitlementService:
+    """
+    Caché en proceso condominium_id -> Entitlements, con TTL e invalidación explícita
+    (mismo esquema que TenantResolver). Un acierto responde sin ir a la base de datos.
+    Los cambios hechos en otro worker se ven como máximo tras ENTITLEMENT_CACHE_TTL segundos.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+        # Se incrementa en cada invalidación: una compilación que empezó antes no se guarda
+        self.generation = 0
+
+    def _ttl(self):
+        return current_app.config.get('ENTITLEMENT_CACHE_TTL', 60)
+
+    def get(self, condominium_id):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(condominium_id)
+            generation = self.generation
+        if entry and entry[1] > now and (entry[0].valid_until is None or entry[0].valid_until > datetime.utcnow()):
+            return entry[0]
+
+        entitlements = compile_entitlements(condominium_id)
+        with self._lock:
+            if generation == self.generation:
+                self._entries[condominium_id] = (entitlements, now + self._ttl())
+        return entitlements
+
+    def has_module(self, condominium_id, code):
+        return self.get(condominium_id).allows(code)
+
+    def invalidate(self, *condominium_ids):
+        with self._lock:
+            self.generation += 1
+            for condominium_id in condominium_ids:
+                self._entries.pop(condominium_id, None)
+
+    def clear(self):
+        """Para cambios del catálogo global (afectan a todos los condominios)."""
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+
+
+entitlement_service = EntitlementService()
@@ -0,0 +1,344 @@
+"""
+Exportaciones en segundo plano.
+
+Pedir un reporte grande crea un ExportJob y responde de inmediato. Un hilo del pool
+(ExportWorker) recorre la consulta en lotes por keyset, escribe el CSV a disco bloque
+a bloque (app.utils.csv_stream.iter_csv) y registra el avance en la fila del job.
+El panel consulta /exportaciones/<id> y descarga el archivo con un enlace firmado que
+vence en EXPORT_LINK_TTL segundos. collect_garbage() borra los archivos vencidos.
+"""
+import os
+import secrets
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+import structlog
+from flask import current_app, url_for
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+from sqlalchemy import func, select, update
+
+from app.extensions import db
+from app.models import Condominium, ExportJob, Payment, ResidentSignature, Unit, User
+from app.utils.csv_stream import iter_csv
+
+logger = structlog.get_logger()
+
+ACTIVE_STATUSES = ('PENDING', 'RUNNING')
+
+
+class ExportInterrupted(Exception):
+    """collect_garbage() dio el job por interrumpido mientras corría: el worker lo abandona."""
+
+
+@dataclass(frozen=True)
+class ExportDefinition:
+    """
+    Un reporte exportable. 'query(params)' es un select() sin orden cuya primera columna
+    es 'key' (única): el job lo recorre en lotes con WHERE key < último ORDER BY key.
+    """
+    title: str
+    header: tuple
+    key: object
+    descending: bool
+    query: object
+    format_row: object
+    file_name: object
+
+
+def _payments_query(params):
+    return (
+        select(Payment.id, Payment.created_at, Condominium.name, User.first_name, User.last_name,
+               Unit.property_number, Payment.amount, Payment.payment_method, Payment.status, Payment.reference)
+        .outerjoin(Condominium, Payment.condominium_id == Condominium.id)
+        .outerjoin(User, Payment.user_id == User.id)
+        .outerjoin(Unit, Payment.unit_id == Unit.id)
+    )
+
+
+def _payment_row(row):
+    payment_id, created_at, condo_name, first_name, last_name, property_number, amount, method, status, reference = row
+    return [
+        payment_id,
+        created_at.strftime('%Y-%m-%d'),
+        condo_name or 'N/A',
+        f"{first_name} {last_name}" if first_name is not None else 'N/A',
+        property_number or 'N/A',
+        amount,
+        method,
+        status,
+        reference
+    ]
+
+
+def _users_query(params):
+    return select(User.id, User.first_name, User.last_name, User.email, User.role, User.status,
+                  User.tenant, User.created_at)
+
+
+def _user_row(row):
+    user_id, first_name, last_name, email, role, status, tenant, created_at = row
+    return [user_id, f"{first_name} {last_name}", email, role, status, tenant or 'N/A',
+            created_at.strftime('%Y-%m-%d') if created_at else '']
+
+
+def _signatures_query(params):
+    return (
+        select(ResidentSignature.id, ResidentSignature.full_name, ResidentSignature.cedula,
+               ResidentSignature.phone, ResidentSignature.signed_at, ResidentSignature.ip_address)
+        .where(ResidentSignature.document_id == params['document_id'])
+    )
+
+
+def _signature_row(row):
+    _, full_name, cedula, phone, signed_at, ip_address = row
+    return [full_name, cedula, phone, signed_at.strftime('%Y-%m-%d %H:%M:%S'), ip_address]
+
+
+EXPORTS = {
+    'payments': ExportDefinition(
+        title="Pagos (global)",
+        header=('ID Pago', 'Fecha', 'Condominio', 'Usuario', 'Unidad', 'Monto', 'Método', 'Estado', 'Referencia'),
+        key=Payment.id, descending=True, query=_payments_query, format_row=_payment_row,
+        file_name=lambda params, today: f"reporte_pagos_global_{today}.csv",
+    ),
+    'users': ExportDefinition(
+        title="Usuarios (global)",
+        header=('ID', 'Nombre', 'Email', 'Rol', 'Estado', 'Tenant/Condominio', 'Fecha Registro'),
+        key=User.id, descending=True, query=_users_query, format_row=_user_row,
+        file_name=lambda params, today: f"reporte_usuarios_global_{today}.csv",
+    ),
+    'signatures': ExportDefinition(
+        title="Firmas de apoyo",
+        header=('Nombre Completo', 'Cédula', 'Teléfono', 'Fecha de Firma', 'IP'),
+        key=ResidentSignature.id, descending=False, query=_signatures_query, format_row=_signature_row,
+        file_name=lambda params, today: f"firmas_{params.get('title', params['document_id'])}.csv".replace(' ', '_'),
+    ),
+}
+
+
+def exports_dir(app):
+    return app.config.get('EXPORTS_DIR') or os.path.join(app.instance_path, 'exports')
+
+
+class ExportWorker:
+    """Pool de hilos del proceso. Los jobs que se pierden con el proceso los marca collect_garbage()."""
+
+    def __init__(self):
+        self._executor = None
+        self._lock = threading.Lock()
+        self._futures = set()
+
+    def submit(self, app, job_id):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=app.config.get('EXPORT_WORKERS', 2),
+                                                    thread_name_prefix='export')
+            future = self._executor.submit(self._run, app, job_id)
+            self._futures.add(future)
+        future.add_done_callback(self._futures.discard)
+        return future
+
+    @staticmethod
+    def _run(app, job_id):
+        # Contexto de aplicación propio: sesión propia y sin tenant (los filtros van en la consulta)
+        with app.app_context():
+            try:
+                ExportService.run_job(job_id)
+            except Exception:
+                logger.exception("Job de exportación falló", job_id=job_id)
+            finally:
+                db.session.remove()
+
+    def wait(self, timeout=None):
+        """Espera los jobs en curso de este proceso (tests y comandos CLI)."""
+        for future in list(self._futures):
+            future.result(timeout=timeout)
+
+
+export_worker = ExportWorker()
+
+
+class ExportService:
+
+    @staticmethod
+    def enqueue(kind, params, user, condominium_id=None):
+        """Crea el job y lo entrega al pool; retorna el ExportJob en estado PENDING."""
+        if kind not in EXPORTS:
+            raise ValueError(f"Exportación desconocida: {kind}")
+        ExportService.collect_garbage()
+
+        job = ExportJob(kind=kind, params=params or {}, status='PENDING', requested_by=user.id,
+                        condominium_id=condominium_id,
+                        file_name=EXPORTS[kind].file_name(params or {}, datetime.now().strftime('%Y%m%d')))
+        db.session.add(job)
+        db.session.commit()
+        export_worker.submit(current_app._get_current_object(), job.id)
+        logger.info("Exportación encolada", job_id=job.id, kind=kind, user_id=user.id)
+        return job
+
+    @staticmethod
+    def _iter_rows(job, definition, batch_size):
+        """Filas formateadas, por lotes de keyset; tras cada lote guarda el avance del job."""
+        last = None
+        while True:
+            statement = definition.query(job.params)
+            if last is not None:
+                statement = statement.where(definition.key < last if definition.descending else definition.key > last)
+            order = definition.key.desc() if definition.descending else definition.key.asc()
+            rows = db.session.execute(statement.order_by(order).limit(batch_size)).all()
+            for row in rows:
+                yield definition.format_row(row)
+            if not rows:
+                return
+            last = rows[-1][0]
+            ExportService._heartbeat(job.id, rows_written=job.rows_written + len(rows))
+            if len(rows) < batch_size:
+                return
+
+    @staticmethod
+    def _heartbeat(job_id, **values):
+        """
+        Guarda el avance (y toca updated_at) solo si el job sigue RUNNING; si collect_garbage()
+        ya lo marcó FAILED levanta ExportInterrupted y el worker deja de escribir.
+        """
+        updated = db.session.execute(
+            update(ExportJob)
+            .where(ExportJob.id == job_id, ExportJob.status == 'RUNNING')
+            .values(updated_at=datetime.utcnow(), **values)
+        ).rowcount
+        db.session.commit()
+        if not updated:
+            raise ExportInterrupted(job_id)
+
+    @staticmethod
+    def run_job(job_id):
+        app = current_app
+        job = db.session.get(ExportJob, job_id)
+        if job is None or job.status != 'PENDING':
+            return
+        definition = EXPORTS[job.kind]
+
+        job.status = 'RUNNING'
+        job.started_at = datetime.utcnow()
+        job.total_rows = db.session.execute(
+            select(func.count()).select_from(definition.query(job.params).subquery())
+        ).scalar()
+        db.session.commit()
+
+        directory = exports_dir(app)
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{job.id}-{secrets.token_hex(8)}.csv")
+        partial = path + '.part'
+        try:
+            with open(partial, 'wb') as f:
+                rows = ExportService._iter_rows(job, definition, app.config.get('EXPORT_BATCH_SIZE', 5000))
+                for chunk in iter_csv(definition.header, rows):
+                    f.write(chunk)
+            os.replace(partial, path)
+            now = datetime.utcnow()
+            ExportService._heartbeat(
+                job_id, status='DONE', file_path=path, file_size=os.path.getsize(path), finished_at=now,
+                expires_at=now + timedelta(hours=app.config.get('EXPORT_RETENTION_HOURS', 24))
+            )
+        except ExportInterrupted:
+            db.session.rollback()
+            for leftover in (partial, path):
+                if os.path.exists(leftover):
+                    os.remove(leftover)
+            logger.warning("Exportación abandonada: el job ya no está en curso", job_id=job_id)
+            return
+        except Exception as e:
+            db.session.rollback()
+            for leftover in (partial, path):
+                if os.path.exists(leftover):
+                    os.remove(leftover)
+            job = db.session.get(ExportJob, job_id)
+            job.status = 'FAILED'
+            job.error = str(e)
+            job.finished_at = datetime.utcnow()
+            db.session.commit()
+            logger.error("Exportación fallida", job_id=job_id, error=str(e))
+            return
+
+        job = db.session.get(ExportJob, job_id)
+        logger.info("Exportación terminada", job_id=job.id, rows=job.rows_written,
+                    seconds=round((now - job.started_at).total_seconds(), 1))
+
+    # --- Descarga ---
+
+    @staticmethod
+    def _serializer():
+        return URLSafeTimedSerializer(current_app.secret_key, salt='export-download')
+
+    @staticmethod
+    def download_url(job):
+        token = ExportService._serializer().dumps(job.id)
+        return url_for('exports.download', token=token)
+
+    @staticmethod
+    def job_for_token(token):
+        """ExportJob del enlace firmado, o None si la firma es inválida o el enlace venció."""
+        try:
+            job_id = ExportService._serializer().loads(token, max_age=current_app.config.get('EXPORT_LINK_TTL', 3600))
+        except BadSignature:  # Incluye SignatureExpired
+            return None
+        return db.session.get(ExportJob, job_id)
+
+    @staticmethod
+    def can_access(job, user):
+        return job is not None and (job.requested_by == user.id or user.role == 'MASTER')
+
+    @staticmethod
+    def status_payload(job):
+        payload = {
+            'id': job.id,
+            'kind': job.kind,
+            'title': EXPORTS[job.kind].title,
+            'status': job.status,
+            'rows_written': job.rows_written,
+            'total_rows': job.total_rows,
+            'progress': job.progress,
+            'error': job.error,
+            'download_url': None,
+        }
+        if job.status == 'DONE':
+            payload['download_url'] = ExportService.download_url(job)
+            payload['file_size'] = job.file_size
+            payload['expires_at'] = job.expires_at.isoformat(timespec='seconds')
+        return payload
+
+    # --- Limpieza ---
+
+    @staticmethod
+    def collect_garbage(now=None):
+        """
+        Borra los archivos de jobs vencidos (EXPIRED) y marca FAILED los jobs PENDING/RUNNING
+        sin latido (updated_at) en EXPORT_STALE_MINUTES: el proceso que los tenía terminó.
+        Un job largo que sigue escribiendo lotes no se toca.
+        Retorna (archivos borrados, jobs interrumpidos).
+        """
+        now = now or datetime.utcnow()
+        expired = ExportJob.query.execution_options(skip_tenant_filter=True).filter(
+            ExportJob.status == 'DONE', ExportJob.expires_at <= now
+        ).all()
+        for job in expired:
+            if job.file_path and os.path.exists(job.file_path):
+                os.remove(job.file_path)
+            job.status = 'EXPIRED'
+            job.file_path = None
+
+        stale_before = now - timedelta(minutes=current_app.config.get('EXPORT_STALE_MINUTES', 60))
+        stale = ExportJob.query.execution_options(skip_tenant_filter=True).filter(
+            ExportJob.status.in_(ACTIVE_STATUSES),
+            func.coalesce(ExportJob.updated_at, ExportJob.started_at, ExportJob.created_at) <= stale_before
+        ).all()
+        for job in stale:
+            job.status = 'FAILED'
+            job.error = "La exportación se interrumpió."
+            job.finished_at = now
+
+        if expired or stale:
+            db.session.commit()
+        return len(expired), len(stale)
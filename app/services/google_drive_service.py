@@ -5,6 +5,7 @@ from google_auth_oauthlib.flow import Flow
 from googleapiclient.discovery import build
 from googleapiclient.http import MediaIoBaseUpload
 from flask import current_app, url_for
+from app.timing import timed
 
 class GoogleDriveService:
     SCOPES = ['https://www.googleapis.com/auth/drive.file']
@@ -63,7 +64,8 @@ class GoogleDriveService:
         flow.redirect_uri = self.redirect_uri
         
         # Canjear código
-        flow.fetch_token(code=auth_code)
+        with timed('http'):
+            flow.fetch_token(code=auth_code)
         creds = flow.credentials
         
         # Servicio de Drive
@@ -75,7 +77,8 @@ class GoogleDriveService:
             'name': folder_name,
             'mimeType': 'application/vnd.google-apps.folder'
         }
-        root_file = service.files().create(body=root_metadata, fields='id').execute()
+        with timed('http'):
+            root_file = service.files().create(body=root_metadata, fields='id').execute()
         root_id = root_file.get('id')
         
         # 2. Crear Subcarpetas
@@ -86,7 +89,8 @@ class GoogleDriveService:
                 'mimeType': 'application/vnd.google-apps.folder',
                 'parents': [root_id]
             }
-            file = service.files().create(body=file_metadata, fields='id').execute()
+            with timed('http'):
+                file = service.files().create(body=file_metadata, fields='id').execute()
             folders_map[subfolder_name] = file.get('id')
             
         # 3. Obtener email (opcional, para registro)
@@ -134,11 +138,12 @@ class GoogleDriveService:
         
         media = MediaIoBaseUpload(file_stream, mimetype=mime_type, resumable=True)
         
-        file = service.files().create(
-            body=file_metadata,
-            media_body=media,
-            fields='id, webViewLink, webContentLink'
-        ).execute()
+        with timed('http'):
+            file = service.files().create(
+                body=file_metadata,
+                media_body=media,
+                fields='id, webViewLink, webContentLink'
+            ).execute()
         
         return file
 
@@ -152,11 +157,12 @@ class GoogleDriveService:
             return []
             
         query = f"'{folder_id}' in parents and trashed = false"
-        results = service.files().list(
-            q=query,
-            pageSize=50,
-            fields="nextPageToken, files(id, name, webViewLink, thumbnailLink)"
-        ).execute()
+        with timed('http'):
+            results = service.files().list(
+                q=query,
+                pageSize=50,
+                fields="nextPageToken, files(id, name, webViewLink, thumbnailLink)"
+            ).execute()
         
         return results.get('files', [])
 
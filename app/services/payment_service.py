@@ -1,9 +1,10 @@
 from app import db
-from app.models import Payment, Condominium
+from app.models import Payment, PaymentCallbackAttempt, Condominium
 from app.utils.validation import validate_file, validate_amount
 from werkzeug.utils import secure_filename
+from sqlalchemy import and_, or_, update
 import os
-from datetime import datetime
+from datetime import datetime, timedelta
 from flask import current_app
 import uuid
 from app.services.payphone import PayPhoneService
@@ -12,6 +13,11 @@ import structlog
 
 logger = structlog.get_logger()
 
+# Estados que PayPhone ya no cambia: los callbacks repetidos responden con lo guardado
+FINAL_STATUSES = ('APPROVED', 'CANCELED', 'REJECTED')
+# Una confirmación reclamada hace más de esto (proceso caído) puede reclamarse de nuevo
+CONFIRM_CLAIM_TTL = timedelta(seconds=60)
+
 class PaymentService:
     @staticmethod
     def report_manual_payment(user_id, condo_id, form_data, file):
@@ -134,18 +140,65 @@ class PaymentService:
         
         return response.get('payWithCard')
 
+    @staticmethod
+    def claim_confirmation(payment_id):
+        """
+        Marca el pago como CONFIRMING solo si nadie más lo está confirmando.
+        UPDATE condicional atómico (compare-and-set): de varios callbacks simultáneos
+        exactamente uno obtiene rowcount 1 y consulta a PayPhone.
+        Retorna el updated_at del reclamo (None si no se obtuvo); el llamador hace commit.
+        """
+        now = datetime.utcnow()
+        # Por la conexión y no por session.execute: PENDING/CONFIRMING no afectan contadores
+        # y un UPDATE masivo del ORM los invalidaría (ver app.services.counters)
+        claimed = db.session.connection().execute(
+            update(Payment.__table__)
+            .where(Payment.__table__.c.id == payment_id, or_(
+                Payment.__table__.c.status == 'PENDING',
+                and_(Payment.__table__.c.status == 'CONFIRMING',
+                     Payment.__table__.c.updated_at < now - CONFIRM_CLAIM_TTL),
+            ))
+            .values(status='CONFIRMING', updated_at=now)
+        ).rowcount == 1
+        return now if claimed else None
+
+    @staticmethod
+    def _claim_confirmation(payment):
+        claimed = PaymentService.claim_confirmation(payment.id) is not None
+        db.session.commit()
+        db.session.refresh(payment)
+        return claimed
+
+    @staticmethod
+    def _record_callback(payment, payphone_id, outcome, remote_status=None):
+        db.session.add(PaymentCallbackAttempt(
+            payment_id=payment.id, condominium_id=payment.condominium_id,
+            payphone_id=str(payphone_id), outcome=outcome, remote_status=remote_status
+        ))
+
     @staticmethod
     def process_payphone_callback(payment_id, client_tx_id):
         """
-        Procesa la respuesta de PayPhone.
+        Procesa la respuesta de PayPhone de forma idempotente.
+        Solo el primer callback de una ráfaga consulta a la pasarela; los demás responden
+        con el estado guardado (response_json es la respuesta cacheada). Cada callback
+        queda registrado en PaymentCallbackAttempt.
         """
         payment = Payment.query.filter_by(client_transaction_id=client_tx_id).first()
         if not payment:
             raise ResourceNotFoundError("Transacción no encontrada.")
             
-        if payment.status == 'APPROVED':
+        if payment.status in FINAL_STATUSES:
+            PaymentService._record_callback(payment, payment_id, 'DUPLICATE')
+            db.session.commit()
             return payment # Ya procesado
 
+        if not PaymentService._claim_confirmation(payment):
+            # Otro callback lo está confirmando (o acaba de terminar): no repetir la consulta
+            PaymentService._record_callback(payment, payment_id, 'IN_FLIGHT')
+            db.session.commit()
+            return payment
+
         condominium = Condominium.query.get(payment.condominium_id)
         payphone = PayPhoneService(condominium)
         
@@ -153,10 +206,15 @@ class PaymentService:
             verification = payphone.confirm_payment(payment_id, client_tx_id)
         except Exception as e:
             logger.error("PayPhone confirm_payment error", error=str(e), payment_id=payment_id)
+            # Liberar el reclamo para que el siguiente callback reintente
+            payment.status = 'PENDING'
+            PaymentService._record_callback(payment, payment_id, 'ERROR')
+            db.session.commit()
             raise PaymentError("Error al verificar el pago con la pasarela.")
         
         status = verification.get('transactionStatus')
         payment.response_json = verification
+        PaymentService._record_callback(payment, payment_id, 'CONFIRMED', remote_status=status)
         
         if status == 'Approved':
             payment.status = 'APPROVED'
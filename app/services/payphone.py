@@ -1,5 +1,8 @@
 import requests
 from flask import current_app
+from app.http_client import http_client
+
+payphone_http = http_client('payphone', timeout=10)
 
 class PayPhoneService:
     """
@@ -69,7 +72,8 @@ class PayPhoneService:
         }
         
         try:
-            response = requests.post(url, json=payload, headers=self._get_headers(), timeout=10)
+            # Sin reintentos: crea la transacción en PayPhone
+            response = payphone_http.post(url, json=payload, headers=self._get_headers())
             response.raise_for_status()
             return response.json() # Retorna { "paymentId": 123, "payWithCard": "https://..." }
         except requests.exceptions.RequestException as e:
@@ -78,9 +82,10 @@ class PayPhoneService:
                  current_app.logger.error(f"PayPhone Response Body: {e.response.text}")
             raise e
 
-    def confirm_payment(self, payment_id, client_tx_id):
+    def confirm_payment(self, payment_id, client_tx_id, retry=True):
         """
         Verifica el estado final del pago usando el ID devuelto por PayPhone.
+        retry=False desactiva los reintentos del cliente HTTP (el llamador limita el ritmo).
         """
         url = f"{self.BASE_URL}/button/Confirm"
         
@@ -90,7 +95,8 @@ class PayPhoneService:
         }
         
         try:
-            response = requests.post(url, json=payload, headers=self._get_headers(), timeout=10)
+            # Solo consulta el estado: se puede reintentar
+            response = payphone_http.post(url, json=payload, headers=self._get_headers(), idempotent=retry)
             response.raise_for_status()
             return response.json() # Retorna estado de la transacción
         except requests.exceptions.RequestException as e:
@@ -0,0 +1,136 @@
+"""
+Caja chica por períodos mensuales.
+
+Cada mes cerrado guarda una fila PettyCashPeriod (saldo inicial, ingresos, egresos,
+saldo final) y queda sellado: no admite movimientos con fecha dentro de él. El saldo
+actual es el saldo final del último cierre más un SUM indexado de los movimientos del
+período abierto, así que no depende de cuántos movimientos históricos existen.
+
+Los meses vencidos se cierran con 'flask petty-cash close' (programado a inicio de mes)
+o desde el panel; sin cierre el saldo sigue siendo correcto, solo suma más movimientos.
+"""
+from datetime import date, datetime, time
+from decimal import Decimal
+
+from sqlalchemy import case, func, select
+
+from app.extensions import db
+from app.exceptions import BusinessError
+from app.models import Condominium, PettyCashPeriod, PettyCashTransaction
+
+
+def _month_start(day):
+    return day.replace(day=1)
+
+
+def _next_month(day):
+    return date(day.year + day.month // 12, day.month % 12 + 1, 1)
+
+
+def _at_midnight(day):
+    return datetime.combine(day, time.min)
+
+
+class PettyCashService:
+    @staticmethod
+    def last_period(condominium_id):
+        """Último período cerrado del condominio (o None)."""
+        return db.session.execute(
+            select(PettyCashPeriod)
+            .where(PettyCashPeriod.condominium_id == condominium_id)
+            .order_by(PettyCashPeriod.period_start.desc())
+            .limit(1)
+        ).scalar()
+
+    @staticmethod
+    def movements(condominium_id, since=None, until=None):
+        """Ingresos, egresos y número de movimientos con fecha en [since, until) (fechas, opcionales)."""
+        amount = PettyCashTransaction.amount
+        statement = select(
+            func.coalesce(func.sum(case((amount > 0, amount), else_=0)), 0),
+            func.coalesce(func.sum(case((amount < 0, amount), else_=0)), 0),
+            func.count(PettyCashTransaction.id),
+        ).where(PettyCashTransaction.condominium_id == condominium_id)
+        if since is not None:
+            statement = statement.where(PettyCashTransaction.transaction_date >= _at_midnight(since))
+        if until is not None:
+            statement = statement.where(PettyCashTransaction.transaction_date < _at_midnight(until))
+        income, expenses, count = db.session.execute(statement).one()
+        return {'income': Decimal(str(income)), 'expenses': Decimal(str(expenses)), 'transactions': count}
+
+    @staticmethod
+    def balance(condominium_id, last_period=None):
+        """Saldo actual: cierre anterior + movimientos del período abierto."""
+        last_period = last_period or PettyCashService.last_period(condominium_id)
+        opening = last_period.closing_balance if last_period else Decimal('0')
+        since = last_period.period_end if last_period else None
+        open_period = PettyCashService.movements(condominium_id, since=since)
+        return opening + open_period['income'] + open_period['expenses']
+
+    @staticmethod
+    def _lock(condominium_id):
+        # Serializa cierres y registros del mismo condominio (FOR UPDATE no aplica en SQLite)
+        db.session.execute(select(Condominium.id).where(Condominium.id == condominium_id).with_for_update())
+
+    @staticmethod
+    def ensure_open(condominium_id, transaction_date):
+        """BusinessError si la fecha cae en un período ya cerrado. Llamar antes de registrar el movimiento."""
+        PettyCashService._lock(condominium_id)
+        last_period = PettyCashService.last_period(condominium_id)
+        if last_period and transaction_date < _at_midnight(last_period.period_end):
+            raise BusinessError(
+                f"El período hasta {last_period.period_end.strftime('%d/%m/%Y')} está cerrado; "
+                "registra el movimiento con una fecha posterior."
+            )
+
+    @staticmethod
+    def close_periods(condominium_id, user_id, today=None):
+        """
+        Cierra, mes a mes, todos los meses completos aún abiertos (anteriores al mes de 'today').
+        Retorna los períodos creados; hace commit. 'user_id' es None en el cierre automático.
+        """
+        current_month = _month_start(today or datetime.utcnow().date())
+        PettyCashService._lock(condominium_id)
+        last_period = PettyCashService.last_period(condominium_id)
+
+        if last_period:
+            start, opening = last_period.period_end, last_period.closing_balance
+        else:
+            first = db.session.execute(
+                select(func.min(PettyCashTransaction.transaction_date))
+                .where(PettyCashTransaction.condominium_id == condominium_id)
+            ).scalar()
+            if first is None:
+                db.session.rollback()
+                return []
+            start, opening = _month_start(first.date()), Decimal('0')
+
+        periods = []
+        while start < current_month:
+            end = _next_month(start)
+            totals = PettyCashService.movements(condominium_id, since=start, until=end)
+            closing = opening + totals['income'] + totals['expenses']
+            period = PettyCashPeriod(
+                condominium_id=condominium_id, period_start=start, period_end=end,
+                opening_balance=opening, income=totals['income'], expenses=totals['expenses'],
+                closing_balance=closing, transaction_count=totals['transactions'], closed_by=user_id,
+            )
+            db.session.add(period)
+            periods.append(period)
+            start, opening = end, closing
+
+        db.session.commit()
+        return periods
+
+    @staticmethod
+    def close_all_periods(today=None):
+        """Cierre automático de los meses vencidos de todos los condominios con movimientos: {condominio: períodos}."""
+        condominium_ids = db.session.execute(
+            select(PettyCashTransaction.condominium_id).distinct()
+            .order_by(PettyCashTransaction.condominium_id)
+            .execution_options(skip_tenant_filter=True)
+        ).scalars().all()
+        return {
+            condominium_id: PettyCashService.close_periods(condominium_id, None, today=today)
+            for condominium_id in condominium_ids
+        }
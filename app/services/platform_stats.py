@@ -0,0 +1,123 @@
+"""
+Indicadores globales materializados en la tabla platform_stats.
+
+Las páginas del MASTER leen una fila por indicador en vez de recontar toda la
+plataforma. Los hooks de app.services.counters mantienen los valores al día en la
+misma transacción que los cambios; los indicadores invalidados (value NULL) o ausentes
+(tras la migración) se recalculan con los reportes de app.services.report_definitions.
+"""
+from datetime import datetime
+
+from sqlalchemy import case, insert, select, update
+from sqlalchemy.exc import IntegrityError
+
+from app.extensions import db
+from app.models import Condominium, Document, Payment, PlatformStat, Unit, User
+from app.services.counters import Counter, CounterStore, register_store, wrote_in_transaction
+from app.services.report_definitions import PLATFORM_KPIS, PLATFORM_TOTALS, PRODUCTION_ENVIRONMENTS
+
+# Cambiar el entorno o el subdominio de un condominio cambia a quién cuentan estos indicadores
+_CONDOMINIUM_DEPENDENCY = ((Condominium, ('environment', 'subdomain')),)
+
+
+def _in_production(lookup, **condominium):
+    return lookup.environment(**condominium) in PRODUCTION_ENVIRONMENTS
+
+
+# Mismas reglas que las columnas de PLATFORM_KPIS / PLATFORM_TOTALS (el recálculo completo)
+PLATFORM_COUNTERS = (
+    Counter('total_condos', Condominium, ('environment',),
+            lambda v, lookup: v['environment'] in PRODUCTION_ENVIRONMENTS),
+    Counter('active_condos', Condominium, ('environment', 'status'),
+            lambda v, lookup: v['environment'] in PRODUCTION_ENVIRONMENTS and v['status'] == 'ACTIVO'),
+    Counter('total_users', User, ('tenant',),
+            lambda v, lookup: v['tenant'] is not None and _in_production(lookup, subdomain=v['tenant']),
+            depends_on=_CONDOMINIUM_DEPENDENCY),
+    Counter('management_users', User, ('role',),
+            lambda v, lookup: v['role'] in ('ADMIN', 'MASTER')),
+    Counter('pending_payments', Payment, ('condominium_id', 'status'),
+            lambda v, lookup: v['status'] == 'PENDING_REVIEW' and _in_production(lookup, condominium_id=v['condominium_id']),
+            depends_on=_CONDOMINIUM_DEPENDENCY),
+    Counter('total_docs', Document, ('condominium_id',),
+            lambda v, lookup: _in_production(lookup, condominium_id=v['condominium_id']),
+            depends_on=_CONDOMINIUM_DEPENDENCY),
+    Counter('total_condominios', Condominium, (), lambda v, lookup: True),
+    Counter('total_usuarios', User, (), lambda v, lookup: True),
+    Counter('usuarios_pendientes', User, ('status',), lambda v, lookup: v['status'] == 'pending'),
+    Counter('unidades_totales', Unit, (), lambda v, lookup: True),
+)
+
+STAT_KEYS = tuple(counter.name for counter in PLATFORM_COUNTERS)
+
+
+class PlatformStatsService(CounterStore):
+    counters = PLATFORM_COUNTERS
+
+    def apply(self, connection, deltas):
+        table = PlatformStat.__table__
+        now = datetime.utcnow()
+        totals = {}
+        for (_, key, _), delta in deltas.items():
+            totals[key] = totals.get(key, 0) + delta
+        # Todas las escrituras de la plataforma tocan estas mismas filas: orden fijo de bloqueo
+        for key, delta in sorted(totals.items()):
+            if not delta:
+                continue
+            # Sin fila o con valor NULL (invalidado) no hay nada que sumar: se recalcula al leer
+            connection.execute(
+                update(table).where(table.c.key == key).values(value=table.c.value + delta, updated_at=now)
+            )
+
+    def invalidate(self, connection, counters, condominium_id=None):
+        table = PlatformStat.__table__
+        # NULL en vez de borrar: la fila queda para que rebuild() la bloquee antes de contar
+        connection.execute(
+            update(table).where(table.c.key.in_(sorted(counter.name for counter in counters)))
+            .values(value=None, updated_at=datetime.utcnow())
+        )
+
+    def snapshot(self):
+        """
+        Todos los indicadores como dict. Lee platform_stats; si falta alguno lo
+        recalcula (y lo guarda) antes de responder.
+        """
+        stats = dict(db.session.execute(select(PlatformStat.key, PlatformStat.value)).all())
+        if any(stats.get(key) is None for key in STAT_KEYS):
+            stats = self.rebuild()
+        return stats
+
+    def rebuild(self):
+        """
+        Recalcula con COUNT(*) (dos sentencias) y reescribe platform_stats en una transacción
+        propia: no confirma ni descarta la del llamador. Retorna los valores.
+        Las filas se bloquean (en el orden de apply) antes de contar: un delta concurrente o ya
+        está confirmado y entra en el conteo, o espera y se suma sobre el valor recalculado.
+        Si la sesión ya escribió en esta transacción solo se cuenta (ver tenant_counters.rebuild).
+        """
+        if wrote_in_transaction(db.session):
+            stats = {**PLATFORM_KPIS.one(), **PLATFORM_TOTALS.one()}
+            return {key: stats[key] for key in STAT_KEYS}
+        table = PlatformStat.__table__
+        try:
+            with db.engine.begin() as connection:
+                existing = set(connection.execute(
+                    select(table.c.key).order_by(table.c.key).with_for_update()
+                ).scalars())
+                stats = {**PLATFORM_KPIS.one(connection), **PLATFORM_TOTALS.one(connection)}
+                now = datetime.utcnow()
+                if existing:
+                    connection.execute(
+                        update(table).where(table.c.key.in_(sorted(existing)))
+                        .values(value=case({key: stats[key] for key in STAT_KEYS}, value=table.c.key), updated_at=now)
+                    )
+                missing = [key for key in STAT_KEYS if key not in existing]
+                if missing:
+                    connection.execute(insert(table), [{'key': key, 'value': stats[key], 'updated_at': now}
+                                                       for key in missing])
+        except IntegrityError:
+            # Otro request creó las filas al mismo tiempo (primera lectura tras la migración)
+            pass
+        return {key: stats[key] for key in STAT_KEYS}
+
+
+platform_stats = register_store(PlatformStatsService())
@@ -0,0 +1,246 @@
+"""
+Conciliación de pagos PayPhone abandonados.
+
+Un pago queda PENDING si el usuario nunca vuelve a /pagos/callback (o CONFIRMING si el
+proceso que lo confirmaba se cayó). La conciliación busca esos pagos en todos los
+condominios, los agrupa por condominio (cada uno usa el token de su payment_config) y los
+confirma con la API Confirm desde un pool acotado de hilos, con un límite de consultas por
+segundo por condominio. Cada pago se reclama como los callbacks (compare-and-set a
+CONFIRMING) antes de entrar al pool, así un callback simultáneo no lo consulta dos veces.
+Los resultados se escriben por lotes: un commit cada 'batch_size' pagos.
+"""
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timedelta
+from itertools import zip_longest
+
+import structlog
+from flask import current_app
+from sqlalchemy import and_, or_, select
+
+from app.extensions import db
+from app.models import Condominium, Payment, PaymentCallbackAttempt
+from app.services.payment_service import CONFIRM_CLAIM_TTL, PaymentService
+from app.services.payphone import PayPhoneService
+
+logger = structlog.get_logger()
+
+# transactionStatus de PayPhone que cierran el pago. Cualquier otro (p.ej. 'Pending')
+# deja el pago como está para la próxima corrida.
+REMOTE_STATUSES = {'Approved': 'APPROVED', 'Canceled': 'CANCELED', 'Rejected': 'REJECTED'}
+
+
+class RateLimiter:
+    """Espaciado mínimo entre llamadas, compartido por hilos: 'rate' llamadas por segundo (0 = sin límite)."""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+@dataclass
+class ReconcileReport:
+    total: int = 0
+    processed: int = 0
+    updated: dict = field(default_factory=lambda: defaultdict(int)) # estado final -> pagos
+    unchanged: int = 0 # PayPhone aún no lo da por terminado
+    skipped: int = 0 # condominio sin token o reclamado/resuelto por un callback
+    errors: int = 0
+    started: float = field(default_factory=time.perf_counter)
+    elapsed: float = 0.0
+
+    @property
+    def throughput(self):
+        """Pagos consultados por segundo."""
+        return self.processed / self.elapsed if self.elapsed else 0.0
+
+    def tick(self):
+        self.elapsed = time.perf_counter() - self.started
+
+
+@dataclass(frozen=True)
+class StalePayment:
+    id: int
+    condominium_id: int
+    payphone_id: str
+    client_transaction_id: str
+    claimed_at: datetime = None # updated_at del reclamo CONFIRMING de esta corrida
+
+
+def _confirm(app, payphone, limiter, payment):
+    """Corre en un hilo del pool: solo HTTP, sin tocar la sesión."""
+    limiter.wait()
+    # confirm_payment registra errores con current_app.logger
+    with app.app_context():
+        try:
+            # Sin reintentos del cliente HTTP: no pasarían por el limitador. Un error deja el
+            # pago PENDING para la próxima corrida
+            return payment, payphone.confirm_payment(payment.payphone_id, payment.client_transaction_id,
+                                                     retry=False), None
+        except Exception as e:
+            return payment, None, e
+
+
+class ReconciliationService:
+
+    @staticmethod
+    def stale_payments(older_than, limit=None):
+        """
+        Pagos PayPhone creados antes de 'older_than', de todos los condominios: PENDING, o
+        CONFIRMING con el reclamo vencido (el proceso que lo confirmaba se cayó).
+        """
+        now = datetime.utcnow()
+        statement = (
+            select(Payment.id, Payment.condominium_id, Payment.payphone_transaction_id, Payment.client_transaction_id)
+            .where(or_(Payment.status == 'PENDING',
+                       and_(Payment.status == 'CONFIRMING', Payment.updated_at < now - CONFIRM_CLAIM_TTL)),
+                   Payment.payphone_transaction_id.isnot(None), Payment.created_at < now - older_than)
+            .order_by(Payment.condominium_id, Payment.id)
+            .execution_options(skip_tenant_filter=True)
+        )
+        if limit:
+            statement = statement.limit(limit)
+        return [StalePayment(*row) for row in db.session.execute(statement)]
+
+    @staticmethod
+    def _claim(stale):
+        """Reclama el pago para esta corrida (mismo compare-and-set que los callbacks); None si otro lo tiene."""
+        claimed_at = PaymentService.claim_confirmation(stale.id)
+        db.session.commit()
+        return replace(stale, claimed_at=claimed_at) if claimed_at else None
+
+    @staticmethod
+    def _write_back(results, report):
+        """
+        Aplica un lote de respuestas y hace UN commit. Solo toca pagos que siguen con el
+        reclamo de esta corrida; los que no quedan en un estado final vuelven a PENDING.
+        """
+        current = {
+            payment.id: payment for payment in Payment.query.execution_options(skip_tenant_filter=True)
+            .filter(Payment.id.in_([stale.id for stale, _, _ in results]), Payment.status == 'CONFIRMING')
+            .with_for_update()
+        }
+        for stale, verification, error in results:
+            report.processed += 1
+            payment = current.get(stale.id)
+            if payment is None or payment.updated_at != stale.claimed_at:
+                report.skipped += 1 # El reclamo venció y un callback lo tomó
+                continue
+            if error is not None:
+                report.errors += 1
+                logger.warning("Conciliación: error al confirmar", payment_id=stale.id, error=str(error))
+                outcome, remote_status = 'ERROR', None
+                payment.status = 'PENDING'
+            else:
+                remote_status = verification.get('transactionStatus')
+                outcome = 'RECONCILED'
+                status = REMOTE_STATUSES.get(remote_status)
+                if status is None:
+                    report.unchanged += 1
+                    payment.status = 'PENDING'
+                else:
+                    payment.status = status
+                    payment.response_json = verification
+                    report.updated[status] += 1
+            db.session.add(PaymentCallbackAttempt(
+                payment_id=payment.id, condominium_id=payment.condominium_id, payphone_id=stale.payphone_id,
+                outcome=outcome, remote_status=remote_status
+            ))
+        db.session.commit()
+        report.tick()
+
+    @staticmethod
+    def reconcile(older_than=None, workers=None, rate=None, batch_size=None, limit=None, progress=None):
+        """
+        Concilia los pagos abandonados. 'progress(report)' se llama tras cada lote.
+        Los parámetros omitidos salen de la configuración RECONCILE_*.
+        """
+        app = current_app._get_current_object()
+        config = app.config
+        older_than = older_than if older_than is not None else timedelta(minutes=config['RECONCILE_STALE_MINUTES'])
+        workers = workers or config['RECONCILE_WORKERS']
+        rate = rate if rate is not None else config['RECONCILE_RATE_PER_TENANT']
+        batch_size = batch_size or config['RECONCILE_BATCH_SIZE']
+
+        stale = ReconciliationService.stale_payments(older_than, limit=limit)
+        report = ReconcileReport(total=len(stale))
+        by_condominium = defaultdict(list)
+        for payment in stale:
+            by_condominium[payment.condominium_id].append(payment)
+
+        condominiums = {
+            condo.id: condo for condo in Condominium.query.execution_options(skip_tenant_filter=True)
+            .filter(Condominium.id.in_(list(by_condominium)))
+        }
+        queues = []
+        for condominium_id, payments in by_condominium.items():
+            condo = condominiums.get(condominium_id)
+            payphone = PayPhoneService(condo) if condo else None
+            if payphone is None or not payphone.token:
+                report.skipped += len(payments)
+                report.processed += len(payments)
+                logger.warning("Conciliación: condominio sin token de PayPhone",
+                               condominium_id=condominium_id, payments=len(payments))
+                continue
+            limiter = RateLimiter(rate)
+            queues.append([(payphone, limiter, payment) for payment in payments])
+
+        # Intercalados por condominio: el límite de uno no deja ociosos los hilos de los demás
+        tasks = [task for group in zip_longest(*queues) for task in group if task is not None]
+        db.session.commit() # No retener la transacción de lectura mientras se consulta la pasarela
+
+        pending = iter(tasks)
+        in_flight = set()
+        batch, batch_started = [], None
+        flush_after = CONFIRM_CLAIM_TTL.total_seconds() / 2
+
+        def submit_next(executor):
+            """Reclama y envía al pool el siguiente pago; False si no quedan."""
+            for payphone, limiter, payment in pending:
+                claimed = ReconciliationService._claim(payment)
+                if claimed is None:
+                    report.processed += 1
+                    report.skipped += 1 # Un callback lo está confirmando o ya lo resolvió
+                    continue
+                in_flight.add(executor.submit(_confirm, app, payphone, limiter, claimed))
+                return True
+            return False
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='reconcile') as executor:
+            # Solo se reclaman los pagos que un hilo puede tomar ya: un reclamo en cola podría vencer
+            while len(in_flight) < workers and submit_next(executor):
+                pass
+            while in_flight:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    batch.append(future.result())
+                    batch_started = batch_started or time.monotonic()
+                    submit_next(executor)
+                # Escribir antes de que venza el reclamo de los pagos del lote
+                if len(batch) >= batch_size or time.monotonic() - batch_started >= flush_after:
+                    ReconciliationService._write_back(batch, report)
+                    batch, batch_started = [], None
+                    if progress:
+                        progress(report)
+        if batch:
+            ReconciliationService._write_back(batch, report)
+        report.tick()
+        if progress and (batch or not tasks):
+            progress(report)
+
+        logger.info("Conciliación de pagos terminada", total=report.total, updated=dict(report.updated),
+                    unchanged=report.unchanged, skipped=report.skipped, errors=report.errors,
+                    seconds=round(report.elapsed, 2), per_second=round(report.throughput, 1))
+        return report
@@ -0,0 +1,104 @@
+"""
+Reportes de la plataforma sobre app.services.report_engine.
+"""
+from sqlalchemy import case, func
+
+from app.models import Condominium, Document, Payment, Unit, User
+from app.services.report_engine import Column, Join, Report, count_of
+
+# ✅ REGLA: Las métricas de negocio deben excluir entornos internos/de prueba.
+PRODUCTION_ENVIRONMENTS = ('production', 'demo')
+in_production = Condominium.environment.in_(PRODUCTION_ENVIRONMENTS)
+
+
+def _full_address(main_street, house_number, cross_street, city, country):
+    # Mismo formato que Condominium.get_full_address()
+    parts = [main_street]
+    if house_number:
+        parts.append(f"#{house_number}")
+    parts.append(f"y {cross_street}")
+    parts.append(f"- {city}, {country}")
+    return " ".join(parts)
+
+
+def _active_modules(documents, billing, requests):
+    labels = (("Documentos", documents), ("Cobranza", billing), ("Requerimientos", requests))
+    return ", ".join(label for label, enabled in labels if enabled)
+
+
+PLATFORM_KPIS = Report(
+    name='platform_kpis',
+    title="Indicadores de la plataforma",
+    columns=(
+        Column('total_condos', "Condominios", count_of(Condominium, in_production)),
+        Column('active_condos', "Condominios activos", count_of(Condominium, in_production, Condominium.status == 'ACTIVO')),
+        # Solo usuarios de condominios de producción/demo
+        Column('total_users', "Usuarios", count_of(User, in_production, join=(Condominium, User.tenant == Condominium.subdomain))),
+        # Usuarios con roles de gestión (ADMIN o MASTER)
+        Column('management_users', "Administradores", count_of(User, User.role.in_(('ADMIN', 'MASTER')))),
+        # Métrica de Mora / Deuda (pagos pendientes de revisión)
+        Column('pending_payments', "Pagos por revisar", count_of(
+            Payment, in_production, Payment.status == 'PENDING_REVIEW',
+            join=(Condominium, Payment.condominium_id == Condominium.id))),
+        Column('total_docs', "Documentos", count_of(
+            Document, in_production, join=(Condominium, Document.condominium_id == Condominium.id))),
+    ),
+)
+
+PLATFORM_TOTALS = Report(
+    name='platform_totals',
+    title="Totales de la plataforma",
+    columns=(
+        Column('total_condominios', "Condominios", count_of(Condominium)),
+        Column('total_usuarios', "Usuarios", count_of(User)),
+        Column('usuarios_pendientes', "Usuarios pendientes", count_of(User, User.status == 'pending')),
+        Column('unidades_totales', "Unidades", count_of(Unit)),
+    ),
+)
+
+CONDOMINIUMS_DETAILED = Report(
+    name='condominios',
+    title="Condominios (detallado)",
+    source=Condominium,
+    joins=(Join(User, Condominium.admin_user_id == User.id, outer=True),),
+    columns=(
+        Column('id', "ID", Condominium.id),
+        Column('legal_name', "Nombre Legal", Condominium.legal_name),
+        Column('ruc', "RUC", Condominium.ruc),
+        Column('address', "Dirección Completa",
+               (Condominium.main_street, Condominium.house_number, Condominium.cross_street,
+                Condominium.city, Condominium.country), _full_address),
+        Column('latitude', "Latitud", Condominium.latitude),
+        Column('longitude', "Longitud", Condominium.longitude),
+        Column('admin_cellphone', "Celular Admin", (User.id, User.cellphone),
+               lambda admin_id, cellphone: cellphone if admin_id else 'N/A'),
+        Column('admin_name', "Administrador", (User.id, User.first_name, User.last_name),
+               lambda admin_id, first, last: f"{first} {last}" if admin_id else 'N/A'),
+        Column('status', "Estado", Condominium.status),
+        Column('modules', "Módulos Activos",
+               (Condominium.has_documents_module, Condominium.has_billing_module, Condominium.has_requests_module),
+               _active_modules),
+    ),
+    order_by=(Condominium.name,),
+)
+
+# Una fila por condominio administrado; los ADMIN sin condominio salen como "Sin Asignar"
+ADMINS_BY_CONDOMINIUM = Report(
+    name='administradores',
+    title="Administradores por condominio",
+    source=User,
+    joins=(Join(Condominium, Condominium.admin_user_id == User.id, outer=True),),
+    filters=(User.role == 'ADMIN',),
+    columns=(
+        Column('condominium', "Condominio", func.coalesce(Condominium.name, "Sin Asignar")),
+        Column('ruc', "RUC Condominio", case((Condominium.id.is_(None), "N/A"), else_=Condominium.ruc)),
+        Column('name', "Nombre Admin", (User.first_name, User.last_name), lambda first, last: f"{first} {last}"),
+        Column('email', "Email Admin", User.email),
+        Column('cellphone', "Celular Admin", User.cellphone),
+        Column('cedula', "Cédula Admin", User.cedula),
+    ),
+    order_by=(User.id, Condominium.name),
+)
+
+# Reportes globales consultables desde el panel MASTER (/master/reportes/<nombre>.<formato>)
+MASTER_REPORTS = {report.name: report for report in (PLATFORM_KPIS, PLATFORM_TOTALS, CONDOMINIUMS_DETAILED, ADMINS_BY_CONDOMINIUM)}
@@ -0,0 +1,126 @@
+"""
+Motor de reportes declarativos.
+
+Un Report declara una vez sus columnas, joins, filtros, agrupación y orden, y se compila
+a UNA sentencia SQL (los agregados los calcula la base de datos, no un bucle en Python).
+El mismo reporte se entrega como CSV por streaming, JSON o tabla HTML. Los parámetros
+(ej. el condominio) se declaran con bindparam('nombre') y se pasan al ejecutar:
+report.rows(condominium_id=5). Con connection=... se ejecuta en esa conexión en vez de
+la sesión.
+"""
+from dataclasses import dataclass
+
+from markupsafe import Markup, escape
+from sqlalchemy import func, select
+
+from app.extensions import db
+from app.utils.csv_stream import YIELD_PER, csv_response
+
+
+@dataclass(frozen=True)
+class Column:
+    """
+    Columna del reporte. 'expr' es una expresión SQL o una tupla de expresiones; con
+    'format' el valor final se arma en Python a partir de ellas (format(*valores)).
+    """
+    name: str
+    label: str
+    expr: object
+    format: object = None
+
+    @property
+    def expressions(self):
+        return tuple(self.expr) if isinstance(self.expr, (tuple, list)) else (self.expr,)
+
+    def value(self, values):
+        return self.format(*values) if self.format else values[0]
+
+
+@dataclass(frozen=True)
+class Join:
+    target: object
+    onclause: object
+    outer: bool = False
+
+
+@dataclass(frozen=True)
+class Report:
+    name: str
+    title: str
+    columns: tuple
+    source: object = None
+    joins: tuple = ()
+    filters: tuple = ()
+    group_by: tuple = ()
+    order_by: tuple = ()
+
+    @property
+    def header(self):
+        return [column.label for column in self.columns]
+
+    def statement(self):
+        statement = select(*[expr for column in self.columns for expr in column.expressions])
+        if self.source is not None:
+            statement = statement.select_from(self.source)
+        for join in self.joins:
+            statement = statement.join(join.target, join.onclause, isouter=join.outer)
+        if self.filters:
+            statement = statement.where(*self.filters)
+        if self.group_by:
+            statement = statement.group_by(*self.group_by)
+        if self.order_by:
+            statement = statement.order_by(*self.order_by)
+        return statement
+
+    def _format(self, row):
+        values, position = [], 0
+        for column in self.columns:
+            width = len(column.expressions)
+            values.append(column.value(row[position:position + width]))
+            position += width
+        return values
+
+    def rows(self, connection=None, **params):
+        """Filas ya formateadas, leídas por lotes (apto para streaming)."""
+        result = (connection or db.session).execute(self.statement().execution_options(yield_per=YIELD_PER), params)
+        for row in result:
+            yield self._format(row)
+
+    def records(self, connection=None, **params):
+        names = [column.name for column in self.columns]
+        return [dict(zip(names, row)) for row in self.rows(connection, **params)]
+
+    def one(self, connection=None, **params):
+        """Primera (y única) fila como dict: reportes de indicadores con solo agregados."""
+        records = self.records(connection, **params)
+        return records[0] if records else {}
+
+    # --- Formatos de salida ---
+
+    def csv_response(self, filename, **params):
+        return csv_response(filename, self.header, self.rows(**params))
+
+    def json(self, **params):
+        return {
+            'report': self.name,
+            'title': self.title,
+            'columns': [{'name': column.name, 'label': column.label} for column in self.columns],
+            'rows': self.records(**params),
+        }
+
+    def html(self, **params):
+        head = ''.join(f"<th>{escape(label)}</th>" for label in self.header)
+        body = ''.join(
+            '<tr>' + ''.join(f"<td>{escape('' if value is None else value)}</td>" for value in row) + '</tr>'
+            for row in self.rows(**params)
+        )
+        return Markup(f'<table class="table table-sm table-striped"><thead><tr>{head}</tr></thead>'
+                      f'<tbody>{body}</tbody></table>')
+
+
+def count_of(entity, *criteria, join=None):
+    """Subconsulta escalar COUNT(*) para columnas de indicadores: varias caben en un solo SELECT."""
+    statement = select(func.count()).select_from(entity)
+    if join is not None:
+        statement = statement.join(*join)
+    return statement.where(*criteria).scalar_subquery()
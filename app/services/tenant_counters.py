@@ -0,0 +1,212 @@
+"""
+Contadores por condominio para los paneles (tabla tenant_counters).
+
+Los mantienen los hooks de app.services.counters en la misma transacción que los
+cambios. Un condominio sin contadores (recién migrado) o con contadores invalidados
+(value NULL, tras un UPDATE masivo) se calcula con COUNT(*) en su primera lectura.
+Cada lectura pide solo los nombres que muestra: el desglose por documento y por día
+crece con el condominio.
+
+Nombres: 'units', 'residents_active', 'residents_pending', 'pending_payments',
+'documents' (+ 'documents:<estado>'), 'documents_published' (+ desglose por día de
+creación 'documents_published:<AAAA-MM-DD>') y 'signatures' (+ 'signatures:<id documento>').
+"""
+from datetime import datetime, timedelta
+
+from sqlalchemy import case, func, insert, or_, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+
+from app.extensions import db
+from app.models import Document, Payment, ResidentSignature, TenantCounter, Unit, User
+from app.services.counters import Counter, CounterStore, register_store, wrote_in_transaction
+
+PUBLISHED_STATUSES = ('signed', 'sent')
+
+
+def _condominium(values, lookup):
+    return values['condominium_id']
+
+
+TENANT_COUNTERS = (
+    Counter('units', Unit, ('condominium_id',), lambda v, lookup: True, scope=_condominium),
+    Counter('residents_active', User, ('condominium_id', 'status'),
+            lambda v, lookup: v['status'] == 'active', scope=_condominium),
+    Counter('residents_pending', User, ('condominium_id', 'status'),
+            lambda v, lookup: v['status'] == 'pending', scope=_condominium),
+    Counter('pending_payments', Payment, ('condominium_id', 'status'),
+            lambda v, lookup: v['status'] == 'PENDING_REVIEW', scope=_condominium),
+    Counter('documents', Document, ('condominium_id', 'status'),
+            lambda v, lookup: True, scope=_condominium, detail=lambda v: v['status']),
+    Counter('documents_published', Document, ('condominium_id', 'status', 'created_at'),
+            lambda v, lookup: v['status'] in PUBLISHED_STATUSES and v['created_at'] is not None,
+            scope=_condominium, detail=lambda v: v['created_at'].date().isoformat()),
+    Counter('signatures', ResidentSignature, ('document_id',), lambda v, lookup: True,
+            scope=lambda v, lookup: lookup.document_condominium(v['document_id']),
+            detail=lambda v: str(v['document_id'])),
+)
+
+FAMILIES = tuple(counter.name for counter in TENANT_COUNTERS)
+
+
+def _upsert(connection, values):
+    """INSERT ... ON CONFLICT DO UPDATE value = value + excluded.value (PostgreSQL y SQLite)."""
+    dialect = {'postgresql': postgresql, 'sqlite': sqlite}.get(connection.dialect.name)
+    table = TenantCounter.__table__
+    if dialect is None:
+        updated = connection.execute(
+            update(table)
+            .where(table.c.condominium_id == values['condominium_id'], table.c.name == values['name'])
+            .values(value=table.c.value + values['value'], updated_at=values['updated_at'])
+        )
+        if not updated.rowcount:
+            connection.execute(insert(table).values(**values))
+        return
+    statement = dialect.insert(table).values(**values)
+    connection.execute(statement.on_conflict_do_update(
+        index_elements=[table.c.condominium_id, table.c.name],
+        set_={'value': table.c.value + statement.excluded.value, 'updated_at': statement.excluded.updated_at},
+    ))
+
+
+class TenantCountersService(CounterStore):
+    counters = TENANT_COUNTERS
+
+    def apply(self, connection, deltas):
+        table = TenantCounter.__table__
+        now = datetime.utcnow()
+        totals, details = {}, {}
+        for (condominium_id, name, detail), delta in deltas.items():
+            if condominium_id is None:
+                continue
+            totals[(condominium_id, name)] = totals.get((condominium_id, name), 0) + delta
+            if detail is not None:
+                details.setdefault((condominium_id, name), []).append((f"{name}:{detail}", delta))
+
+        # Orden fijo de escritura para no cruzar bloqueos entre transacciones
+        for (condominium_id, name), delta in sorted(totals.items()):
+            updated = connection.execute(
+                update(table)
+                .where(table.c.condominium_id == condominium_id, table.c.name == name)
+                .values(value=table.c.value + delta, updated_at=now)
+            )
+            # Sin fila del total el condominio aún no se calculó: se calcula completo al leer.
+            # Con la fila invalidada (NULL) el UPDATE igual la bloquea: rebuild() espera a esta transacción
+            if not updated.rowcount:
+                continue
+            for detail_name, detail_delta in sorted(details.get((condominium_id, name), ())):
+                _upsert(connection, {'condominium_id': condominium_id, 'name': detail_name,
+                                     'value': detail_delta, 'updated_at': now})
+
+    def invalidate(self, connection, counters, condominium_id=None):
+        table = TenantCounter.__table__
+        names = [counter.name for counter in counters]
+        # NULL en vez de borrar: la fila queda para que rebuild() la bloquee antes de contar
+        statement = update(table).where(or_(
+            table.c.name.in_(names),
+            *[table.c.name.like(f"{name}:%") for name in names]
+        )).values(value=None, updated_at=datetime.utcnow())
+        if condominium_id is not None:
+            statement = statement.where(table.c.condominium_id == condominium_id)
+        connection.execute(statement)
+
+    def get(self, condominium_id, names=FAMILIES):
+        """
+        Contadores 'names' del condominio como dict (los que no existen valen 0 con .get(nombre, 0)).
+        Lee solo esas filas y el total de sus familias; si alguna está invalidada o aún no se
+        calculó, recalcula el condominio.
+        """
+        names = set(names)
+        families = {name.split(':', 1)[0] for name in names}
+        counts = dict(db.session.execute(
+            select(TenantCounter.name, TenantCounter.value)
+            .where(TenantCounter.condominium_id == condominium_id, TenantCounter.name.in_(sorted(names | families)))
+        ).all())
+        if any(counts.get(family) is None for family in families) or None in counts.values():
+            counts = self.rebuild(condominium_id)
+        return {name: value for name, value in counts.items() if name in names}
+
+    def published_since(self, condominium_id, days):
+        """Documentos firmados/enviados creados en los últimos 'days' días (por día calendario UTC)."""
+        today = datetime.utcnow().date()
+        return sum(self.get(condominium_id, [
+            f"documents_published:{(today - timedelta(days=n)).isoformat()}" for n in range(days + 1)
+        ]).values())
+
+    def compute(self, condominium_id, connection=None):
+        """Todos los contadores del condominio con COUNT(*) (en 'connection', o en la sesión)."""
+        execute = (connection or db.session).execute
+
+        def scalar(statement):
+            return execute(statement).scalar()
+
+        counts = {
+            'units': scalar(select(func.count(Unit.id)).where(Unit.condominium_id == condominium_id)),
+            'residents_active': scalar(select(func.count(User.id)).where(
+                User.condominium_id == condominium_id, User.status == 'active')),
+            'residents_pending': scalar(select(func.count(User.id)).where(
+                User.condominium_id == condominium_id, User.status == 'pending')),
+            'pending_payments': scalar(select(func.count(Payment.id)).where(
+                Payment.condominium_id == condominium_id, Payment.status == 'PENDING_REVIEW')),
+        }
+
+        def breakdown(name, statement):
+            counts[name] = 0
+            for detail, value in execute(statement):
+                # func.date devuelve date en PostgreSQL y texto en SQLite: ambos se formatean AAAA-MM-DD
+                counts[f"{name}:{detail}"] = value
+                counts[name] += value
+
+        breakdown('documents', select(Document.status, func.count(Document.id))
+                  .where(Document.condominium_id == condominium_id).group_by(Document.status))
+        day = func.date(Document.created_at)
+        breakdown('documents_published', select(day, func.count(Document.id))
+                  .where(Document.condominium_id == condominium_id,
+                         Document.status.in_(PUBLISHED_STATUSES), Document.created_at.isnot(None))
+                  .group_by(day))
+        breakdown('signatures', select(ResidentSignature.document_id, func.count(ResidentSignature.id))
+                  .join(Document, ResidentSignature.document_id == Document.id)
+                  .where(Document.condominium_id == condominium_id)
+                  .group_by(ResidentSignature.document_id))
+        return counts
+
+    def rebuild(self, condominium_id):
+        """
+        Recalcula y reescribe los contadores del condominio en una transacción propia: no
+        confirma ni descarta la del llamador. Retorna los valores.
+        Las filas se bloquean (en el orden de apply) antes de contar: un delta concurrente o ya
+        está confirmado y entra en el conteo, o espera y se suma sobre el valor recalculado.
+        Si la sesión ya escribió en esta transacción solo se cuenta (sus bloqueos harían esperar
+        a la otra conexión); el valor se guarda en una lectura posterior.
+        """
+        if wrote_in_transaction(db.session):
+            return self.compute(condominium_id)
+        table = TenantCounter.__table__
+        try:
+            with db.engine.begin() as connection:
+                existing = set(connection.execute(
+                    select(table.c.name).where(table.c.condominium_id == condominium_id)
+                    .order_by(table.c.name).with_for_update()
+                ).scalars())
+                counts = self.compute(condominium_id, connection)
+                now = datetime.utcnow()
+                if existing:
+                    # Desgloses que ya no cuentan (p.ej. un estado sin documentos) quedan en 0
+                    connection.execute(
+                        update(table)
+                        .where(table.c.condominium_id == condominium_id, table.c.name.in_(sorted(existing)))
+                        .values(value=case(counts, value=table.c.name, else_=0), updated_at=now)
+                    )
+                missing = sorted(name for name in counts if name not in existing)
+                if missing:
+                    connection.execute(insert(table), [
+                        {'condominium_id': condominium_id, 'name': name, 'value': counts[name], 'updated_at': now}
+                        for name in missing
+                    ])
+        except IntegrityError:
+            # Otro request creó las mismas filas al mismo tiempo (primera lectura del condominio)
+            pass
+        return counts
+
+
+tenant_counters = register_store(TenantCountersService())
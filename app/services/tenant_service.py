@@ -0,0 +1,141 @@
+from dataclasses import dataclass
+
+from flask import current_app
+
+from app.extensions import db, tiered_cache
+from app.models import Condominium, CondominiumConfig
+
+
+def tenant_namespace(subdomain):
+    """Espacio de nombres del condominio en el caché de dos niveles (un bump invalida todo lo suyo)."""
+    return f"tenant:{subdomain}"
+
+
+@dataclass(frozen=True)
+class TenantSnapshot:
+    """
+    Foto inmutable y liviana de un condominio, suficiente para resolver el tenant
+    en el middleware sin cargar la fila completa (columnas JSON incluidas).
+    """
+    id: int
+    subdomain: str
+    environment: str
+    status: str
+    admin_user_id: int
+
+
+class TenantResolver:
+    """
+    slug -> TenantSnapshot sobre el caché de dos niveles (app.tiered_cache), con TTL
+    TENANT_CACHE_TTL e invalidación por espacio de nombres del condominio: invalidate()
+    se propaga a los demás workers a través del backend compartido.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
+    def _ttl(self):
+        return current_app.config.get('TENANT_CACHE_TTL', 60)
+
+    def resolve(self, subdomain):
+        """Retorna el TenantSnapshot del slug o None si el condominio no existe."""
+        loaded = []
+
+        def load():
+            loaded.append(True)
+            row = (
+                db.session.query(
+                    Condominium.id, Condominium.subdomain, Condominium.environment,
+                    Condominium.status, Condominium.admin_user_id,
+                    CondominiumConfig.tenant, CondominiumConfig.primary_color,
+                    CondominiumConfig.logo_url, CondominiumConfig.commercial_name
+                )
+                .outerjoin(CondominiumConfig, CondominiumConfig.tenant == Condominium.subdomain)
+                .filter(Condominium.subdomain == subdomain)
+                .first()
+            )
+            if not row:
+                return None
+            # La marca viaja en la misma consulta: el primer request del condominio no la pide aparte
+            from app.services.branding_service import branding_service, TenantBranding
+            branding_service.prime(subdomain, TenantBranding(*row[5:]) if row.tenant else None)
+            return TenantSnapshot(*row[:5])
+
+        # Los slugs inexistentes no se cachean: un condominio recién creado debe verse de inmediato.
+        snapshot = tiered_cache.get_or_load(tenant_namespace(subdomain), 'snapshot', load, self._ttl(), cache_none=False)
+        if loaded:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return snapshot
+
+    def invalidate(self, *subdomains):
+        """Invalida todo lo cacheado de los slugs indicados (p.ej. el anterior y el nuevo al renombrar)."""
+        for subdomain in subdomains:
+            if subdomain:
+                tiered_cache.bump(tenant_namespace(subdomain))
+
+    def clear(self):
+        tiered_cache.clear()
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'size': tiered_cache.local_count('snapshot')}
+
+
+tenant_resolver = TenantResolver()
+
+
+class CurrentTenant:
+    """
+    Valor de `g.condominium` durante un request.
+    Responde id, subdomain, environment, status y admin_user_id desde el snapshot;
+    cualquier otro atributo carga la fila completa de Condominium una sola vez
+    (perezosamente) y delega en ella, incluidas las asignaciones.
+    """
+    __slots__ = ('_snapshot', '_instance')
+
+    def __init__(self, snapshot):
+        object.__setattr__(self, '_snapshot', snapshot)
+        object.__setattr__(self, '_instance', None)
+
+    @property
+    def instance(self):
+        """Instancia ORM completa del condominio (se carga en el primer acceso)."""
+        if self._instance is None:
+            object.__setattr__(self, '_instance', db.session.get(Condominium, self._snapshot.id))
+        return self._instance
+
+    def _snapshot_value(self, name):
+        if self._instance is not None:
+            return getattr(self._instance, name)
+        return getattr(self._snapshot, name)
+
+    @property
+    def id(self):
+        return self._snapshot.id
+
+    @property
+    def subdomain(self):
+        return self._snapshot_value('subdomain')
+
+    @property
+    def environment(self):
+        return self._snapshot_value('environment')
+
+    @property
+    def status(self):
+        return self._snapshot_value('status')
+
+    @property
+    def admin_user_id(self):
+        return self._snapshot_value('admin_user_id')
+
+    def __getattr__(self, name):
+        return getattr(self.instance, name)
+
+    def __setattr__(self, name, value):
+        setattr(self.instance, name, value)
+
+    def __repr__(self):
+        return f'<CurrentTenant {self._snapshot.subdomain}>'
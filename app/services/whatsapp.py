@@ -1,5 +1,8 @@
-import requests
 from flask import current_app
+from app.http_client import http_client
+
+# Consultas de estado al renderizar el panel: sin reintentos, el breaker evita esperar a un gateway caído
+whatsapp_http = http_client('whatsapp', timeout=2, retries=0)
 
 class WhatsAppService:
     """
@@ -36,7 +39,7 @@ class WhatsAppService:
         try:
             # Endpoint típico de Waha para obtener QR
             url = f"{self.waha_base_url}/api/screenshot?session=default"
-            response = requests.get(url, timeout=2)
+            response = whatsapp_http.get(url)
             if response.status_code == 200:
                 return response.json().get('data') # Asumiendo que devuelve base64
         except:
@@ -51,7 +54,7 @@ class WhatsAppService:
     def _get_gateway_status(self):
         try:
             url = f"{self.waha_base_url}/api/sessions/default"
-            response = requests.get(url, timeout=2)
+            response = whatsapp_http.get(url)
             if response.status_code == 200:
                 data = response.json()
                 return data.get('status', 'disconnected')
@@ -1,68 +1,102 @@
+from functools import lru_cache
 from flask_sqlalchemy.query import Query
-from flask import g
+from flask import g, has_app_context
+from sqlalchemy.orm import with_loader_criteria
+from app.tenant_rls import rls_enabled
 
-class TenantQuery(Query):
+# Registro de modelos que tienen 'condominium_id'.
+# Se calcula una sola vez al importar los modelos (ver app/models/__init__.py),
+# en lugar de inspeccionar la query en cada ejecución.
+_tenant_models = set()
+
+
+def register_tenant_models(model_base):
+    """Recorre los mappers declarados y registra los modelos con columna 'condominium_id'."""
+    _tenant_models.clear()
+    for mapper in model_base.registry.mappers:
+        if 'condominium_id' in mapper.columns:
+            _tenant_models.add(mapper.class_)
+    _tenant_options.cache_clear()
+    return frozenset(_tenant_models)
+
+
+def is_tenant_model(cls):
+    """Indica si el modelo está aislado por condominio."""
+    return cls in _tenant_models
+
+
+def get_tenant_id():
+    """Obtiene el ID del condominio actual desde g.condominium"""
+    if has_app_context():
+        condominium = g.get('condominium')
+        if condominium:
+            return condominium.id
+    return None
+
+
+@lru_cache(maxsize=4096)
+def _tenant_options(tenant_id):
     """
-    Query personalizado que intercepta las consultas para aplicar automáticamente
-    el filtro por 'condominium_id' si el modelo lo tiene y hay un tenant activo.
+    Opciones with_loader_criteria para un tenant, una por modelo del registro.
+    Se memoizan por tenant: construirlas en cada query cuesta más que el propio filtro.
     """
+    return tuple(
+        with_loader_criteria(
+            model,
+            lambda cls: cls.condominium_id == tenant_id,
+            include_aliases=True
+        )
+        for model in _tenant_models
+    )
 
-    def _get_tenant_id(self):
-        """Obtiene el ID del condominio actual desde g.condominium"""
-        if hasattr(g, 'condominium') and g.condominium:
-            return g.condominium.id
-        return None
-
-    def _has_tenant_column(self):
-        """Verifica si el modelo principal de la query tiene 'condominium_id'"""
-        try:
-            if self.column_descriptions:
-                entity = self.column_descriptions[0]['type']
-                return hasattr(entity, 'condominium_id')
-        except Exception:
-            pass
-        return False
-
-    def _apply_filter(self):
-        """Aplica el filtro de tenant si corresponde"""
-        tenant_id = self._get_tenant_id()
-        
-        # Si hay tenant y el modelo tiene la columna
-        if tenant_id and self._has_tenant_column():
-            return self.filter_by(condominium_id=tenant_id)
-            
-        return self
-
-    # --- Sobrescribir métodos de ejecución ---
-
-    def all(self):
-        return Query.all(self._apply_filter())
-
-    def first(self):
-        return Query.first(self._apply_filter())
-
-    def one(self):
-        return Query.one(self._apply_filter())
-
-    def one_or_none(self):
-        return Query.one_or_none(self._apply_filter())
-    
-    def count(self):
-        return Query.count(self._apply_filter())
+
+def apply_tenant_criteria(execute_state):
+    """
+    Hook 'do_orm_execute' de la sesión.
+    Añade un with_loader_criteria por cada modelo del registro, de modo que el filtro
+    de tenant alcanza también a joins, eager loads y lazy loads de relaciones, y a los
+    UPDATE/DELETE masivos (Query.update()/delete()).
+    El criterio es un lambda: el tenant_id viaja como parámetro enlazado y la
+    sentencia compilada se reutiliza desde el caché de SQLAlchemy.
+    """
+    if not (execute_state.is_select or execute_state.is_update or execute_state.is_delete):
+        return
+    # Las cargas de columnas/relaciones heredan el criterio de la query original
+    if execute_state.is_column_load or execute_state.is_relationship_load:
+        return
+    if execute_state.execution_options.get('skip_tenant_filter', False):
+        return
+
+    tenant_id = get_tenant_id()
+    if tenant_id is None:
+        return
+    # En modo RLS el filtro lo aplica PostgreSQL
+    if rls_enabled():
+        return
+
+    execute_state.statement = execute_state.statement.options(*_tenant_options(tenant_id))
+
+
+class TenantQuery(Query):
+    """
+    Query del proyecto. El filtro por 'condominium_id' lo aplica el hook
+    apply_tenant_criteria sobre cualquier SELECT ORM; aquí solo queda la
+    validación posterior de get(), que puede resolverse desde el identity map
+    sin emitir SQL.
+
+    Para consultas de plataforma que deben ver todos los tenants:
+        query.execution_options(skip_tenant_filter=True)
+    """
 
     def get(self, ident):
-        # get() carga por Primary Key. 
+        # get() carga por Primary Key.
         # Estrategia: Cargar y luego validar (Post-Load Validation)
         obj = Query.get(self, ident)
-        
-        tenant_id = self._get_tenant_id()
-        if obj and tenant_id and self._has_tenant_column():
+
+        tenant_id = get_tenant_id()
+        if obj is not None and tenant_id and is_tenant_model(type(obj)):
             # Si el objeto no pertenece al tenant actual, devolver None (como si no existiera)
-            if getattr(obj, 'condominium_id') != tenant_id:
+            if obj.condominium_id != tenant_id:
                 return None
-                
-        return obj
 
-    def paginate(self, **kwargs):
-        # Delegar al método paginate de la clase padre pero con el filtro aplicado
-        return Query.paginate(self._apply_filter(), **kwargs)
+        return obj
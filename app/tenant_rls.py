@@ -0,0 +1,102 @@
+import logging
+
+from flask import g, has_app_context, current_app
+from sqlalchemy import event, text
+
+logger = logging.getLogger(__name__)
+
+# Política RLS sobre la variable de sesión app.tenant_id. Sin tenant en la conexión
+# (master, CLI, migraciones) se ven todas las filas, igual que el filtro ORM sin g.condominium.
+RLS_PREDICATE = (
+    "NULLIF(current_setting('app.tenant_id', true), '') IS NULL "
+    "OR condominium_id = NULLIF(current_setting('app.tenant_id', true), '')::integer"
+)
+
+
+def rls_enabled(app=None):
+    """Indica si el aislamiento de tenants lo aplica PostgreSQL (modo 'rls')."""
+    app = app or (current_app if has_app_context() else None)
+    return bool(app) and app.config.get('TENANT_ISOLATION_MODE', 'orm') == 'rls'
+
+
+def _current_tenant_value():
+    if has_app_context():
+        condominium = g.get('condominium')
+        if condominium:
+            return str(condominium.id)
+    return ''
+
+
+def _set_tenant_on_dbapi(dbapi_connection, value):
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute("SELECT set_config('app.tenant_id', %s, false)", (value,))
+    finally:
+        cursor.close()
+    # set_config es transaccional: se confirma para que un rollback posterior no lo revierta.
+    dbapi_connection.commit()
+
+
+def enable_rls(connection, tables):
+    """
+    Habilita y fuerza RLS con la política de tenant en las tablas indicadas.
+    Lo usan las pruebas (que crean el esquema con create_all); en producción
+    las políticas las crea la migración correspondiente.
+    """
+    for table in tables:
+        connection.execute(text(f'ALTER TABLE {table} ENABLE ROW LEVEL SECURITY'))
+        connection.execute(text(f'ALTER TABLE {table} FORCE ROW LEVEL SECURITY'))
+        connection.execute(text(f'DROP POLICY IF EXISTS tenant_isolation ON {table}'))
+        connection.execute(text(
+            f'CREATE POLICY tenant_isolation ON {table} '
+            f'USING ({RLS_PREDICATE}) WITH CHECK ({RLS_PREDICATE})'
+        ))
+
+
+def bind_current_tenant(session):
+    """
+    Fija app.tenant_id en la conexión que la sesión ya tiene tomada.
+    Necesario tras resolver el tenant: la consulta del resolver toma la conexión
+    del pool antes de que exista g.condominium, y el checkout no vuelve a ocurrir
+    hasta el siguiente commit/rollback. En modo 'orm' no hace nada.
+    """
+    if not rls_enabled():
+        return
+    if not session.in_transaction():
+        # Sin conexión tomada: el próximo checkout ya leerá g.condominium.
+        return
+    session.connection().execute(
+        text("SELECT set_config('app.tenant_id', :tenant_id, false)"),
+        {'tenant_id': _current_tenant_value()}
+    )
+
+
+def init_tenant_rls(app, db):
+    """
+    Activa el modo RLS si TENANT_ISOLATION_MODE == 'rls'.
+    Cada conexión recibe app.tenant_id al salir del pool (desde g.condominium)
+    y se limpia al devolverse, para que nunca herede el tenant de otro request.
+    """
+    if not rls_enabled(app):
+        return
+
+    with app.app_context():
+        engine = db.engine
+
+    if engine.dialect.name != 'postgresql':
+        # Fallar al arrancar: ignorar el modo dejaría a la app sin ningún aislamiento.
+        raise RuntimeError("TENANT_ISOLATION_MODE='rls' requiere PostgreSQL.")
+
+    @event.listens_for(engine, 'checkout')
+    def set_tenant_on_checkout(dbapi_connection, connection_record, connection_proxy):
+        _set_tenant_on_dbapi(dbapi_connection, _current_tenant_value())
+
+    @event.listens_for(engine, 'checkin')
+    def reset_tenant_on_checkin(dbapi_connection, connection_record):
+        if dbapi_connection is None:
+            return
+        try:
+            _set_tenant_on_dbapi(dbapi_connection, '')
+        except Exception:
+            # El checkout siempre vuelve a fijar el valor; aquí solo se registra.
+            logger.exception("No se pudo limpiar app.tenant_id al devolver la conexión")
@@ -0,0 +1,141 @@
+"""
+Caché en dos niveles con espacios de nombres versionados.
+
+Nivel 1: LRU en proceso, acotado por CACHE_LOCAL_MAXSIZE entradas.
+Nivel 2: el backend compartido de Flask-Caching (CACHE_TYPE: FileSystemCache o
+RedisCache en producción; SimpleCache como sustituto local en dev/tests).
+
+Cada clave vive dentro de un espacio de nombres (ej. 'tenant:<slug>') que tiene un
+contador de versión en el backend compartido. La versión forma parte de la clave
+real, así que bump(namespace) invalida de una vez todo lo cacheado para ese
+condominio, en todos los workers: los demás procesos ven la nueva versión cuando
+vence su copia local del contador (CACHE_VERSION_TTL segundos).
+"""
+import threading
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+class TieredCache:
+
+    def __init__(self):
+        self.backend = None
+        self.maxsize = 2048
+        self.version_ttl = 2
+        self._local = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits_local = 0
+        self.hits_shared = 0
+        self.misses = 0
+
+    def init_app(self, app, backend):
+        """'backend' es la instancia cachelib configurada por Flask-Caching (cache.cache)."""
+        self.backend = backend
+        self.maxsize = app.config.get('CACHE_LOCAL_MAXSIZE', 2048)
+        self.version_ttl = app.config.get('CACHE_VERSION_TTL', 2)
+        with self._lock:
+            self._local.clear()
+
+    # --- Nivel local ---
+
+    def _local_get(self, key, now):
+        with self._lock:
+            entry = self._local.get(key)
+            if entry is None:
+                return _MISSING
+            value, expires = entry
+            if expires <= now:
+                del self._local[key]
+                return _MISSING
+            self._local.move_to_end(key)
+            return value
+
+    def _local_set(self, key, value, expires):
+        with self._lock:
+            self._local[key] = (value, expires)
+            self._local.move_to_end(key)
+            while len(self._local) > self.maxsize:
+                self._local.popitem(last=False)
+
+    # --- Versiones por espacio de nombres ---
+
+    def version(self, namespace):
+        now = time.time()
+        local_key = f"version|{namespace}"
+        version = self._local_get(local_key, now)
+        if version is _MISSING:
+            shared_key = f"{namespace}:version"
+            version = self.backend.get(shared_key)
+            if version is None:
+                # Versión inicial única: si el backend perdió el contador, las claves viejas no se reutilizan
+                self.backend.add(shared_key, int(now * 1000), timeout=0)
+                version = self.backend.get(shared_key) or int(now * 1000)
+            self._local_set(local_key, version, now + self.version_ttl)
+        return version
+
+    def bump(self, namespace):
+        """Invalida todas las claves del espacio de nombres (en este y en los demás procesos)."""
+        shared_key = f"{namespace}:version"
+        version = self.backend.inc(shared_key) if self.backend.has(shared_key) else None
+        if version is None:
+            version = int(time.time() * 1000)
+            self.backend.set(shared_key, version, timeout=0)
+        self._local_set(f"version|{namespace}", version, time.time() + self.version_ttl)
+        return version
+
+    # --- Lectura / escritura ---
+
+    def get_or_load(self, namespace, key, loader, timeout, cache_none=True):
+        """
+        Retorna el valor cacheado o lo calcula con loader() y lo guarda en ambos niveles
+        durante 'timeout' segundos. Con cache_none=False un resultado None no se guarda.
+        """
+        now = time.time()
+        full_key = f"{namespace}:{self.version(namespace)}:{key}"
+
+        value = self._local_get(full_key, now)
+        if value is not _MISSING:
+            self.hits_local += 1
+            return value
+
+        envelope = self.backend.get(full_key)
+        if envelope is not None and envelope[1] > now:
+            self.hits_shared += 1
+            self._local_set(full_key, envelope[0], envelope[1])
+            return envelope[0]
+
+        self.misses += 1
+        value = loader()
+        if value is None and not cache_none:
+            return None
+        self._store(full_key, value, now + timeout, timeout)
+        return value
+
+    def set(self, namespace, key, value, timeout):
+        """Guarda en ambos niveles un valor ya calculado (p.ej. leído junto con otro)."""
+        full_key = f"{namespace}:{self.version(namespace)}:{key}"
+        self._store(full_key, value, time.time() + timeout, timeout)
+
+    def _store(self, full_key, value, expires, timeout):
+        # La expiración viaja con el valor: el nivel local de otro proceso respeta el mismo vencimiento
+        self.backend.set(full_key, (value, expires), timeout=timeout)
+        self._local_set(full_key, value, expires)
+
+    def local_count(self, key):
+        """Entradas locales vigentes cuyo nombre de clave es 'key' (para estadísticas)."""
+        with self._lock:
+            return sum(1 for full_key in self._local if full_key.endswith(f":{key}"))
+
+    def clear(self):
+        with self._lock:
+            self._local.clear()
+        if self.backend is not None:
+            self.backend.clear()
+
+    def stats(self):
+        with self._lock:
+            size = len(self._local)
+        return {'local_hits': self.hits_local, 'shared_hits': self.hits_shared,
+                'misses': self.misses, 'local_size': size}
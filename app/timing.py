@@ -0,0 +1,140 @@
+import time
+from contextlib import contextmanager
+
+import structlog
+from flask import g, request, has_app_context, before_render_template, template_rendered
+
+logger = structlog.get_logger()
+
+# Fases reportadas, en el orden en que aparecen en la cabecera Server-Timing.
+# 'db' sale del contador de queries (app.query_counter); el resto se mide aquí.
+PHASES = ('tenant', 'jwt', 'db', 'tpl', 'http')
+
+
+class RequestTiming:
+    """Tiempo acumulado (ms) por fase durante un request. Las fases pueden solaparse (ej. db dentro de tpl)."""
+    __slots__ = ('started', 'phases', '_open')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases = dict.fromkeys(PHASES, 0.0)
+        self._open = {}
+
+    def add(self, phase, elapsed_ms):
+        self.phases[phase] = self.phases.get(phase, 0.0) + elapsed_ms
+
+    def start(self, phase):
+        self._open.setdefault(phase, []).append(time.perf_counter())
+
+    def stop(self, phase):
+        """Cierra la última marca abierta de la fase; sin marca abierta no hace nada."""
+        marks = self._open.get(phase)
+        if marks:
+            self.add(phase, (time.perf_counter() - marks.pop()) * 1000)
+
+    def total_ms(self):
+        return (time.perf_counter() - self.started) * 1000
+
+    def header(self, db_queries=None):
+        """Valor de la cabecera Server-Timing (https://www.w3.org/TR/server-timing/)."""
+        metrics = []
+        for phase, elapsed in self.phases.items():
+            metric = f"{phase};dur={elapsed:.1f}"
+            if phase == 'db' and db_queries is not None:
+                metric += f';desc="{db_queries} queries"'
+            metrics.append(metric)
+        metrics.append(f"total;dur={self.total_ms():.1f}")
+        return ', '.join(metrics)
+
+
+def current_timing():
+    """RequestTiming del request en curso (o None fuera de un request)."""
+    if has_app_context():
+        return g.get('request_timing')
+    return None
+
+
+def start_phase(phase):
+    timing = current_timing()
+    if timing is not None:
+        timing.start(phase)
+
+
+def stop_phase(phase):
+    timing = current_timing()
+    if timing is not None:
+        timing.stop(phase)
+
+
+@contextmanager
+def timed(phase):
+    """
+    Acumula el tiempo del bloque en la fase indicada del request actual.
+    Fuera de un request (CLI, tareas) no mide nada.
+    """
+    timing = current_timing()
+    if timing is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timing.add(phase, (time.perf_counter() - started) * 1000)
+
+
+def _server_timing_allowed(app):
+    if app.config.get('SERVER_TIMING_ENABLED'):
+        return True
+    # Solo el usuario ya resuelto en este request: exponer la cabecera no cuesta una consulta
+    from app.auth import get_memoized_user
+    user = get_memoized_user()
+    return bool(user and user.role == 'MASTER')
+
+
+def init_request_timing(app):
+    """
+    Desglose de latencia por fase (tenant, jwt, db, tpl, http) de cada request.
+    Se expone como cabecera Server-Timing (usuarios MASTER o SERVER_TIMING_ENABLED)
+    y como log 'request_timing' para los requests más lentos que REQUEST_TIMING_LOG_MS.
+    """
+    @app.before_request
+    def start_request_timing():
+        g.request_timing = RequestTiming()
+
+    def _template_started(sender, template, context, **extra):
+        start_phase('tpl')
+
+    def _template_finished(sender, template, context, **extra):
+        stop_phase('tpl')
+
+    before_render_template.connect(_template_started, app, weak=False)
+    template_rendered.connect(_template_finished, app, weak=False)
+
+    @app.after_request
+    def report_request_timing(response):
+        timing = g.get('request_timing')
+        if timing is None:
+            return response
+
+        stats = g.get('query_stats')
+        if stats is not None:
+            timing.phases['db'] = stats.total_ms
+
+        if _server_timing_allowed(app):
+            response.headers['Server-Timing'] = timing.header(stats.count if stats is not None else None)
+
+        total = timing.total_ms()
+        if total >= app.config.get('REQUEST_TIMING_LOG_MS', 500):
+            logger.info(
+                "request_timing",
+                endpoint=request.endpoint,
+                status=response.status_code,
+                total_ms=round(total, 2),
+                **{f"{phase}_ms": round(elapsed, 2) for phase, elapsed in timing.phases.items()}
+            )
+        return response
+
+    @app.teardown_request
+    def stop_request_timing(exception=None):
+        g.pop('request_timing', None)
@@ -0,0 +1,64 @@
+"""
+Exportación CSV por streaming.
+
+Las filas se codifican a medida que la consulta las entrega y se envían al cliente en
+bloques de CHUNK_ROWS filas, así la memoria del worker no depende del número de filas
+exportadas. Las consultas se leen con yield_per (cursor del lado del servidor en
+PostgreSQL). El BOM UTF-8, para que Excel reconozca los acentos, se emite una sola vez.
+"""
+import codecs
+import csv
+
+from flask import Response, stream_with_context
+
+from app.extensions import db
+
+CHUNK_ROWS = 500
+YIELD_PER = 1000
+
+
+class _LineBuffer:
+    """Destino de csv.writer: acumula solo las líneas del bloque en curso."""
+
+    def __init__(self):
+        self.lines = []
+
+    def write(self, line):
+        self.lines.append(line)
+
+    def drain(self):
+        data = ''.join(self.lines).encode('utf-8')
+        self.lines.clear()
+        return data
+
+
+def iter_csv(header, rows, chunk_rows=CHUNK_ROWS):
+    """Genera el CSV en bytes: BOM + cabecera y luego bloques de filas ya codificadas."""
+    buffer = _LineBuffer()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    yield codecs.BOM_UTF8 + buffer.drain()
+
+    for row in rows:
+        writer.writerow(row)
+        if len(buffer.lines) >= chunk_rows:
+            yield buffer.drain()
+    if buffer.lines:
+        yield buffer.drain()
+
+
+def stream_rows(statement, yield_per=YIELD_PER):
+    """Ejecuta un select() y retorna sus filas leídas por lotes de 'yield_per'."""
+    return db.session.execute(statement.execution_options(yield_per=yield_per))
+
+
+def csv_response(filename, header, rows):
+    """
+    Respuesta CSV por streaming. 'rows' se consume recién al enviar el cuerpo, dentro
+    del contexto del request (stream_with_context), con la sesión de base de datos abierta.
+    """
+    return Response(
+        stream_with_context(iter_csv(header, rows)),
+        mimetype="text/csv",
+        headers={"Content-Disposition": f"attachment;filename={filename}"}
+    )
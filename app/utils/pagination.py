@@ -0,0 +1,104 @@
+"""
+Paginación por keyset (seek) sobre (created_at, id) u otra columna de fecha.
+
+En vez de OFFSET, cada página continúa desde la última fila de la anterior:
+WHERE (created_at, id) < (:created_at, :id) ORDER BY created_at DESC, id DESC LIMIT n.
+Con un índice que termine en created_at el costo de cada página no depende de cuántas
+filas hay antes (OFFSET tiene que recorrerlas todas). El cursor que viaja en la URL es
+opaco: base64 de 'created_at|id' de la última fila entregada.
+"""
+import base64
+import binascii
+from dataclasses import dataclass
+from datetime import datetime
+
+from flask import abort, request, url_for
+from sqlalchemy import tuple_
+
+PER_PAGE = 25
+MAX_PER_PAGE = 100
+
+
+def encode_cursor(created_at, row_id):
+    raw = f"{created_at.isoformat()}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """(created_at, id) del cursor; ValueError si está malformado."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        created_at, row_id = raw.split('|')
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise ValueError(f"Cursor inválido: {cursor!r}") from e
+
+
+@dataclass
+class KeysetPage:
+    items: list
+    next_cursor: str = None
+    cursor: str = None
+    param: str = 'cursor'
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def is_first(self):
+        return self.cursor is None
+
+    def _url(self, cursor):
+        # Conserva los demás parámetros (p.ej. el cursor de otra lista de la misma página)
+        args = {**request.view_args, **request.args.to_dict()}
+        args.pop(self.param, None)
+        if cursor:
+            args[self.param] = cursor
+        return url_for(request.endpoint, **args)
+
+    @property
+    def next_url(self):
+        return self._url(self.next_cursor) if self.has_next else None
+
+    @property
+    def first_url(self):
+        return self._url(None)
+
+    def to_dict(self, serialize):
+        return {
+            'items': [serialize(item) for item in self.items],
+            'next_cursor': self.next_cursor,
+            'has_next': self.has_next,
+        }
+
+
+def keyset_paginate(query, model, cursor=None, per_page=PER_PAGE, descending=True, param='cursor',
+                    column='created_at'):
+    """
+    Una página de 'query' (Query del ORM, sin ORDER BY) ordenada por
+    (model.<column>, model.id). 'cursor' es el next_cursor de la página anterior.
+    """
+    created_at, row_id = getattr(model, column), model.id
+    if cursor:
+        after = decode_cursor(cursor)
+        key = tuple_(created_at, row_id)
+        query = query.filter(key < tuple_(*after)) if descending else query.filter(key > tuple_(*after))
+    order = (created_at.desc(), row_id.desc()) if descending else (created_at.asc(), row_id.asc())
+    rows = query.order_by(*order).limit(per_page + 1).all()
+
+    next_cursor = None
+    if len(rows) > per_page:
+        rows = rows[:per_page]
+        next_cursor = encode_cursor(getattr(rows[-1], column), rows[-1].id)
+    return KeysetPage(items=rows, next_cursor=next_cursor, cursor=cursor, param=param)
+
+
+def paginate_request(query, model, param='cursor', per_page=PER_PAGE, descending=True, column='created_at'):
+    """keyset_paginate con el cursor y el tamaño ('per_page') tomados del request; 400 si el cursor es inválido."""
+    per_page = min(max(request.args.get('per_page', per_page, type=int), 1), MAX_PER_PAGE)
+    try:
+        return keyset_paginate(query, model, cursor=request.args.get(param) or None, per_page=per_page,
+                               descending=descending, param=param, column=column)
+    except ValueError:
+        abort(400, "Cursor de paginación inválido.")
@@ -0,0 +1,161 @@
+"""
+Arnés de planes de ejecución para las consultas calientes.
+
+Cada entrada de HOT_QUERIES construye la misma sentencia que usa la ruta
+correspondiente. check_query_plans() ejecuta EXPLAIN sobre cada una y reporta
+los recorridos secuenciales (sin índice) sobre tablas con más filas que el umbral.
+
+SQLite:     EXPLAIN QUERY PLAN  -> 'SCAN tabla' vs 'SEARCH tabla USING INDEX ...'
+PostgreSQL: EXPLAIN (FORMAT JSON) -> nodos 'Seq Scan' con su 'Relation Name'
+"""
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, func, text, tuple_
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+from app.models import Payment, User, ResidentSignature, Document, UserSpecialRole, PettyCashTransaction
+from app.utils.pagination import PER_PAGE
+
+
+class Explain(Executable, ClauseElement):
+    """EXPLAIN sobre una sentencia, conservando sus parámetros enlazados."""
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(Explain)
+def _explain_sqlite(element, compiler, **kw):
+    return "EXPLAIN QUERY PLAN " + compiler.process(element.statement, **kw)
+
+
+@compiles(Explain, 'postgresql')
+def _explain_postgresql(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+# --- REGISTRO DE CONSULTAS CALIENTES ---
+# nombre -> función(params) que devuelve la sentencia. 'params' trae ids reales de la base sembrada.
+
+def _finanzas_pending(p):
+    return select(Payment).where(
+        Payment.condominium_id == p['condominium_id'], Payment.status == 'PENDING_REVIEW',
+        tuple_(Payment.created_at, Payment.id) > tuple_(datetime(2025, 1, 1), 0)
+    ).order_by(Payment.created_at.asc(), Payment.id.asc()).limit(PER_PAGE + 1)
+
+
+def _finanzas_history(p):
+    return select(Payment).where(
+        Payment.condominium_id == p['condominium_id'], Payment.status != 'PENDING_REVIEW',
+        tuple_(Payment.created_at, Payment.id) < tuple_(datetime(2030, 1, 1), 0)
+    ).order_by(Payment.created_at.desc(), Payment.id.desc()).limit(PER_PAGE + 1)
+
+
+def _user_payments_page(p):
+    return select(Payment).where(
+        Payment.user_id == p['user_id'],
+        tuple_(Payment.created_at, Payment.id) < tuple_(datetime(2030, 1, 1), 0)
+    ).order_by(Payment.created_at.desc(), Payment.id.desc()).limit(PER_PAGE + 1)
+
+
+def _petty_cash_open_period(p):
+    return select(func.sum(PettyCashTransaction.amount)).where(
+        PettyCashTransaction.condominium_id == p['condominium_id'],
+        PettyCashTransaction.transaction_date >= datetime(2025, 1, 1)
+    )
+
+
+def _admin_panel_pending_users(p):
+    return select(User).where(User.condominium_id == p['condominium_id'], User.status == 'pending')
+
+
+def _admin_residentes_active_count(p):
+    return select(func.count(User.id)).where(User.condominium_id == p['condominium_id'], User.status == 'active')
+
+
+def _public_signature_exists(p):
+    return select(ResidentSignature).where(
+        ResidentSignature.document_id == p['document_id'], ResidentSignature.cedula == p['cedula']
+    ).limit(1)
+
+
+def _dashboard_new_docs(p):
+    return select(func.count(Document.id)).where(
+        Document.condominium_id == p['condominium_id'],
+        Document.created_at >= datetime.utcnow() - timedelta(days=7),
+        Document.status.in_(['signed', 'sent'])
+    )
+
+
+def _documents_active_role(p):
+    today = datetime.now().date()
+    return select(UserSpecialRole).where(
+        UserSpecialRole.user_id == p['user_id'],
+        UserSpecialRole.condominium_id == p['condominium_id'],
+        UserSpecialRole.role.in_(['PRESIDENTE', 'SECRETARIO']),
+        UserSpecialRole.is_active == True,
+        UserSpecialRole.start_date <= today,
+        (UserSpecialRole.end_date == None) | (UserSpecialRole.end_date >= today)
+    ).limit(1)
+
+
+HOT_QUERIES = {
+    'admin.finanzas.pending': _finanzas_pending,
+    'admin.finanzas.history': _finanzas_history,
+    'user.reportes.payments': _user_payments_page,
+    'petty_cash.index.open_period': _petty_cash_open_period,
+    'admin.panel.pending_users': _admin_panel_pending_users,
+    'admin.residentes.active_count': _admin_residentes_active_count,
+    'documents.public_signature.exists': _public_signature_exists,
+    'user.dashboard.new_docs': _dashboard_new_docs,
+    'documents.index.active_role': _documents_active_role,
+}
+
+
+def sequential_scans(connection, statement):
+    """Retorna [(tabla, detalle)] de los recorridos secuenciales del plan."""
+    rows = connection.execute(Explain(statement)).all()
+
+    if connection.dialect.name == 'postgresql':
+        scans = []
+
+        def walk(node):
+            if node.get('Node Type') == 'Seq Scan':
+                scans.append((node['Relation Name'], f"Seq Scan on {node['Relation Name']}"))
+            for child in node.get('Plans', []):
+                walk(child)
+
+        walk(rows[0][0][0]['Plan'])
+        return scans
+
+    # SQLite: (id, parent, notused, detail). 'SCAN t USING INDEX' es un recorrido por índice.
+    scans = []
+    for row in rows:
+        detail = row[-1]
+        parts = detail.split()
+        if len(parts) >= 2 and parts[0] == 'SCAN' and 'INDEX' not in detail:
+            scans.append((parts[1], detail))
+    return scans
+
+
+def check_query_plans(connection, params, max_rows, queries=None):
+    """
+    Ejecuta EXPLAIN sobre las consultas registradas y retorna los problemas encontrados:
+    [{'query', 'table', 'rows', 'detail'}] para cada recorrido secuencial sobre una tabla
+    con más de 'max_rows' filas. Lista vacía = todos los planes usan índices.
+    """
+    if connection.dialect.name == 'postgresql':
+        # Estadísticas frescas: sin ANALYZE el planner no conoce el tamaño real de la tabla sembrada
+        connection.execute(text('ANALYZE'))
+
+    row_counts = {}
+    issues = []
+    for name, build in (queries or HOT_QUERIES).items():
+        for table, detail in sequential_scans(connection, build(params)):
+            if table not in row_counts:
+                row_counts[table] = connection.execute(text(f'SELECT COUNT(*) FROM {table}')).scalar()
+            if row_counts[table] > max_rows:
+                issues.append({'query': name, 'table': table, 'rows': row_counts[table], 'detail': detail})
+    return issues
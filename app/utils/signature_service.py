@@ -4,6 +4,7 @@ import base64
 import json
 import os
 from flask import current_app
+from app.http_client import http_client
 import hashlib
 
 # --- ABSTRACT STRATEGY ---
@@ -24,6 +25,8 @@ class SignatureProvider(ABC):
         pass
 
 # --- CONCRETE STRATEGY: NEXXIT / UANATACA / ONESHOT ---
+nexxit_http = http_client('nexxit', timeout=30)
+
 class NexxitOneshotProvider(SignatureProvider):
     BASE_URL = "https://wfdev.nexxit.dev"
     DEFAULT_FLOW_TYPE = "-NXk9JhsCP7KvP9eQa_4_pb" # Default template
@@ -81,7 +84,7 @@ class NexxitOneshotProvider(SignatureProvider):
         }
 
         try:
-            response = requests.post(f"{self.BASE_URL}/wf/flow", json=payload, headers=self.headers, timeout=30)
+            response = nexxit_http.post(f"{self.BASE_URL}/wf/flow", json=payload, headers=self.headers)
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException as e:
@@ -92,7 +95,7 @@ class NexxitOneshotProvider(SignatureProvider):
 
     def get_flow_details(self, flow_id):
         try:
-            response = requests.get(f"{self.BASE_URL}/wf/flow-files/{flow_id}", headers=self.headers, timeout=30)
+            response = nexxit_http.get(f"{self.BASE_URL}/wf/flow-files/{flow_id}", headers=self.headers)
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException as e:
@@ -102,7 +105,9 @@ class NexxitOneshotProvider(SignatureProvider):
     def download_file(self, remote_path):
         payload = {"path": remote_path}
         try:
-            response = requests.post(f"{self.BASE_URL}/wf/file", json=payload, headers=self.headers, timeout=60)
+            # Descarga de solo lectura: se puede reintentar
+            response = nexxit_http.post(f"{self.BASE_URL}/wf/file", json=payload, headers=self.headers,
+                                        idempotent=True, timeout=60)
             response.raise_for_status()
             return response.content
         except requests.exceptions.RequestException as e:
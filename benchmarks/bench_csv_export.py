@@ -0,0 +1,118 @@
+"""
+Benchmark de memoria de la exportación CSV de pagos (master.reports, export_payments).
+
+Para cada cantidad de pagos genera una base sintética nueva (benchmarks.synthetic_data),
+pide el reporte con el test client, espera el job en segundo plano
+(app.services.export_service) y mide el pico de memoria con tracemalloc. El job escribe
+el CSV por lotes, así que el pico debe ser plano: no depende del número de filas.
+
+Uso:
+    python -m benchmarks.bench_csv_export [--payments 10000,100000,1000000] [--tolerance 0.5]
+        [--output bench_csv_export.json]
+
+Termina con código 1 si el pico de la corrida más grande supera al de la más chica
+en más de 'tolerance' (0.5 = 50%).
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from unittest.mock import patch
+
+from benchmarks.synthetic_data import SyntheticConfig
+
+UNITS_PER_CONDO = 100
+MONTHS = 100
+
+
+def synthetic_config(payments):
+    """Un pago por unidad y mes: condominios x 100 unidades x 100 meses."""
+    condos = max(1, payments // (UNITS_PER_CONDO * MONTHS))
+    return SyntheticConfig(condos=condos, units_per_condo=UNITS_PER_CONDO, residents_per_unit=1, months=MONTHS,
+                           documents_per_condo=0, signatures_per_document=0, batch_size=20000)
+
+
+def measure(payments, database_url):
+    from flask_jwt_extended import create_access_token
+    from config import Config
+    from app import create_app, db
+    from app.models import ExportJob, User
+    from app.services.export_service import export_worker
+    from benchmarks.synthetic_data import generate
+
+    with patch.object(Config, 'SQLALCHEMY_DATABASE_URI', database_url):
+        app = create_app()
+    app.config.update(TESTING=True, JWT_COOKIE_CSRF_PROTECT=False)
+
+    with app.app_context():
+        db.create_all()
+        started = time.perf_counter()
+        with db.engine.begin() as connection:
+            counts = generate(connection, synthetic_config(payments))
+        seeded_s = time.perf_counter() - started
+
+        master = User(email="master@bench.com", first_name="Bench", last_name="Master", cedula="BENCH-M",
+                      role="MASTER", status="active")
+        db.session.add(master)
+        db.session.commit()
+        token = create_access_token(identity=str(master.id))
+        db.session.remove()
+
+    client = app.test_client()
+    client.set_cookie('access_token_cookie', token)
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    response = client.post('/master/reports', data={'action': 'export_payments'})
+    assert response.status_code == 302, response.status_code
+    export_worker.wait()
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    with app.app_context():
+        job = db.session.get(ExportJob, int(response.location.rsplit('export_job=', 1)[1]))
+        assert job.status == 'DONE', job.error
+        rows, size = job.rows_written, job.file_size
+        os.remove(job.file_path)
+
+    return {
+        'payments': counts['payments'],
+        'rows': rows,
+        'csv_mb': round(size / 1e6, 1),
+        'seed_s': round(seeded_s, 1),
+        'export_s': round(elapsed, 1),
+        'peak_kb': round(peak / 1024, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--payments', default='10000,100000,1000000')
+    parser.add_argument('--tolerance', type=float, default=0.5)
+    parser.add_argument('--output', default='bench_csv_export.json')
+    args = parser.parse_args()
+
+    results = []
+    for payments in [int(p) for p in args.payments.split(',') if p.strip()]:
+        with tempfile.TemporaryDirectory() as tmp:
+            result = measure(payments, f"sqlite:///{os.path.join(tmp, 'bench_csv.db')}")
+        results.append(result)
+        print(f"{result['payments']:>9} pagos  {result['rows']:>9} filas  {result['csv_mb']:>7} MB  "
+              f"exportación {result['export_s']:>6} s  pico {result['peak_kb']:>9} KB")
+
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+
+    smallest, largest = results[0], results[-1]
+    if largest['peak_kb'] > smallest['peak_kb'] * (1 + args.tolerance):
+        print(f"El pico de memoria crece con las filas: {smallest['peak_kb']} -> {largest['peak_kb']} KB")
+        sys.exit(1)
+    print("Memoria plana.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,324 @@
+"""
+Benchmark de endpoints calientes con el test client de Flask.
+
+Para cada escala genera una base sintética (benchmarks.synthetic_data), ejecuta
+cada escenario N veces y reporta p50/p95 de latencia, queries por request y
+pico de memoria (tracemalloc, en una pasada aparte para no distorsionar la latencia).
+Los resultados se guardan en JSON para comparar corridas.
+
+Uso:
+    python -m benchmarks.bench_endpoints run [--scales small,medium] [--iterations 50] [--output results.json]
+    python -m benchmarks.bench_endpoints compare baseline.json current.json [--threshold 0.15]
+
+'compare' termina con código 1 si algún endpoint empeora más que el umbral
+(p95 o pico de memoria) o si ejecuta más queries que en la línea base.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from unittest.mock import patch
+
+from benchmarks.synthetic_data import SyntheticConfig
+
+SCALES = {
+    'small': SyntheticConfig(condos=10, units_per_condo=20, residents_per_unit=2, months=6,
+                             documents_per_condo=10, signatures_per_document=20),
+    'medium': SyntheticConfig(condos=200, units_per_condo=50, residents_per_unit=3, months=12,
+                              documents_per_condo=30, signatures_per_document=100),
+    'large': SyntheticConfig(condos=2000, units_per_condo=100, residents_per_unit=4, months=12,
+                             documents_per_condo=50, signatures_per_document=300),
+}
+
+BENCH_PASSWORD = 'bench-password'
+MEMORY_SAMPLES = 5
+
+
+@dataclass
+class Scenario:
+    endpoint: str
+    method: str
+    path: str
+    actor: str = None          # 'admin' | 'resident' | None (anónimo)
+    form: dict = None
+    json: dict = None
+    per_request: object = None  # función(i) -> kwargs propios de cada iteración
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], stderr=subprocess.DEVNULL).decode().strip()
+    except Exception:
+        return None
+
+
+class EndpointBench:
+    """Una escala: app + base sembrada + actores + escenarios."""
+
+    def __init__(self, scale, database_url, iterations):
+        self.scale = scale
+        self.database_url = database_url
+        self.iterations = iterations
+
+    def setup(self):
+        from config import Config
+        from app import create_app, db
+        from app.extensions import limiter
+        from benchmarks.synthetic_data import generate
+
+        # Flask-SQLAlchemy crea el engine en init_app: la URI se fija antes de create_app()
+        with patch.object(Config, 'SQLALCHEMY_DATABASE_URI', self.database_url):
+            self.app = create_app()
+        self.app.config.update(TESTING=True, WTF_CSRF_ENABLED=False, JWT_COOKIE_CSRF_PROTECT=False)
+        limiter.enabled = False  # los logins se repiten cientos de veces
+
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+        db.drop_all()
+        db.create_all()
+        with db.engine.begin() as connection:
+            generate(connection, SCALES[self.scale])
+        self.actors = self._prepare_actors()
+
+        from flask import request_finished
+        self.last_query_count = None
+        request_finished.connect(self._record_queries, self.app)
+
+    def teardown(self):
+        from app import db
+        db.session.remove()
+        db.drop_all()
+        self.ctx.pop()
+
+    def _record_queries(self, sender, response, **extra):
+        from flask import g
+        stats = g.get('query_stats')
+        self.last_query_count = stats.count if stats else None
+
+    def _prepare_actors(self):
+        """Admin y residente del primer condominio, un documento público y pagos PENDING para el callback."""
+        from werkzeug.security import generate_password_hash
+        from sqlalchemy import select, insert
+        from app import db
+        from app.models import Condominium, User, Document, Payment
+
+        condo = db.session.execute(select(Condominium).order_by(Condominium.id).limit(1)).scalar_one()
+        admin = db.session.get(User, condo.admin_user_id)
+        resident = db.session.execute(
+            select(User).where(User.condominium_id == condo.id, User.role == 'USER', User.status == 'active')
+            .order_by(User.id).limit(1)
+        ).scalar_one()
+        password_hash = generate_password_hash(BENCH_PASSWORD)
+        admin.password_hash = password_hash
+        resident.password_hash = password_hash
+
+        document = db.session.execute(
+            select(Document).where(Document.condominium_id == condo.id, Document.collect_signatures_from_residents == True)
+            .order_by(Document.id).limit(1)
+        ).scalar_one()
+
+        # Un pago PENDING por cada request del callback (incluida la pasada de memoria)
+        callback_runs = self.iterations + MEMORY_SAMPLES + 1
+        prefix = f"bench-cb-{self.scale}"
+        db.session.execute(insert(Payment), [
+            {'amount': 60, 'amount_with_tax': 60, 'status': 'PENDING', 'client_transaction_id': f"{prefix}-{n}",
+             'user_id': resident.id, 'condominium_id': condo.id, 'payment_method': 'PAYPHONE'}
+            for n in range(callback_runs)
+        ])
+        db.session.commit()
+
+        return {
+            'slug': condo.subdomain, 'admin_id': admin.id, 'admin_email': admin.email,
+            'resident_id': resident.id, 'resident_email': resident.email,
+            'public_link': document.public_signature_link, 'callback_prefix': prefix,
+        }
+
+    def scenarios(self):
+        a = self.actors
+        return [
+            Scenario('auth.login', 'POST', '/global/ingresar',
+                     form={'email': a['resident_email'], 'password': BENCH_PASSWORD}),
+            Scenario('api.api_login', 'POST', '/api/auth/login',
+                     json={'email': a['resident_email'], 'password': BENCH_PASSWORD}),
+            Scenario('user.dashboard', 'GET', '/dashboard', actor='resident'),
+            Scenario('admin.admin_condominio_panel', 'GET', f"/{a['slug']}/admin/panel", actor='admin'),
+            Scenario('admin.finanzas', 'GET', f"/{a['slug']}/admin/finanzas", actor='admin'),
+            Scenario('petty_cash.index', 'GET', f"/{a['slug']}/admin/caja-chica", actor='admin'),
+            Scenario('document.index', 'GET', '/documentos/', actor='resident'),
+            Scenario('document.public_signature', 'POST', f"/documentos/firmar/{a['public_link']}",
+                     per_request=lambda i: {'data': {'name': f"Firmante {i}", 'cedula': f"BENCH{i:08d}"}}),
+            Scenario('payment.callback_pago', 'GET', '/pagos/callback',
+                     per_request=lambda i: {'query_string': {'id': str(i), 'clientTransactionId': f"{a['callback_prefix']}-{i}"}}),
+        ]
+
+    def _client_for(self, actor):
+        from flask_jwt_extended import create_access_token
+        client = self.app.test_client()
+        if actor:
+            identity = self.actors['admin_id'] if actor == 'admin' else self.actors['resident_id']
+            client.set_cookie('access_token_cookie', create_access_token(identity=str(identity)))
+        return client
+
+    def _request(self, client, scenario, i):
+        kwargs = {}
+        if scenario.form:
+            kwargs['data'] = scenario.form
+        if scenario.json:
+            kwargs['json'] = scenario.json
+        if scenario.per_request:
+            kwargs.update(scenario.per_request(i))
+        return client.open(scenario.path, method=scenario.method, **kwargs)
+
+    def run_scenario(self, scenario):
+        client = self._client_for(scenario.actor)
+        self._request(client, scenario, 0)  # calentamiento (plantillas, caché de compilación)
+
+        latencies, queries, statuses = [], [], set()
+        for i in range(1, self.iterations + 1):
+            start = time.perf_counter()
+            response = self._request(client, scenario, i)
+            latencies.append((time.perf_counter() - start) * 1000)
+            queries.append(self.last_query_count)
+            statuses.add(response.status_code)
+
+        # Pasada separada para memoria: tracemalloc multiplica la latencia
+        peaks = []
+        for i in range(self.iterations + 1, self.iterations + 1 + MEMORY_SAMPLES):
+            tracemalloc.start()
+            self._request(client, scenario, i)
+            peaks.append(tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+
+        return {
+            'p50_ms': round(statistics.median(latencies), 3),
+            'p95_ms': round(_percentile(latencies, 95), 3),
+            'mean_ms': round(statistics.fmean(latencies), 3),
+            'queries': statistics.median(q for q in queries if q is not None) if any(q is not None for q in queries) else None,
+            'peak_kb': round(max(peaks) / 1024, 1),
+            'status_codes': sorted(statuses),
+        }
+
+    def run(self):
+        from app.services.payphone import PayPhoneService
+        results = {}
+        # El callback confirma contra PayPhone: se reemplaza la llamada HTTP por una respuesta fija
+        with patch.object(PayPhoneService, 'confirm_payment', return_value={'transactionStatus': 'Approved'}):
+            for scenario in self.scenarios():
+                results[scenario.endpoint] = self.run_scenario(scenario)
+                r = results[scenario.endpoint]
+                print(f"  {scenario.endpoint:<32} p50 {r['p50_ms']:8.2f} ms  p95 {r['p95_ms']:8.2f} ms  "
+                      f"queries {r['queries']!s:>4}  peak {r['peak_kb']:9.1f} KB  {r['status_codes']}")
+        return results
+
+
+def run(args):
+    scales = [s.strip() for s in args.scales.split(',') if s.strip()]
+    unknown = [s for s in scales if s not in SCALES]
+    if unknown:
+        sys.exit(f"Escalas desconocidas: {unknown}. Disponibles: {list(SCALES)}")
+
+    report = {
+        'meta': {
+            'created_at': datetime.utcnow().isoformat(timespec='seconds'),
+            'commit': _git_commit(),
+            'python': platform.python_version(),
+            'iterations': args.iterations,
+            'database': args.database_url or 'sqlite (temporal)',
+        },
+        'scales': {},
+        'results': {},
+    }
+
+    for scale in scales:
+        with tempfile.TemporaryDirectory() as tmp:
+            database_url = args.database_url or f"sqlite:///{os.path.join(tmp, f'bench_{scale}.db')}"
+            print(f"[{scale}] {asdict(SCALES[scale])}")
+            bench = EndpointBench(scale, database_url, args.iterations)
+            bench.setup()
+            try:
+                report['scales'][scale] = asdict(SCALES[scale])
+                report['results'][scale] = bench.run()
+            finally:
+                bench.teardown()
+
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Resultados guardados en {args.output}")
+
+
+def compare_reports(baseline, current, threshold):
+    """Retorna [(escala, endpoint, métrica, antes, después)] con las regresiones encontradas."""
+    regressions = []
+    for scale, endpoints in current['results'].items():
+        for endpoint, now in endpoints.items():
+            before = baseline['results'].get(scale, {}).get(endpoint)
+            if not before:
+                continue
+            for metric in ('p95_ms', 'peak_kb'):
+                if before[metric] and now[metric] > before[metric] * (1 + threshold):
+                    regressions.append((scale, endpoint, metric, before[metric], now[metric]))
+            if before['queries'] is not None and now['queries'] is not None and now['queries'] > before['queries']:
+                regressions.append((scale, endpoint, 'queries', before['queries'], now['queries']))
+    return regressions
+
+
+def compare(args):
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+
+    print(f"Línea base {baseline['meta'].get('commit')} vs actual {current['meta'].get('commit')} (umbral {args.threshold:.0%})")
+    for scale, endpoints in current['results'].items():
+        for endpoint, now in endpoints.items():
+            before = baseline['results'].get(scale, {}).get(endpoint)
+            if before:
+                delta = (now['p95_ms'] - before['p95_ms']) / before['p95_ms'] if before['p95_ms'] else 0
+                print(f"  [{scale}] {endpoint:<32} p95 {before['p95_ms']:8.2f} -> {now['p95_ms']:8.2f} ms ({delta:+.1%})"
+                      f"  queries {before['queries']} -> {now['queries']}")
+
+    regressions = compare_reports(baseline, current, args.threshold)
+    for scale, endpoint, metric, before, now in regressions:
+        print(f"REGRESIÓN [{scale}] {endpoint}: {metric} {before} -> {now}")
+    if regressions:
+        sys.exit(1)
+    print("Sin regresiones.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help="ejecutar el benchmark")
+    run_parser.add_argument('--scales', default='small,medium')
+    run_parser.add_argument('--iterations', type=int, default=50)
+    run_parser.add_argument('--output', default='bench_endpoints.json')
+    run_parser.add_argument('--database-url', help="PostgreSQL local; por defecto un SQLite temporal por escala")
+    run_parser.set_defaults(handler=run)
+
+    compare_parser = commands.add_parser('compare', help="comparar dos corridas")
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('--threshold', type=float, default=0.15, help="fracción tolerada (0.15 = 15%%)")
+    compare_parser.set_defaults(handler=compare)
+
+    args = parser.parse_args()
+    args.handler(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+"""
+Micro-benchmark del filtro de tenant.
+
+Compara el costo por query del TenantQuery anterior (inspección de
+column_descriptions + filter_by en cada .all()/.first()/.count()) contra el
+hook actual basado en with_loader_criteria, sobre una tabla de 10k pagos.
+
+Uso:
+    python -m benchmarks.bench_tenant_query [--rows 10000] [--iterations 2000]
+"""
+import argparse
+import os
+import time
+from datetime import datetime, timedelta
+
+# Base de datos en memoria aislada del entorno local (.env)
+os.environ['DATABASE_URL'] = 'sqlite://'
+
+from flask import g
+from flask_sqlalchemy.query import Query
+from sqlalchemy import insert
+
+from app import create_app, db
+from app.models import Condominium, User, Payment
+
+
+class LegacyTenantQuery(Query):
+    """Reproducción del filtrado anterior, para tener la línea base."""
+
+    def _apply_filter(self):
+        tenant_id = g.condominium.id if g.get('condominium') else None
+        try:
+            entity = self.column_descriptions[0]['type']
+            has_column = hasattr(entity, 'condominium_id')
+        except Exception:
+            has_column = False
+        if tenant_id and has_column:
+            return self.filter_by(condominium_id=tenant_id)
+        return self
+
+    def all(self):
+        return Query.all(self._apply_filter())
+
+    def count(self):
+        return Query.count(self._apply_filter())
+
+
+def seed(rows, tenants=10):
+    condos = [
+        Condominium(name=f"Bench {i}", subdomain=f"bench-{i}", main_street="A", cross_street="B", city="Quito")
+        for i in range(tenants)
+    ]
+    db.session.add_all(condos)
+    db.session.flush()
+    users = [
+        User(email=f"bench{i}@test.com", first_name="Bench", last_name=str(i), cedula=f"B{i}",
+             condominium_id=condos[i].id, status='active')
+        for i in range(tenants)
+    ]
+    db.session.add_all(users)
+    db.session.flush()
+
+    base_date = datetime(2025, 1, 1)
+    statuses = ['APPROVED', 'PENDING', 'PENDING_REVIEW', 'REJECTED']
+    db.session.execute(insert(Payment), [
+        {
+            'amount': 50, 'amount_with_tax': 50, 'tax': 0, 'currency': 'USD',
+            'status': statuses[n % len(statuses)],
+            'client_transaction_id': f"bench-{n}",
+            'user_id': users[n % tenants].id,
+            'condominium_id': condos[n % tenants].id,
+            'created_at': base_date + timedelta(minutes=n),
+        }
+        for n in range(rows)
+    ])
+    db.session.commit()
+    return condos[0]
+
+
+def timed(label, fn, iterations):
+    fn()  # calentar caché de compilación
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    elapsed = time.perf_counter() - start
+    per_query_us = elapsed / iterations * 1_000_000
+    print(f"  {label:<42} {per_query_us:9.1f} µs/query")
+    return per_query_us
+
+
+def run(rows, iterations):
+    app = create_app()
+    with app.test_request_context():
+        db.create_all()
+        tenant = seed(rows)
+        g.condominium = tenant
+
+        def legacy_query():
+            return LegacyTenantQuery(Payment, session=db.session())\
+                .execution_options(skip_tenant_filter=True)
+
+        scenarios = {
+            'list (status + order_by + limit 20)': (
+                # El TenantQuery anterior fallaba con filter_by() después de limit();
+                # aquí se aplica su filtro antes del limit para poder medirlo.
+                lambda: Query.all(legacy_query().filter(Payment.status == 'PENDING_REVIEW')
+                    ._apply_filter().order_by(Payment.created_at.desc()).limit(20)),
+                lambda: Payment.query.filter(Payment.status == 'PENDING_REVIEW')
+                    .order_by(Payment.created_at.desc()).limit(20).all(),
+            ),
+            'count (status)': (
+                lambda: legacy_query().filter(Payment.status == 'APPROVED').count(),
+                lambda: Payment.query.filter(Payment.status == 'APPROVED').count(),
+            ),
+        }
+
+        print(f"Tabla payments: {rows} filas, {iterations} iteraciones por escenario")
+        for name, (legacy, current) in scenarios.items():
+            print(name)
+            before = timed('antes (TenantQuery + filter_by)', legacy, iterations)
+            after = timed('después (with_loader_criteria)', current, iterations)
+            print(f"  {'diferencia':<42} {before - after:+9.1f} µs/query")
+
+        db.session.remove()
+        db.drop_all()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=10_000)
+    parser.add_argument('--iterations', type=int, default=2_000)
+    args = parser.parse_args()
+    run(args.rows, args.iterations)
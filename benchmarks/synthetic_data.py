@@ -0,0 +1,386 @@
+"""
+Generador de datos sintéticos para pruebas de carga y benchmarks.
+
+Crea N condominios con sus unidades, residentes, pagos mensuales, documentos y
+firmas de residentes mediante inserciones masivas por lotes (executemany; COPY
+cuando el driver es psycopg2). Es determinista: misma semilla + misma base de
+partida (vacía) = mismas filas, para que los resultados de benchmark sean
+comparables entre corridas.
+
+Los IDs se asignan en el generador (rangos contiguos a partir del máximo actual),
+así ninguna tabla necesita leer de vuelta lo insertado.
+
+Uso:
+    python -m benchmarks.synthetic_data --condos 10000 --units 20 --residents 5 \\
+        [--months 12] [--payments-per-month 1] [--documents 5] [--signatures 10] \\
+        [--seed 42] [--batch-size 5000] [--database-url sqlite:///bench.db]
+"""
+import argparse
+import csv
+import io
+import itertools
+import os
+import random
+import time
+from dataclasses import dataclass, asdict
+from datetime import datetime, timedelta
+
+# Fecha base fija: usar datetime.now() rompería el determinismo
+BASE_DATE = datetime(2025, 1, 1)
+
+FIRST_NAMES = ['Ana', 'Luis', 'María', 'Carlos', 'Sofía', 'Jorge', 'Lucía', 'Andrés', 'Paula', 'Diego']
+LAST_NAMES = ['Pérez', 'Gómez', 'Torres', 'Vera', 'Andrade', 'Castro', 'Mora', 'Salazar', 'Cevallos', 'Ruiz']
+CITIES = ['Quito', 'Guayaquil', 'Cuenca', 'Manta', 'Loja']
+PAYMENT_STATUSES = ['APPROVED'] * 7 + ['PENDING', 'PENDING_REVIEW', 'REJECTED']
+PAYMENT_METHODS = ['PAYPHONE', 'PAYPHONE', 'TRANSFER', 'CASH']
+DOCUMENT_STATUSES = ['draft', 'sent', 'signed', 'signed']
+
+
+@dataclass
+class SyntheticConfig:
+    condos: int = 10
+    units_per_condo: int = 20
+    residents_per_unit: int = 2
+    months: int = 12
+    payments_per_month: int = 1      # por unidad
+    documents_per_condo: int = 5
+    signatures_per_document: int = 10
+    seed: int = 42
+    batch_size: int = 5000
+
+
+def _rng(config, table):
+    # Un generador por tabla: cada tabla es reproducible sin importar el tamaño de lote
+    return random.Random(f"{config.seed}:{table}")
+
+
+def _batched(rows, size):
+    iterator = iter(rows)
+    while True:
+        batch = list(itertools.islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _next_id(connection, table):
+    from sqlalchemy import func, select
+    return (connection.execute(select(func.max(table.c.id))).scalar() or 0) + 1
+
+
+class _Layout:
+    """Rangos de IDs de cada entidad, calculados a partir de la configuración."""
+
+    def __init__(self, config, connection, tables):
+        self.config = config
+        self.condo_base = _next_id(connection, tables['condominiums'])
+        self.user_base = _next_id(connection, tables['users'])
+        self.unit_base = _next_id(connection, tables['units'])
+        self.payment_base = _next_id(connection, tables['payments'])
+        self.document_base = _next_id(connection, tables['documents'])
+        self.signature_base = _next_id(connection, tables['resident_signatures'])
+
+    def condo_id(self, c):
+        return self.condo_base + c
+
+    def admin_id(self, c):
+        return self.user_base + c
+
+    def unit_id(self, c, u):
+        return self.unit_base + c * self.config.units_per_condo + u
+
+    def resident_id(self, c, u, r):
+        cfg = self.config
+        return self.user_base + cfg.condos + (c * cfg.units_per_condo + u) * cfg.residents_per_unit + r
+
+    def subdomain(self, c):
+        return f"syn-{self.condo_id(c)}"
+
+
+# --- GENERADORES DE FILAS ---
+
+def condominium_rows(config, layout):
+    rng = _rng(config, 'condominiums')
+    for c in range(config.condos):
+        yield {
+            'id': layout.condo_id(c),
+            'name': f"Conjunto Sintético {layout.condo_id(c)}",
+            'subdomain': layout.subdomain(c),
+            'main_street': f"Av. {rng.choice(LAST_NAMES)}",
+            'cross_street': f"Calle {rng.randint(1, 200)}",
+            'city': rng.choice(CITIES),
+            'country': 'Ecuador',
+            'status': 'ACTIVO',
+            'environment': 'production',
+            'is_demo': False,
+            'is_internal': False,
+            'has_documents_module': True,
+            'has_billing_module': rng.random() < 0.6,
+            'has_requests_module': False,
+            'created_at': BASE_DATE,
+            'updated_at': BASE_DATE,
+        }
+
+
+def admin_rows(config, layout):
+    for c in range(config.condos):
+        user_id = layout.admin_id(c)
+        yield {
+            'id': user_id,
+            'email': f"admin{user_id}@{layout.subdomain(c)}.condomanager.ec",
+            'cedula': f"{user_id:010d}",
+            'first_name': 'Admin',
+            'last_name': layout.subdomain(c),
+            'role': 'ADMIN',
+            'status': 'active',
+            'tenant': layout.subdomain(c),
+            'condominium_id': layout.condo_id(c),
+            'email_verified': True,
+            'created_at': BASE_DATE,
+        }
+
+
+def unit_rows(config, layout):
+    rng = _rng(config, 'units')
+    for c in range(config.condos):
+        for u in range(config.units_per_condo):
+            yield {
+                'id': layout.unit_id(c, u),
+                'property_number': f"{u + 1:03d}",
+                'name': f"Casa {u + 1}",
+                'property_type': rng.choice(['casa', 'departamento']),
+                'area_m2': round(rng.uniform(60, 250), 1),
+                'bedrooms': rng.randint(1, 4),
+                'bathrooms': rng.randint(1, 3),
+                'condominium_id': layout.condo_id(c),
+                'created_by': layout.admin_id(c),
+                'status': 'ocupada',
+                'created_at': BASE_DATE,
+                'updated_at': BASE_DATE,
+            }
+
+
+def resident_rows(config, layout):
+    rng = _rng(config, 'residents')
+    for c in range(config.condos):
+        for u in range(config.units_per_condo):
+            for r in range(config.residents_per_unit):
+                user_id = layout.resident_id(c, u, r)
+                yield {
+                    'id': user_id,
+                    'email': f"r{user_id}@{layout.subdomain(c)}.condomanager.ec",
+                    'cedula': f"{user_id:010d}",
+                    'first_name': rng.choice(FIRST_NAMES),
+                    'last_name': rng.choice(LAST_NAMES),
+                    'role': 'USER',
+                    'status': 'active' if rng.random() < 0.9 else 'pending',
+                    'tenant': layout.subdomain(c),
+                    'condominium_id': layout.condo_id(c),
+                    'unit_id': layout.unit_id(c, u),
+                    'email_verified': True,
+                    'created_at': BASE_DATE + timedelta(minutes=rng.randint(0, 525600)),
+                }
+
+
+def payment_rows(config, layout):
+    rng = _rng(config, 'payments')
+    payment_id = layout.payment_base
+    for c in range(config.condos):
+        for u in range(config.units_per_condo):
+            payer = layout.resident_id(c, u, 0) if config.residents_per_unit else layout.admin_id(c)
+            for month in range(config.months):
+                for _ in range(config.payments_per_month):
+                    amount = rng.choice([45, 60, 75, 90])
+                    created_at = BASE_DATE + timedelta(days=30 * month + rng.randint(0, 29), seconds=rng.randint(0, 86399))
+                    status = rng.choice(PAYMENT_STATUSES)
+                    method = rng.choice(PAYMENT_METHODS)
+                    # Los pagos en revisión son transferencias con comprobante subido
+                    if status == 'PENDING_REVIEW':
+                        method = 'TRANSFER'
+                    yield {
+                        'id': payment_id,
+                        'amount': amount,
+                        'amount_with_tax': amount,
+                        'tax': 0,
+                        'currency': 'USD',
+                        'description': f"Alícuota mes {month + 1}",
+                        'client_transaction_id': f"syn-{payment_id}",
+                        'status': status,
+                        'payment_method': method,
+                        'proof_of_payment': f"proofs/syn-{payment_id}.jpg" if method == 'TRANSFER' else None,
+                        'user_id': payer,
+                        'unit_id': layout.unit_id(c, u),
+                        'condominium_id': layout.condo_id(c),
+                        'created_at': created_at,
+                        'updated_at': created_at,
+                    }
+                    payment_id += 1
+
+
+def document_rows(config, layout):
+    rng = _rng(config, 'documents')
+    document_id = layout.document_base
+    for c in range(config.condos):
+        for d in range(config.documents_per_condo):
+            status = rng.choice(DOCUMENT_STATUSES)
+            created_at = BASE_DATE + timedelta(days=rng.randint(0, 365))
+            collects = status != 'draft' and config.signatures_per_document > 0
+            yield {
+                'id': document_id,
+                'title': f"Comunicado {d + 1}",
+                'content': "Contenido generado para pruebas de carga.",
+                'status': status,
+                'signature_type': 'none',
+                'requires_signature': collects,
+                'collect_signatures_from_residents': collects,
+                'public_signature_link': f"syn{document_id}",
+                'signature_count': config.signatures_per_document if collects else 0,
+                'created_by_id': layout.admin_id(c),
+                'condominium_id': layout.condo_id(c),
+                'created_at': created_at,
+                'updated_at': created_at,
+            }
+            document_id += 1
+
+
+def signature_rows(config, layout, documents):
+    """Firmas de residentes: solo para los documentos que recolectan firmas."""
+    rng = _rng(config, 'resident_signatures')
+    signature_id = layout.signature_base
+    for document in documents:
+        for s in range(document['signature_count']):
+            yield {
+                'id': signature_id,
+                'document_id': document['id'],
+                'full_name': f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+                'cedula': f"S{document['id']:08d}{s:04d}",
+                'signed_at': document['created_at'] + timedelta(hours=rng.randint(1, 240)),
+            }
+            signature_id += 1
+
+
+# --- INSERCIÓN MASIVA ---
+
+def _copy_rows(connection, table, batch):
+    """COPY ... FROM STDIN (psycopg2): varias veces más rápido que INSERT en PostgreSQL."""
+    columns = list(batch[0].keys())
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in batch:
+        writer.writerow([row[column] for column in columns])  # None -> campo vacío -> NULL
+    buffer.seek(0)
+    cursor = connection.connection.dbapi_connection.cursor()
+    try:
+        cursor.copy_expert(f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+    finally:
+        cursor.close()
+
+
+def bulk_insert(connection, table, rows, batch_size):
+    """Inserta 'rows' (iterable de dicts) por lotes. Retorna la cantidad insertada."""
+    use_copy = connection.dialect.name == 'postgresql' and connection.dialect.driver == 'psycopg2'
+    total = 0
+    for batch in _batched(rows, batch_size):
+        if use_copy:
+            _copy_rows(connection, table, batch)
+        else:
+            connection.execute(table.insert(), batch)
+        total += len(batch)
+    return total
+
+
+def _sync_sequences(connection, tables):
+    """PostgreSQL: los IDs se insertaron explícitos; las secuencias deben continuar desde el máximo."""
+    from sqlalchemy import text
+    for table in tables:
+        connection.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), "
+            f"COALESCE((SELECT MAX(id) FROM {table.name}), 0) + 1, false)"
+        ))
+
+
+def generate(connection, config):
+    """
+    Genera el conjunto completo dentro de la conexión/transacción recibida.
+    Retorna {tabla: filas insertadas}.
+    """
+    from sqlalchemy import bindparam
+    from app.models import Condominium, User, Unit, Payment, Document, ResidentSignature
+
+    tables = {model.__tablename__: model.__table__
+              for model in (Condominium, User, Unit, Payment, Document, ResidentSignature)}
+    layout = _Layout(config, connection, tables)
+    size = config.batch_size
+
+    if connection.dialect.name == 'sqlite':
+        connection.exec_driver_sql('PRAGMA synchronous = OFF')
+
+    counts = {}
+    # Orden por claves foráneas: condominios -> admins -> unidades -> residentes -> admin_user_id
+    counts['condominiums'] = bulk_insert(connection, tables['condominiums'], condominium_rows(config, layout), size)
+    counts['users'] = bulk_insert(connection, tables['users'], admin_rows(config, layout), size)
+    counts['units'] = bulk_insert(connection, tables['units'], unit_rows(config, layout), size)
+    counts['users'] += bulk_insert(connection, tables['users'], resident_rows(config, layout), size)
+
+    condos = tables['condominiums']
+    assign_admin = condos.update().where(condos.c.id == bindparam('b_id')).values(admin_user_id=bindparam('b_admin'))
+    for batch in _batched(({'b_id': layout.condo_id(c), 'b_admin': layout.admin_id(c)} for c in range(config.condos)), size):
+        connection.execute(assign_admin, batch)
+
+    counts['payments'] = bulk_insert(connection, tables['payments'], payment_rows(config, layout), size)
+
+    # Los documentos son pocos: se conservan para derivar sus firmas
+    documents = list(document_rows(config, layout))
+    counts['documents'] = bulk_insert(connection, tables['documents'], documents, size)
+    counts['resident_signatures'] = bulk_insert(
+        connection, tables['resident_signatures'], signature_rows(config, layout, documents), size
+    )
+
+    if connection.dialect.name == 'postgresql':
+        _sync_sequences(connection, tables.values())
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--condos', type=int, default=SyntheticConfig.condos)
+    parser.add_argument('--units', type=int, default=SyntheticConfig.units_per_condo, help="unidades por condominio")
+    parser.add_argument('--residents', type=int, default=SyntheticConfig.residents_per_unit, help="residentes por unidad")
+    parser.add_argument('--months', type=int, default=SyntheticConfig.months)
+    parser.add_argument('--payments-per-month', type=int, default=SyntheticConfig.payments_per_month, help="por unidad")
+    parser.add_argument('--documents', type=int, default=SyntheticConfig.documents_per_condo, help="por condominio")
+    parser.add_argument('--signatures', type=int, default=SyntheticConfig.signatures_per_document, help="por documento")
+    parser.add_argument('--seed', type=int, default=SyntheticConfig.seed)
+    parser.add_argument('--batch-size', type=int, default=SyntheticConfig.batch_size)
+    parser.add_argument('--database-url', help="por defecto DATABASE_URL del entorno")
+    parser.add_argument('--create-schema', action='store_true', help="db.create_all() antes de generar")
+    args = parser.parse_args()
+
+    if args.database_url:
+        os.environ['DATABASE_URL'] = args.database_url
+    # Importar después de fijar DATABASE_URL: Config la lee al importarse
+    from app import create_app, db
+
+    config = SyntheticConfig(
+        condos=args.condos, units_per_condo=args.units, residents_per_unit=args.residents,
+        months=args.months, payments_per_month=args.payments_per_month,
+        documents_per_condo=args.documents, signatures_per_document=args.signatures,
+        seed=args.seed, batch_size=args.batch_size,
+    )
+    app = create_app()
+    with app.app_context():
+        if args.create_schema:
+            db.create_all()
+        print(f"Generando: {asdict(config)}")
+        start = time.perf_counter()
+        with db.engine.begin() as connection:
+            counts = generate(connection, config)
+        elapsed = time.perf_counter() - start
+
+    for table, rows in counts.items():
+        print(f"  {table:<22} {rows:>12,}")
+    print(f"Total {sum(counts.values()):,} filas en {elapsed:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -18,4 +18,81 @@ class Config:
     
     # AGREGAR ESTO AL FINAL del archivo config.py
     JWT_SECRET_KEY = os.getenv('JWT_SECRET', 'jwt_fallback_secret_2025')
-    JWT_ACCESS_TOKEN_EXPIRES = 86400  # 24 horas en segundos
\ No newline at end of file
+    JWT_ACCESS_TOKEN_EXPIRES = 86400  # 24 horas en segundos
+
+    # Caché en proceso de resolución de tenants (segundos)
+    TENANT_CACHE_TTL = int(os.getenv('TENANT_CACHE_TTL', 60))
+
+    # Aislamiento de tenants: 'orm' (filtro en SQLAlchemy) o 'rls' (políticas de PostgreSQL).
+    # En modo 'rls' el rol de la app NO puede ser superusuario ni tener BYPASSRLS.
+    TENANT_ISOLATION_MODE = os.getenv('TENANT_ISOLATION_MODE', 'orm')
+
+    # Arnés de planes (tests/test_query_plans.py): máximo de filas tolerado en un recorrido secuencial
+    QUERY_PLAN_MAX_SEQSCAN_ROWS = int(os.getenv('QUERY_PLAN_MAX_SEQSCAN_ROWS', 1000))
+
+    # Contador de queries: una misma sentencia repetida N veces en un request se reporta como probable N+1
+    QUERY_N_PLUS_ONE_THRESHOLD = int(os.getenv('QUERY_N_PLUS_ONE_THRESHOLD', 5))
+
+    # Cabecera Server-Timing en todas las respuestas (por defecto solo para usuarios MASTER)
+    SERVER_TIMING_ENABLED = os.getenv('SERVER_TIMING_ENABLED', 'false').lower() == 'true'
+    # Requests más lentos que este umbral (ms) se registran con su desglose por fase; 0 = todos
+    REQUEST_TIMING_LOG_MS = int(os.getenv('REQUEST_TIMING_LOG_MS', 500))
+
+    # /metrics (Prometheus). Con METRICS_TOKEN definido se exige 'Authorization: Bearer <token>'
+    METRICS_TOKEN = os.getenv('METRICS_TOKEN')
+    # En producción (FLASK_ENV=production) /metrics no se sirve sin METRICS_TOKEN
+    METRICS_REQUIRE_TOKEN = os.getenv('METRICS_REQUIRE_TOKEN',
+                                      str(os.getenv('FLASK_ENV') == 'production')).lower() == 'true'
+    # Histograma por condominio: desactivado por defecto; máximo de slugs con etiqueta propia por proceso
+    METRICS_TENANT_LABELS = os.getenv('METRICS_TENANT_LABELS', 'false').lower() == 'true'
+    METRICS_TENANT_LABEL_LIMIT = int(os.getenv('METRICS_TENANT_LABEL_LIMIT', 50))
+
+    # Perfilador bajo demanda: intervalo de muestreo, directorio (por defecto instance/profiles) y retención
+    PROFILER_INTERVAL_MS = float(os.getenv('PROFILER_INTERVAL_MS', 5))
+    PROFILES_DIR = os.getenv('PROFILES_DIR')
+    PROFILES_KEEP = int(os.getenv('PROFILES_KEEP', 100))
+
+    # Caché (Semana 3, Día 4). SimpleCache es local a cada proceso: en producción usar
+    # FileSystemCache (CACHE_DIR) o RedisCache (CACHE_REDIS_URL) para que las invalidaciones
+    # lleguen a todos los workers. Delante va un LRU en proceso (app/tiered_cache.py).
+    CACHE_TYPE = os.getenv('CACHE_TYPE', 'SimpleCache')
+    CACHE_DEFAULT_TIMEOUT = 300
+    CACHE_DIR = os.getenv('CACHE_DIR', '/tmp/condomanager-cache')
+    CACHE_REDIS_URL = os.getenv('CACHE_REDIS_URL')
+    CACHE_LOCAL_MAXSIZE = int(os.getenv('CACHE_LOCAL_MAXSIZE', 2048))
+    # Segundos que un worker confía en su copia del contador de versión de un condominio
+    CACHE_VERSION_TTL = float(os.getenv('CACHE_VERSION_TTL', 2))
+
+    # Caché en proceso de módulos habilitados por condominio (segundos)
+    ENTITLEMENT_CACHE_TTL = int(os.getenv('ENTITLEMENT_CACHE_TTL', 60))
+
+    # Marca del condominio (color, logo, nombre comercial) en el caché de dos niveles (segundos)
+    BRANDING_CACHE_TTL = int(os.getenv('BRANDING_CACHE_TTL', 300))
+
+    # Exportaciones en segundo plano: directorio compartido por los workers (por defecto instance/exports),
+    # hilos por proceso, filas por lote, vigencia del enlace de descarga (s), retención de archivos (h)
+    # y minutos sin avance (sin lote escrito) tras los cuales un job sin terminar se da por interrumpido
+    EXPORTS_DIR = os.getenv('EXPORTS_DIR')
+    EXPORT_WORKERS = int(os.getenv('EXPORT_WORKERS', 2))
+    EXPORT_BATCH_SIZE = int(os.getenv('EXPORT_BATCH_SIZE', 5000))
+    EXPORT_LINK_TTL = int(os.getenv('EXPORT_LINK_TTL', 3600))
+    EXPORT_RETENTION_HOURS = int(os.getenv('EXPORT_RETENTION_HOURS', 24))
+    EXPORT_STALE_MINUTES = int(os.getenv('EXPORT_STALE_MINUTES', 60))
+
+    # Conciliación de pagos PayPhone (flask payments reconcile): minutos para considerar abandonado
+    # un pago PENDING, hilos concurrentes, consultas por segundo a la pasarela por condominio y pagos por commit
+    RECONCILE_STALE_MINUTES = int(os.getenv('RECONCILE_STALE_MINUTES', 30))
+    RECONCILE_WORKERS = int(os.getenv('RECONCILE_WORKERS', 4))
+    RECONCILE_RATE_PER_TENANT = float(os.getenv('RECONCILE_RATE_PER_TENANT', 2))
+    RECONCILE_BATCH_SIZE = int(os.getenv('RECONCILE_BATCH_SIZE', 50))
+
+    # Cliente HTTP saliente (app.http_client): timeout de conexión (s), reintentos de llamadas idempotentes
+    # con backoff base/máximo (s), fallos seguidos que abren el circuito de un proveedor, segundos que
+    # permanece abierto y conexiones keep-alive por host
+    HTTP_CONNECT_TIMEOUT = float(os.getenv('HTTP_CONNECT_TIMEOUT', 3.05))
+    HTTP_RETRIES = int(os.getenv('HTTP_RETRIES', 2))
+    HTTP_BACKOFF = float(os.getenv('HTTP_BACKOFF', 0.25))
+    HTTP_BACKOFF_MAX = float(os.getenv('HTTP_BACKOFF_MAX', 2))
+    HTTP_BREAKER_THRESHOLD = int(os.getenv('HTTP_BREAKER_THRESHOLD', 5))
+    HTTP_BREAKER_RESET = float(os.getenv('HTTP_BREAKER_RESET', 30))
+    HTTP_POOL_SIZE = int(os.getenv('HTTP_POOL_SIZE', 10))
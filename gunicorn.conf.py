@@ -0,0 +1,25 @@
+"""
+Configuración de gunicorn (Procfile: gunicorn -c gunicorn.conf.py run:app).
+
+Métricas multiproceso: cada worker escribe sus métricas en PROMETHEUS_MULTIPROC_DIR
+y /metrics (app.metrics) las agrega. El directorio se vacía al arrancar el master
+para no arrastrar contadores de un despliegue anterior, y los archivos de un worker
+que termina se marcan como muertos para que sus gauges 'livesum' dejen de sumar.
+"""
+import os
+import shutil
+
+from prometheus_client import multiprocess
+
+# Debe existir antes de que los workers importen prometheus_client
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', '/tmp/condomanager-metrics')
+
+
+def on_starting(server):
+    path = os.environ['PROMETHEUS_MULTIPROC_DIR']
+    shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(path, exist_ok=True)
+
+
+def child_exit(server, worker):
+    multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,52 @@
+"""tenant row level security policies
+
+Revision ID: 3a1f9c7d2e10
+Revises: bf6bfbac732c
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3a1f9c7d2e10'
+down_revision = 'bf6bfbac732c'
+branch_labels = None
+depends_on = None
+
+# Tablas con columna condominium_id
+TENANT_TABLES = [
+    'users', 'units', 'documents', 'invoices', 'payments',
+    'petty_cash_transactions', 'user_special_roles', 'condominium_modules',
+]
+
+# Sin app.tenant_id en la conexión se ven todas las filas (modo 'orm', master, CLI).
+# Solo se restringe cuando la app corre con TENANT_ISOLATION_MODE='rls'.
+TENANT_PREDICATE = (
+    "NULLIF(current_setting('app.tenant_id', true), '') IS NULL "
+    "OR condominium_id = NULLIF(current_setting('app.tenant_id', true), '')::integer"
+)
+
+
+def upgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    for table in TENANT_TABLES:
+        op.execute(f'ALTER TABLE {table} ENABLE ROW LEVEL SECURITY')
+        op.execute(f'ALTER TABLE {table} FORCE ROW LEVEL SECURITY')
+        op.execute(
+            f'CREATE POLICY tenant_isolation ON {table} '
+            f'USING ({TENANT_PREDICATE}) WITH CHECK ({TENANT_PREDICATE})'
+        )
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    for table in TENANT_TABLES:
+        op.execute(f'DROP POLICY IF EXISTS tenant_isolation ON {table}')
+        op.execute(f'ALTER TABLE {table} NO FORCE ROW LEVEL SECURITY')
+        op.execute(f'ALTER TABLE {table} DISABLE ROW LEVEL SECURITY')
@@ -0,0 +1,50 @@
+"""add hot query composite indexes
+
+Revision ID: 5c2e8b4a9d31
+Revises: 3a1f9c7d2e10
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5c2e8b4a9d31'
+down_revision = '3a1f9c7d2e10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('payments', schema=None) as batch_op:
+        batch_op.create_index('ix_payments_condominium_status_created', ['condominium_id', 'status', 'created_at'], unique=False)
+
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.create_index('ix_users_condominium_status', ['condominium_id', 'status'], unique=False)
+
+    with op.batch_alter_table('resident_signatures', schema=None) as batch_op:
+        batch_op.create_index('ix_resident_signatures_document_cedula', ['document_id', 'cedula'], unique=False)
+
+    with op.batch_alter_table('documents', schema=None) as batch_op:
+        batch_op.create_index('ix_documents_condominium_created', ['condominium_id', 'created_at'], unique=False)
+
+    with op.batch_alter_table('user_special_roles', schema=None) as batch_op:
+        batch_op.create_index('ix_user_special_roles_user_condominium_active', ['user_id', 'condominium_id', 'is_active'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('user_special_roles', schema=None) as batch_op:
+        batch_op.drop_index('ix_user_special_roles_user_condominium_active')
+
+    with op.batch_alter_table('documents', schema=None) as batch_op:
+        batch_op.drop_index('ix_documents_condominium_created')
+
+    with op.batch_alter_table('resident_signatures', schema=None) as batch_op:
+        batch_op.drop_index('ix_resident_signatures_document_cedula')
+
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_index('ix_users_condominium_status')
+
+    with op.batch_alter_table('payments', schema=None) as batch_op:
+        batch_op.drop_index('ix_payments_condominium_status_created')
@@ -0,0 +1,64 @@
+"""add export jobs
+
+Revision ID: 7d4e1a2b9c60
+Revises: 5c2e8b4a9d31
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7d4e1a2b9c60'
+down_revision = '5c2e8b4a9d31'
+branch_labels = None
+depends_on = None
+
+# Misma política que 3a1f9c7d2e10 (tabla con condominium_id). Los trabajos globales del
+# maestro (condominium_id NULL) solo se ven sin tenant fijado en la conexión.
+TENANT_PREDICATE = (
+    "NULLIF(current_setting('app.tenant_id', true), '') IS NULL "
+    "OR condominium_id = NULLIF(current_setting('app.tenant_id', true), '')::integer"
+)
+
+
+def upgrade():
+    op.create_table('export_jobs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('kind', sa.String(length=30), nullable=False),
+    sa.Column('params', sa.JSON(), nullable=True),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('rows_written', sa.Integer(), nullable=False),
+    sa.Column('total_rows', sa.Integer(), nullable=True),
+    sa.Column('file_name', sa.String(length=255), nullable=True),
+    sa.Column('file_path', sa.String(length=500), nullable=True),
+    sa.Column('file_size', sa.Integer(), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('requested_by', sa.Integer(), nullable=False),
+    sa.Column('condominium_id', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('started_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.Column('expires_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['condominium_id'], ['condominiums.id'], ),
+    sa.ForeignKeyConstraint(['requested_by'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('export_jobs', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_export_jobs_expires_at'), ['expires_at'], unique=False)
+
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute('ALTER TABLE export_jobs ENABLE ROW LEVEL SECURITY')
+        op.execute('ALTER TABLE export_jobs FORCE ROW LEVEL SECURITY')
+        op.execute(
+            'CREATE POLICY tenant_isolation ON export_jobs '
+            f'USING ({TENANT_PREDICATE}) WITH CHECK ({TENANT_PREDICATE})'
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('export_jobs', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_export_jobs_expires_at'))
+
+    op.drop_table('export_jobs')
@@ -0,0 +1,30 @@
+"""add platform stats
+
+Revision ID: 8a1f3c7e2d45
+Revises: 7d4e1a2b9c60
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8a1f3c7e2d45'
+down_revision = '7d4e1a2b9c60'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # La tabla nace vacía: la primera lectura (o 'flask stats rebuild') la llena.
+    op.create_table('platform_stats',
+    sa.Column('key', sa.String(length=50), nullable=False),
+    sa.Column('value', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('key')
+    )
+
+
+def downgrade():
+    op.drop_table('platform_stats')
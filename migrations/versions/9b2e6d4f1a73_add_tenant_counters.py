@@ -0,0 +1,46 @@
+"""add tenant counters
+
+Revision ID: 9b2e6d4f1a73
+Revises: 8a1f3c7e2d45
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9b2e6d4f1a73'
+down_revision = '8a1f3c7e2d45'
+branch_labels = None
+depends_on = None
+
+# Misma política que 3a1f9c7d2e10 (tabla con condominium_id)
+TENANT_PREDICATE = (
+    "NULLIF(current_setting('app.tenant_id', true), '') IS NULL "
+    "OR condominium_id = NULLIF(current_setting('app.tenant_id', true), '')::integer"
+)
+
+
+def upgrade():
+    # La tabla nace vacía: cada condominio se calcula en su primera lectura.
+    op.create_table('tenant_counters',
+    sa.Column('condominium_id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=80), nullable=False),
+    sa.Column('value', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['condominium_id'], ['condominiums.id'], ),
+    sa.PrimaryKeyConstraint('condominium_id', 'name')
+    )
+
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute('ALTER TABLE tenant_counters ENABLE ROW LEVEL SECURITY')
+        op.execute('ALTER TABLE tenant_counters FORCE ROW LEVEL SECURITY')
+        op.execute(
+            'CREATE POLICY tenant_isolation ON tenant_counters '
+            f'USING ({TENANT_PREDICATE}) WITH CHECK ({TENANT_PREDICATE})'
+        )
+
+
+def downgrade():
+    op.drop_table('tenant_counters')
@@ -0,0 +1,28 @@
+"""add payment keyset indexes
+
+Revision ID: a3c5e7f9b214
+Revises: 9b2e6d4f1a73
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a3c5e7f9b214'
+down_revision = '9b2e6d4f1a73'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('payments', schema=None) as batch_op:
+        batch_op.create_index('ix_payments_condominium_created_id', ['condominium_id', 'created_at', 'id'], unique=False)
+        batch_op.create_index('ix_payments_user_created_id', ['user_id', 'created_at', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('payments', schema=None) as batch_op:
+        batch_op.drop_index('ix_payments_user_created_id')
+        batch_op.drop_index('ix_payments_condominium_created_id')
@@ -0,0 +1,35 @@
+"""keyset columns: backfill NULL dates and make them NOT NULL
+
+Revision ID: a5b7d9f1c304
+Revises: f3a5c7e9b102
+Create Date: 2026-10-20 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a5b7d9f1c304'
+down_revision = 'f3a5c7e9b102'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Los listados paginan por (fecha, id): una fecha NULL no se puede comparar con el cursor.
+    # Pagos sin fecha toman la de su última modificación; movimientos de caja chica sin fecha
+    # quedan en el período abierto, donde ya sumaban al saldo mientras no hubo cierres
+    op.execute('UPDATE payments SET created_at = COALESCE(updated_at, CURRENT_TIMESTAMP) WHERE created_at IS NULL')
+    op.execute('UPDATE petty_cash_transactions SET transaction_date = CURRENT_TIMESTAMP WHERE transaction_date IS NULL')
+    with op.batch_alter_table('payments', schema=None) as batch_op:
+        batch_op.alter_column('created_at', existing_type=sa.DateTime(), nullable=False)
+    with op.batch_alter_table('petty_cash_transactions', schema=None) as batch_op:
+        batch_op.alter_column('transaction_date', existing_type=sa.DateTime(), nullable=False)
+
+
+def downgrade():
+    with op.batch_alter_table('petty_cash_transactions', schema=None) as batch_op:
+        batch_op.alter_column('transaction_date', existing_type=sa.DateTime(), nullable=True)
+    with op.batch_alter_table('payments', schema=None) as batch_op:
+        batch_op.alter_column('created_at', existing_type=sa.DateTime(), nullable=True)
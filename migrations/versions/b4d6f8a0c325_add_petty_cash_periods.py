@@ -0,0 +1,59 @@
+"""add petty cash periods
+
+Revision ID: b4d6f8a0c325
+Revises: a3c5e7f9b214
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b4d6f8a0c325'
+down_revision = 'a3c5e7f9b214'
+branch_labels = None
+depends_on = None
+
+# Misma política que 3a1f9c7d2e10 (tabla con condominium_id)
+TENANT_PREDICATE = (
+    "NULLIF(current_setting('app.tenant_id', true), '') IS NULL "
+    "OR condominium_id = NULLIF(current_setting('app.tenant_id', true), '')::integer"
+)
+
+
+def upgrade():
+    # Sin cierres previos el saldo es la suma de todos los movimientos (período abierto desde el inicio)
+    op.create_table('petty_cash_periods',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('condominium_id', sa.Integer(), nullable=False),
+    sa.Column('period_start', sa.Date(), nullable=False),
+    sa.Column('period_end', sa.Date(), nullable=False),
+    sa.Column('opening_balance', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('income', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('expenses', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('closing_balance', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('transaction_count', sa.Integer(), nullable=False),
+    sa.Column('closed_at', sa.DateTime(), nullable=True),
+    sa.Column('closed_by', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['closed_by'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['condominium_id'], ['condominiums.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('condominium_id', 'period_start', name='uq_petty_cash_periods_condominium_start')
+    )
+    with op.batch_alter_table('petty_cash_transactions', schema=None) as batch_op:
+        batch_op.create_index('ix_petty_cash_condominium_date_id', ['condominium_id', 'transaction_date', 'id'], unique=False)
+
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute('ALTER TABLE petty_cash_periods ENABLE ROW LEVEL SECURITY')
+        op.execute('ALTER TABLE petty_cash_periods FORCE ROW LEVEL SECURITY')
+        op.execute(
+            'CREATE POLICY tenant_isolation ON petty_cash_periods '
+            f'USING ({TENANT_PREDICATE}) WITH CHECK ({TENANT_PREDICATE})'
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('petty_cash_transactions', schema=None) as batch_op:
+        batch_op.drop_index('ix_petty_cash_condominium_date_id')
+    op.drop_table('petty_cash_periods')
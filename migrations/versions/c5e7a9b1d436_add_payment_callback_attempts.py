@@ -0,0 +1,53 @@
+"""add payment callback attempts
+
+Revision ID: c5e7a9b1d436
+Revises: b4d6f8a0c325
+Create Date: 2026-10-18 19:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5e7a9b1d436'
+down_revision = 'b4d6f8a0c325'
+branch_labels = None
+depends_on = None
+
+# Misma política que 3a1f9c7d2e10 (tabla con condominium_id)
+TENANT_PREDICATE = (
+    "NULLIF(current_setting('app.tenant_id', true), '') IS NULL "
+    "OR condominium_id = NULLIF(current_setting('app.tenant_id', true), '')::integer"
+)
+
+
+def upgrade():
+    op.create_table('payment_callback_attempts',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('payment_id', sa.Integer(), nullable=False),
+    sa.Column('condominium_id', sa.Integer(), nullable=False),
+    sa.Column('payphone_id', sa.String(length=100), nullable=True),
+    sa.Column('outcome', sa.String(length=20), nullable=False),
+    sa.Column('remote_status', sa.String(length=30), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['condominium_id'], ['condominiums.id'], ),
+    sa.ForeignKeyConstraint(['payment_id'], ['payments.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('payment_callback_attempts', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_payment_callback_attempts_payment_id'), ['payment_id'], unique=False)
+
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute('ALTER TABLE payment_callback_attempts ENABLE ROW LEVEL SECURITY')
+        op.execute('ALTER TABLE payment_callback_attempts FORCE ROW LEVEL SECURITY')
+        op.execute(
+            'CREATE POLICY tenant_isolation ON payment_callback_attempts '
+            f'USING ({TENANT_PREDICATE}) WITH CHECK ({TENANT_PREDICATE})'
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('payment_callback_attempts', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_payment_callback_attempts_payment_id'))
+    op.drop_table('payment_callback_attempts')
@@ -0,0 +1,26 @@
+"""add export job heartbeat
+
+Revision ID: d7a9c1e3f548
+Revises: c5e7a9b1d436
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd7a9c1e3f548'
+down_revision = 'c5e7a9b1d436'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('export_jobs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('updated_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('export_jobs', schema=None) as batch_op:
+        batch_op.drop_column('updated_at')
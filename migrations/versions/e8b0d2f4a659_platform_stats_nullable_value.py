@@ -0,0 +1,27 @@
+"""platform stats: NULL value marks an invalidated indicator
+
+Revision ID: e8b0d2f4a659
+Revises: d7a9c1e3f548
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e8b0d2f4a659'
+down_revision = 'd7a9c1e3f548'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('platform_stats', schema=None) as batch_op:
+        batch_op.alter_column('value', existing_type=sa.Integer(), nullable=True)
+
+
+def downgrade():
+    op.execute('DELETE FROM platform_stats WHERE value IS NULL')
+    with op.batch_alter_table('platform_stats', schema=None) as batch_op:
+        batch_op.alter_column('value', existing_type=sa.Integer(), nullable=False)
@@ -0,0 +1,27 @@
+"""tenant counters: NULL value marks an invalidated counter
+
+Revision ID: f3a5c7e9b102
+Revises: e8b0d2f4a659
+Create Date: 2026-10-20 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3a5c7e9b102'
+down_revision = 'e8b0d2f4a659'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('tenant_counters', schema=None) as batch_op:
+        batch_op.alter_column('value', existing_type=sa.Integer(), nullable=True)
+
+
+def downgrade():
+    op.execute('DELETE FROM tenant_counters WHERE value IS NULL')
+    with op.batch_alter_table('tenant_counters', schema=None) as batch_op:
+        batch_op.alter_column('value', existing_type=sa.Integer(), nullable=False)
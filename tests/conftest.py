@@ -1,6 +1,11 @@
+import json
+import threading
+import time
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 import pytest
 from app import create_app, db
-from app.models import User, Condominium
+from app.models import User, Condominium, Unit, UserSpecialRole
 
 @pytest.fixture
 def app():
@@ -36,3 +41,133 @@ def runner(app):
     Un runner para probar comandos de CLI si fuera necesario.
     """
     return app.test_cli_runner()
+
+def _seed_condo(slug, units):
+    admin = User(email=f"admin@{slug}.com", first_name="Admin", last_name=slug, cedula=f"A-{slug}",
+                 role="ADMIN", status="active", tenant=slug)
+    db.session.add(admin)
+    db.session.flush()
+    condo = Condominium(name=f"Condo {slug}", subdomain=slug, status="ACTIVO", admin_user_id=admin.id,
+                        main_street="A", cross_street="B", city="Quito", created_by=admin.id)
+    db.session.add(condo)
+    db.session.flush()
+    admin.condominium_id = condo.id
+
+    for n in range(units):
+        unit = Unit(property_number=f"{slug}-{n}", name=f"Casa {n}", condominium_id=condo.id, created_by=admin.id)
+        db.session.add(unit)
+        db.session.flush()
+        resident = User(email=f"r{n}@{slug}.com", first_name="Res", last_name=str(n), cedula=f"{slug}-{n}",
+                        status="active" if n % 2 else "pending", condominium_id=condo.id, unit_id=unit.id)
+        db.session.add(resident)
+        db.session.flush()
+        if n < 3:
+            db.session.add(UserSpecialRole(user_id=resident.id, condominium_id=condo.id, role="VOCAL",
+                                           assigned_by=admin.id, start_date=date(2025, 1, 1)))
+    db.session.commit()
+    return admin
+
+@pytest.fixture
+def seed_condo(app):
+    """
+    Fábrica de condominios de prueba: seed_condo(slug, units) crea el admin, el condominio
+    y 'units' unidades con un residente cada una (las 3 primeras con rol VOCAL). Retorna el admin.
+    """
+    return _seed_condo
+
+# Presupuesto máximo de queries SQL por endpoint (independiente del volumen de datos).
+# Todo test que use el fixture 'query_budget' falla si alguno de sus requests lo excede.
+QUERY_BUDGETS = {
+    'admin.admin_condominio_panel': 6,
+    'master.reports': 12,
+}
+
+class QueryBudgetRecorder:
+    """Registra (endpoint, QueryStats) de cada request atendido durante el test."""
+    def __init__(self):
+        self.requests = []
+
+    def record(self, sender, response, **extra):
+        from flask import request, g
+        self.requests.append((request.endpoint, g.query_stats))
+
+    def for_endpoint(self, endpoint):
+        return [stats for name, stats in self.requests if name == endpoint]
+
+@pytest.fixture
+def query_budget(app):
+    """
+    Verifica QUERY_BUDGETS al terminar el test.
+    Uso: def test_x(client, query_budget): client.get(...); query_budget.for_endpoint('...')
+    """
+    from flask import request_finished
+    recorder = QueryBudgetRecorder()
+    with request_finished.connected_to(recorder.record, app):
+        yield recorder
+
+    exceeded = [
+        f"{name}: {stats.count} queries (presupuesto {QUERY_BUDGETS[name]})"
+        for name, stats in recorder.requests
+        if name in QUERY_BUDGETS and stats.count > QUERY_BUDGETS[name]
+    ]
+    assert not exceeded, "Presupuesto de queries excedido: " + "; ".join(exceeded)
+
+
+class PayPhoneStub(ThreadingHTTPServer):
+    """
+    Servidor local que imita /api/button/Confirm de PayPhone.
+    Responde 'statuses[id]' (o 'transaction_status'), tarda 'delay' segundos y anota
+    cada consulta en 'requests' como (token, id, instante). Los ids de 'failing' responden 502.
+    """
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), _PayPhoneConfirmHandler)
+        self.delay = 0.3
+        self.transaction_status = 'Approved'
+        self.statuses = {}
+        self.fail = False
+        self.failing = set()
+        self.requests = []
+        self.lock = threading.Lock()
+
+    @property
+    def calls(self):
+        return len(self.requests)
+
+
+class _PayPhoneConfirmHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        stub = self.server
+        payload = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        token = self.headers.get('Authorization', '').removeprefix('Bearer ')
+        with stub.lock:
+            stub.requests.append((token, payload['id'], time.monotonic()))
+        time.sleep(stub.delay)
+        if stub.fail or payload['id'] in stub.failing:
+            self.send_response(502)
+            self.end_headers()
+            return
+        body = json.dumps({'transactionStatus': stub.statuses.get(payload['id'], stub.transaction_status),
+                           'clientTransactionId': payload['clientTxId'], 'transactionId': payload['id']}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def payphone_stub(monkeypatch):
+    """PayPhoneStub escuchando en localhost; PayPhoneService apunta a él durante el test."""
+    from app.services.payphone import PayPhoneService
+    stub = PayPhoneStub()
+    thread = threading.Thread(target=stub.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(PayPhoneService, 'BASE_URL', f"http://127.0.0.1:{stub.server_address[1]}/api")
+    yield stub
+    stub.shutdown()
+    stub.server_close()
@@ -0,0 +1,64 @@
+import pickle
+from flask_jwt_extended import create_access_token
+from app import db
+from app.models import CondominiumConfig
+from app.services.branding_service import branding_service, TenantBranding, DEFAULT_PRIMARY_COLOR
+from app.services.tenant_service import tenant_resolver
+
+
+def _branded_condo(seed_condo, slug, color):
+    admin = seed_condo(slug, units=0)
+    db.session.add(CondominiumConfig(tenant=slug, primary_color=color, commercial_name=f"Marca {slug}"))
+    db.session.commit()
+    return admin
+
+
+def test_branding_snapshot_is_plain_value(app, seed_condo):
+    tenant_resolver.clear()
+    _branded_condo(seed_condo, "brand-value", '#123456')
+
+    branding = branding_service.get("brand-value")
+    assert branding == TenantBranding("brand-value", '#123456', None, "Marca brand-value")
+    assert pickle.loads(pickle.dumps(branding)) == branding
+    assert '--primary: #123456;' in branding.stylesheet()
+
+    # Un color inválido no llega a la hoja de estilos
+    hostile = TenantBranding("x", 'red;} body{display:none', None, None)
+    assert hostile.safe_primary_color == DEFAULT_PRIMARY_COLOR
+
+
+def test_branding_css_is_cached_by_content_hash(app, client, seed_condo):
+    tenant_resolver.clear()
+    _branded_condo(seed_condo, "brand-css", '#abcdef')
+    version = branding_service.get("brand-css").version
+
+    response = client.get(f'/marca/brand-css/{version}.css')
+    assert response.status_code == 200
+    assert response.mimetype == 'text/css'
+    assert b'#abcdef' in response.data
+    assert 'immutable' in response.headers['Cache-Control']
+    assert 'no-store' not in response.headers['Cache-Control']
+
+    revalidated = client.get(f'/marca/brand-css/{version}.css', headers={'If-None-Match': response.headers['ETag']})
+    assert revalidated.status_code == 304
+
+    stale = client.get('/marca/brand-css/000000000000.css')
+    assert stale.status_code == 302
+    assert stale.headers['Location'].endswith(f'/marca/brand-css/{version}.css')
+    assert client.get('/marca/sin-marca/000000000000.css').status_code == 404
+
+
+def test_personalizar_invalidates_branding(app, client, seed_condo):
+    tenant_resolver.clear()
+    admin = _branded_condo(seed_condo, "brand-edit", '#111111')
+    client.set_cookie('access_token_cookie', create_access_token(identity=str(admin.id)))
+    old_version = branding_service.get("brand-edit").version
+
+    page = client.get('/brand-edit/admin')
+    assert f'/marca/brand-edit/{old_version}.css'.encode() in page.data
+    assert b'Marca brand-edit' in page.data
+
+    assert client.post('/brand-edit/admin/personalizar', data={'primary_color': '#222222'}).status_code == 302
+    new_version = branding_service.get("brand-edit").version
+    assert new_version != old_version
+    assert f'/marca/brand-edit/{new_version}.css'.encode() in client.get('/brand-edit/admin').data
@@ -0,0 +1,70 @@
+import os
+from flask import url_for
+from flask_jwt_extended import create_access_token
+from app import db
+from app.models import Document, Condominium
+
+
+def test_authenticated_pages_and_redirects_are_not_stored(app, client, seed_condo):
+    admin = seed_condo("cache-auth", units=0)
+    client.set_cookie('access_token_cookie', create_access_token(identity=str(admin.id)))
+
+    page = client.get('/cache-auth/admin/panel')
+    assert page.status_code == 200
+    assert page.headers['Cache-Control'].startswith('no-store')
+    assert 'ETag' not in page.headers
+
+    assert client.get('/documentos/firmar/no-existe').headers['Cache-Control'].startswith('no-store')
+
+
+def test_static_files_are_versioned_and_immutable(app, client):
+    with app.test_request_context():
+        url = url_for('static', filename='js/app.js')
+    assert '?v=' in url
+
+    versioned = client.get(url)
+    assert versioned.status_code == 200
+    assert versioned.headers['Cache-Control'] == 'public, max-age=31536000, immutable'
+
+    plain = client.get('/static/js/app.js')
+    assert plain.headers['Cache-Control'] == 'public, no-cache'
+    assert client.get('/static/js/app.js', headers={'If-None-Match': plain.headers['ETag']}).status_code == 304
+
+
+def test_unsigned_pdf_revalidates_with_304(app, client, seed_condo):
+    admin = seed_condo("cache-pdf", units=0)
+    condo = Condominium.query.filter_by(subdomain="cache-pdf").first()
+    doc = Document(title="Acta", content="<p>Contenido</p>", created_by_id=admin.id, condominium_id=condo.id)
+    db.session.add(doc)
+    db.session.commit()
+    client.set_cookie('access_token_cookie', create_access_token(identity=str(admin.id)))
+
+    try:
+        first = client.get(f'/documentos/{doc.id}/descargar-sin-firmar')
+        assert first.status_code == 200
+        assert first.headers['Cache-Control'] == 'private, no-cache'
+        assert first.headers['ETag'] and first.headers['Last-Modified']
+
+        by_etag = client.get(f'/documentos/{doc.id}/descargar-sin-firmar', headers={'If-None-Match': first.headers['ETag']})
+        assert by_etag.status_code == 304
+        by_date = client.get(f'/documentos/{doc.id}/descargar-sin-firmar',
+                             headers={'If-Modified-Since': first.headers['Last-Modified']})
+        assert by_date.status_code == 304
+    finally:
+        path = os.path.join(app.root_path, db.session.get(Document, doc.id).pdf_unsigned_path or '')
+        if os.path.isfile(path):
+            os.remove(path)
+
+
+def test_public_signature_page_gets_etag(app, client, seed_condo):
+    admin = seed_condo("cache-sign", units=0)
+    doc = Document(title="Petición", content="<p>Firme</p>", created_by_id=admin.id,
+                   collect_signatures_from_residents=True, public_signature_link="cache-sign-link")
+    db.session.add(doc)
+    db.session.commit()
+
+    page = client.get('/documentos/firmar/cache-sign-link')
+    assert page.status_code == 200
+    assert page.headers['Cache-Control'] == 'private, no-cache'
+    assert client.get('/documentos/firmar/cache-sign-link',
+                      headers={'If-None-Match': page.headers['ETag']}).status_code == 304
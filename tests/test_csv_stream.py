@@ -0,0 +1,66 @@
+import codecs
+import csv
+import io
+import tracemalloc
+from flask_jwt_extended import create_access_token
+from app import db
+from app.models import User
+from app.utils.csv_stream import iter_csv
+
+
+def _parse(data):
+    assert data.startswith(codecs.BOM_UTF8)
+    assert data.count(codecs.BOM_UTF8) == 1
+    return list(csv.reader(io.StringIO(data[len(codecs.BOM_UTF8):].decode('utf-8'))))
+
+
+def test_iter_csv_emits_bom_once_and_chunks_rows():
+    chunks = list(iter_csv(['Nombre', 'Cédula'], ([f"Vecino {n}", n] for n in range(1200)), chunk_rows=500))
+    # Cabecera + 3 bloques (500, 500, 200)
+    assert len(chunks) == 4
+    rows = _parse(b''.join(chunks))
+    assert rows[0] == ['Nombre', 'Cédula']
+    assert rows[-1] == ['Vecino 1199', '1199']
+    assert len(rows) == 1201
+
+
+def test_iter_csv_memory_does_not_grow_with_rows():
+    def peak(count):
+        tracemalloc.start()
+        for _ in iter_csv(['a', 'b', 'c'], ((n, 'x' * 40, n * 1.5) for n in range(count))):
+            pass
+        peak_bytes = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return peak_bytes
+
+    assert peak(100000) < peak(10000) * 1.5
+
+
+def test_master_condo_export_is_streamed(app, client, seed_condo):
+    for n in range(3):
+        seed_condo(f"csv-condo-{n}", units=0)
+    master = User(email="master@csv.com", first_name="M", last_name="CSV", cedula="M-CSV", role="MASTER", status="active")
+    db.session.add(master)
+    db.session.commit()
+    client.set_cookie('access_token_cookie', create_access_token(identity=str(master.id)))
+
+    response = client.post('/master/reports', data={'action': 'export_condos'})
+    assert response.status_code == 200
+    assert response.is_streamed
+    rows = _parse(response.data)
+    assert len(rows) == 4
+    assert rows[1][7] == 'Admin csv-condo-0'
+
+
+def test_admin_residentes_export(app, client, seed_condo):
+    admin = seed_condo("csv-res", units=4)
+    User.query.filter_by(condominium_id=admin.condominium_id).update({'tenant': "csv-res"})
+    db.session.commit()
+    client.set_cookie('access_token_cookie', create_access_token(identity=str(admin.id)))
+
+    response = client.post('/csv-res/admin/reportes', data={'tipo_reporte': 'residentes'})
+    assert response.status_code == 200
+    rows = _parse(response.data)
+    assert rows[0] == ['Unidad', 'Nombre', 'Email', 'Teléfono', 'Rol', 'Estado']
+    # Activos: los residentes impares y el administrador (sin unidad)
+    assert sorted(row[2] for row in rows[1:]) == ['admin@csv-res.com', 'r1@csv-res.com', 'r3@csv-res.com']
@@ -0,0 +1,90 @@
+from datetime import datetime, timedelta
+from flask import request_finished, g
+from flask_jwt_extended import create_access_token
+from app import db
+from app.models import User, Condominium, Module, CondominiumModule
+from app.services.entitlement_service import compile_entitlements, entitlement_service
+from app.services.tenant_service import tenant_resolver
+
+NOW = datetime(2025, 6, 1, 12, 0)
+
+
+def _condo_with_documents(seed_condo, slug):
+    admin = seed_condo(slug, units=0)
+    condo = Condominium.query.filter_by(subdomain=slug).first()
+    condo.has_documents_module = True
+    db.session.commit()
+    return admin, condo
+
+
+def _module(code, **fields):
+    module = Module(code=code, name=code.title(), status=fields.pop('status', 'ACTIVE'), **fields)
+    db.session.add(module)
+    db.session.commit()
+    return module
+
+
+def test_legacy_flag_and_explicit_configuration(app, seed_condo):
+    admin, condo = _condo_with_documents(seed_condo, "ent-flags")
+    billing = _module('billing')
+    assert compile_entitlements(condo.id, NOW).modules == frozenset({'documents'})
+
+    db.session.add(CondominiumModule(condominium_id=condo.id, module_id=billing.id, status='ACTIVE'))
+    documents = _module('documents')
+    db.session.add(CondominiumModule(condominium_id=condo.id, module_id=documents.id, status='INACTIVE'))
+    db.session.commit()
+
+    # La configuración explícita manda sobre el flag heredado
+    assert compile_entitlements(condo.id, NOW).modules == frozenset({'billing'})
+
+
+def test_trial_and_maintenance_windows(app, seed_condo):
+    admin, condo = _condo_with_documents(seed_condo, "ent-windows")
+    trial = _module('requests')
+    db.session.add(CondominiumModule(condominium_id=condo.id, module_id=trial.id, status='TRIAL',
+                                     trial_ends_at=NOW + timedelta(days=3)))
+    _module('documents', maintenance_mode=True, maintenance_start=NOW - timedelta(hours=1),
+            maintenance_end=NOW + timedelta(hours=2), maintenance_message="Actualizando firmas")
+    _module('archived', status='ARCHIVED')
+    db.session.commit()
+
+    entitlements = compile_entitlements(condo.id, NOW)
+    assert entitlements.modules == frozenset({'requests'})
+    assert entitlements.maintenance == {'documents': "Actualizando firmas"}
+    # El resultado vence cuando termina el mantenimiento (antes que el trial)
+    assert entitlements.valid_until == NOW + timedelta(hours=2)
+
+    later = compile_entitlements(condo.id, NOW + timedelta(days=4))
+    assert later.modules == frozenset({'documents'})
+    assert later.valid_until is None
+
+
+def test_module_required_uses_cached_entitlements(app, client, seed_condo):
+    tenant_resolver.clear()
+    entitlement_service.clear()
+    admin, condo = _condo_with_documents(seed_condo, "ent-route")
+    admin.tenant = condo.subdomain
+    db.session.commit()
+    client.set_cookie('access_token_cookie', create_access_token(identity=str(admin.id)))
+
+    statements = []
+    request_finished.connect(lambda sender, response, **extra: statements.append(list(g.query_stats.shapes)),
+                             app, weak=False)
+
+    assert client.get('/documentos/nuevo').status_code == 200
+    assert client.get('/documentos/nuevo').status_code == 200
+    assert any('condominium_modules' in shape for shape in statements[0])
+    assert not any('condominium_modules' in shape for shape in statements[1])
+
+    # Desactivar el módulo desde el panel MASTER invalida el caché del condominio
+    master = User(email="master@ent.com", first_name="M", last_name="E", cedula="M-ENT", role="MASTER", status="active")
+    documents = _module('documents')
+    db.session.add(master)
+    db.session.commit()
+    client.set_cookie('access_token_cookie', create_access_token(identity=str(master.id)))
+    response = client.post(f'/master/condominios/guardar-config-modulo/{condo.id}',
+                           data={'module_id': documents.id, 'status': 'INACTIVE', 'pricing_type': 'per_module'})
+    assert response.status_code == 302
+
+    client.set_cookie('access_token_cookie', create_access_token(identity=str(admin.id)))
+    assert client.get('/documentos/nuevo').status_code == 403
@@ -0,0 +1,125 @@
+import codecs
+import os
+from datetime import datetime, timedelta
+from flask_jwt_extended import create_access_token
+from sqlalchemy import insert, update
+from app import db
+from app.models import User, Condominium, Payment, Document, ResidentSignature, ExportJob
+from app.services.export_service import ExportService, export_worker
+
+
+def _master(client):
+    master = User(email="master@export.com", first_name="M", last_name="Export", cedula="M-EXP", role="MASTER", status="active")
+    db.session.add(master)
+    db.session.commit()
+    client.set_cookie('access_token_cookie', create_access_token(identity=str(master.id)))
+    return master
+
+
+def test_payments_export_runs_in_background(app, client, tmp_path, seed_condo):
+    app.config.update(EXPORTS_DIR=str(tmp_path), EXPORT_BATCH_SIZE=1000)
+    admin = seed_condo("exp-pay", units=0)
+    condo = Condominium.query.filter_by(subdomain="exp-pay").first()
+    created = datetime(2025, 3, 1)
+    db.session.execute(insert(Payment), [
+        {'amount': 50, 'amount_with_tax': 50, 'status': 'APPROVED', 'payment_method': 'CASH',
+         'client_transaction_id': f"exp-{n}", 'user_id': admin.id, 'condominium_id': condo.id,
+         'created_at': created, 'updated_at': created}
+        for n in range(5200)
+    ])
+    db.session.commit()
+    _master(client)
+
+    response = client.post('/master/reports', data={'action': 'export_payments'})
+    assert response.status_code == 302
+    job_id = int(response.headers['Location'].rsplit('export_job=', 1)[1])
+    export_worker.wait(timeout=30)
+
+    status = client.get(f'/exportaciones/{job_id}').get_json()
+    assert status['status'] == 'DONE'
+    assert status['rows_written'] == status['total_rows'] == 5200
+    assert status['progress'] == 100
+
+    download = client.get(status['download_url'])
+    assert download.status_code == 200
+    data = download.data
+    assert data.startswith(codecs.BOM_UTF8) and data.count(codecs.BOM_UTF8) == 1
+    # Antes el reporte se cortaba en 5000 pagos
+    assert data.count(b'\r\n') == 5201
+    assert not [name for name in os.listdir(tmp_path) if name.endswith('.part')]
+
+
+def test_job_access_and_link_expiry(app, client, tmp_path, seed_condo):
+    app.config.update(EXPORTS_DIR=str(tmp_path), EXPORT_LINK_TTL=-1)
+    admin = seed_condo("exp-sig", units=0)
+    condo = Condominium.query.filter_by(subdomain="exp-sig").first()
+    doc = Document(title="Petición", content="x", created_by_id=admin.id, condominium_id=condo.id,
+                   collect_signatures_from_residents=True, public_signature_link="exp-sig-link")
+    db.session.add(doc)
+    db.session.flush()
+    db.session.add_all([ResidentSignature(document_id=doc.id, full_name=f"Vecino {n}", cedula=str(n)) for n in range(3)])
+    db.session.commit()
+
+    job = ExportService.enqueue('signatures', {'document_id': doc.id, 'title': doc.title}, admin, condominium_id=condo.id)
+    export_worker.wait(timeout=30)
+
+    # Otro usuario no ve el job
+    other = User(email="otro@export.com", first_name="O", last_name="X", cedula="O-EXP", status="active")
+    db.session.add(other)
+    db.session.commit()
+    client.set_cookie('access_token_cookie', create_access_token(identity=str(other.id)))
+    assert client.get(f'/exportaciones/{job.id}').status_code == 404
+
+    client.set_cookie('access_token_cookie', create_access_token(identity=str(admin.id)))
+    status = client.get(f'/exportaciones/{job.id}').get_json()
+    assert status['status'] == 'DONE' and status['rows_written'] == 3
+    # EXPORT_LINK_TTL negativo: el enlace firmado ya venció
+    assert client.get(status['download_url']).status_code == 404
+
+
+def test_garbage_collection_removes_expired_files(app, client, tmp_path, seed_condo):
+    app.config.update(EXPORTS_DIR=str(tmp_path))
+    admin = seed_condo("exp-gc", units=0)
+    artifact = tmp_path / "old.csv"
+    artifact.write_bytes(b"x")
+    now = datetime.utcnow()
+    done = ExportJob(kind='users', status='DONE', requested_by=admin.id, file_path=str(artifact),
+                     expires_at=now - timedelta(minutes=1))
+    stuck = ExportJob(kind='users', status='RUNNING', requested_by=admin.id, created_at=now - timedelta(hours=3),
+                      updated_at=now - timedelta(hours=2))
+    # Largo pero vivo: escribió un lote hace un minuto
+    busy = ExportJob(kind='users', status='RUNNING', requested_by=admin.id, created_at=now - timedelta(hours=3),
+                     updated_at=now - timedelta(minutes=1))
+    db.session.add_all([done, stuck, busy])
+    db.session.commit()
+
+    result = app.test_cli_runner().invoke(args=['exports', 'gc'])
+    assert "Archivos borrados: 1. Jobs interrumpidos: 1." in result.output
+    assert not artifact.exists()
+    assert db.session.get(ExportJob, done.id).status == 'EXPIRED'
+    assert db.session.get(ExportJob, stuck.id).status == 'FAILED'
+    assert db.session.get(ExportJob, busy.id).status == 'RUNNING'
+
+
+def test_worker_stops_when_its_job_was_failed(app, tmp_path, monkeypatch, seed_condo):
+    from app.services import export_service
+    app.config.update(EXPORTS_DIR=str(tmp_path), EXPORT_BATCH_SIZE=1)
+    admin = seed_condo("exp-stop", units=3)
+    job = ExportJob(kind='users', status='PENDING', requested_by=admin.id)
+    db.session.add(job)
+    db.session.commit()
+
+    def interrupted_iter_csv(header, rows):
+        # collect_garbage() lo da por interrumpido apenas empieza a escribir
+        db.session.execute(update(ExportJob).where(ExportJob.id == job.id).values(status='FAILED'))
+        db.session.commit()
+        return real_iter_csv(header, rows)
+
+    real_iter_csv = export_service.iter_csv
+    monkeypatch.setattr(export_service, 'iter_csv', interrupted_iter_csv)
+    ExportService.run_job(job.id)
+
+    job = db.session.get(ExportJob, job.id)
+    assert job.status == 'FAILED' and job.rows_written == 0
+    assert job.file_path is None
+    assert os.listdir(tmp_path) == []
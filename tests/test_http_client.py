@@ -0,0 +1,104 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+import requests
+from prometheus_client import REGISTRY
+from app.http_client import CircuitOpenError, HttpClient, init_http_client
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1' # keep-alive
+
+    def _reply(self):
+        server = self.server
+        if self.headers.get('Content-Length'):
+            self.rfile.read(int(self.headers['Content-Length']))
+        server.hits.append((self.command, self.client_address[1]))
+        status = server.statuses.pop(0) if server.statuses else 200
+        self.send_response(status)
+        self.send_header('Content-Length', '2')
+        self.end_headers()
+        self.wfile.write(b'ok')
+
+    do_GET = do_POST = _reply
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def upstream():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+    server.daemon_threads = True
+    server.hits, server.statuses = [], []
+    server.url = f"http://127.0.0.1:{server.server_address[1]}/"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def client(app):
+    app.config.update(HTTP_RETRIES=2, HTTP_BACKOFF=0.001, HTTP_BREAKER_THRESHOLD=3, HTTP_BREAKER_RESET=0.2)
+    init_http_client(app)
+    client = HttpClient('test-upstream', timeout=2)
+    yield client
+    client.close()
+
+
+def _sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+def test_connections_are_reused(client, upstream):
+    for _ in range(5):
+        assert client.get(upstream.url).status_code == 200
+    # Mismo puerto de origen en todas: una sola conexión TCP keep-alive
+    assert len({port for _, port in upstream.hits}) == 1
+    assert _sample('condomanager_http_client_duration_seconds_count', provider='test-upstream', outcome='ok') >= 5
+
+
+def test_retries_only_idempotent_calls(client, upstream):
+    upstream.statuses = [503, 503]
+    assert client.get(upstream.url).status_code == 200
+    assert [method for method, _ in upstream.hits] == ['GET'] * 3
+
+    upstream.hits.clear()
+    upstream.statuses = [503]
+    assert client.post(upstream.url, json={}).status_code == 503
+    upstream.statuses = [503]
+    assert client.post(upstream.url, json={}, idempotent=True).status_code == 200
+    assert [method for method, _ in upstream.hits] == ['POST', 'POST', 'POST']
+    assert _sample('condomanager_http_client_retries_total', provider='test-upstream') >= 3
+
+
+def test_breaker_fails_fast_and_recovers(client, upstream):
+    upstream.statuses = [500] * 3
+    for _ in range(3):
+        assert client.post(upstream.url).status_code == 500
+    assert client.breaker.state == 'open'
+
+    with pytest.raises(CircuitOpenError):
+        client.get(upstream.url)
+    # Compatible con los manejadores existentes de requests
+    assert issubclass(CircuitOpenError, requests.exceptions.RequestException)
+    assert len(upstream.hits) == 3
+    assert _sample('condomanager_http_client_circuit_open', provider='test-upstream') == 1
+
+    threading.Event().wait(0.25)
+    assert client.breaker.state == 'half_open'
+    assert client.get(upstream.url).status_code == 200
+    assert client.breaker.state == 'closed'
+    assert _sample('condomanager_http_client_circuit_open', provider='test-upstream') == 0
+
+
+def test_connection_errors_count_toward_the_breaker(client):
+    closed_port = "http://127.0.0.1:9/"
+    with pytest.raises(requests.exceptions.ConnectionError):
+        client.post(closed_port)
+    assert client.breaker.failures == 1
+    with pytest.raises(requests.exceptions.ConnectionError):
+        client.get(closed_port) # 3 intentos: llega al umbral
+    assert client.breaker.state == 'open'
+    assert _sample('condomanager_http_client_errors_total', provider='test-upstream', kind='connection') >= 3
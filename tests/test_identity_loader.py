@@ -0,0 +1,50 @@
+import unittest
+from flask import g
+from flask_jwt_extended import create_access_token
+from app import create_app, db
+from app.models import User
+
+class TestIdentityLoader(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app()
+        self.app.config['TESTING'] = True
+        # En modo debug load_user afirma que el usuario se carga una sola vez por request
+        self.app.debug = True
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        self.master = User(
+            email="master@test.com", first_name="Master", last_name="User",
+            cedula="999", role="MASTER", status="active"
+        )
+        db.session.add(self.master)
+        db.session.commit()
+
+        self.client = self.app.test_client()
+        self.client.set_cookie('access_token_cookie', create_access_token(identity=str(self.master.id)))
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_master_page_loads_user_once(self):
+        """JWT loader, master_required, get_current_user e inject_user comparten una sola carga."""
+        with self.client:
+            response = self.client.get('/master')
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(g.identity_db_lookups, 1)
+            self.assertGreaterEqual(g.identity_memo_hits, 2)
+
+    def test_memo_is_reset_between_requests(self):
+        with self.client:
+            self.client.get('/api/auth/me')
+            self.assertEqual(g.identity_db_lookups, 1)
+        with self.client:
+            response = self.client.get('/api/auth/me')
+            self.assertEqual(response.get_json()['email'], "master@test.com")
+            self.assertEqual(g.identity_db_lookups, 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import os
+import subprocess
+import sys
+from prometheus_client import CollectorRegistry, REGISTRY, multiprocess
+from app import db
+from app.metrics import tenant_label, OTHER_TENANT
+from app.models import Payment, User, Condominium
+
+
+def _sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+def test_metrics_endpoint_exposes_request_histogram(client):
+    client.get('/health')
+    response = client.get('/metrics')
+    assert response.status_code == 200
+    assert response.content_type.startswith('text/plain')
+    assert b'condomanager_request_duration_seconds_bucket{endpoint="public.health"' in response.data
+
+
+def test_metrics_token(app, client):
+    app.config['METRICS_REQUIRE_TOKEN'] = True
+    assert client.get('/metrics').status_code == 404
+    app.config['METRICS_TOKEN'] = 's3cret'
+    assert client.get('/metrics').status_code == 401
+    assert client.get('/metrics', headers={'Authorization': 'Bearer s3cret'}).status_code == 200
+
+
+def test_payment_counter_counts_committed_status_changes(app):
+    user = User(email="pay@metrics.com", first_name="P", last_name="M", cedula="PM-1")
+    db.session.add(user)
+    db.session.flush()
+    condo = Condominium(name="Metrics", subdomain="metrics", main_street="A", cross_street="B", city="Quito",
+                        created_by=user.id)
+    db.session.add(condo)
+    db.session.commit()
+
+    pending = _sample('condomanager_payments_total', status='PENDING')
+    approved = _sample('condomanager_payments_total', status='APPROVED')
+
+    payment = Payment(amount=10, amount_with_tax=10, status='PENDING', client_transaction_id="metrics-1",
+                      user_id=user.id, condominium_id=condo.id)
+    db.session.add(payment)
+    db.session.commit()
+    assert _sample('condomanager_payments_total', status='PENDING') == pending + 1
+
+    payment.status = 'APPROVED'
+    db.session.flush()
+    db.session.rollback()
+    assert _sample('condomanager_payments_total', status='APPROVED') == approved
+
+    payment.status = 'APPROVED'
+    db.session.commit()
+    assert _sample('condomanager_payments_total', status='APPROVED') == approved + 1
+
+
+def test_tenant_label_cardinality_is_capped(app):
+    app.config['METRICS_TENANT_LABEL_LIMIT'] = 2
+    assert [tenant_label(app, slug) for slug in ('a', 'b', 'c', 'a')] == ['a', 'b', OTHER_TENANT, 'a']
+
+
+def test_multiprocess_counters_are_aggregated(tmp_path):
+    """Dos procesos con PROMETHEUS_MULTIPROC_DIR: /metrics debe ver la suma, no el valor de un solo worker."""
+    env = dict(os.environ, PROMETHEUS_MULTIPROC_DIR=str(tmp_path))
+    script = "from app.metrics import LOGINS; LOGINS.labels(channel='web', result='success').inc(3)"
+    for _ in range(2):
+        subprocess.run([sys.executable, '-c', script], env=env, check=True,
+                       cwd=os.path.dirname(os.path.dirname(__file__)))
+
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry, path=str(tmp_path))
+    assert registry.get_sample_value('condomanager_logins_total', {'channel': 'web', 'result': 'success'}) == 6
@@ -0,0 +1,121 @@
+from datetime import datetime, timedelta
+import pytest
+from flask_jwt_extended import create_access_token
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from app import db
+from app.models import Payment, PettyCashTransaction
+from app.services.tenant_service import tenant_resolver
+from app.utils.pagination import decode_cursor, encode_cursor, keyset_paginate
+
+
+def _payments(admin, count, status='APPROVED', prefix='pg', start=datetime(2025, 1, 1)):
+    # Pares de pagos con la misma fecha: el desempate por id no puede perder ni repetir filas
+    db.session.execute(insert(Payment), [
+        {'amount': n + 1, 'amount_with_tax': n + 1, 'status': status, 'payment_method': 'TRANSFER',
+         'client_transaction_id': f"{prefix}-{n}", 'user_id': admin.id, 'condominium_id': admin.condominium_id,
+         'proof_of_payment': f"{prefix}-{n}.pdf", 'created_at': start + timedelta(minutes=n // 2), 'updated_at': start}
+        for n in range(count)
+    ])
+    db.session.commit()
+
+
+def test_cursor_round_trip_and_validation():
+    created_at = datetime(2025, 5, 17, 10, 30, 0, 123456)
+    assert decode_cursor(encode_cursor(created_at, 42)) == (created_at, 42)
+    for bad in ('', 'no-es-base64!', encode_cursor(created_at, 1)[:-3]):
+        with pytest.raises(ValueError):
+            decode_cursor(bad)
+
+
+@pytest.mark.parametrize('descending', [True, False])
+def test_keyset_walk_visits_every_row_once(app, descending, seed_condo):
+    admin = seed_condo("pg-walk", units=0)
+    _payments(admin, 53)
+
+    seen, cursor = [], None
+    while True:
+        page = keyset_paginate(Payment.query.filter_by(condominium_id=admin.condominium_id), Payment,
+                               cursor=cursor, per_page=10, descending=descending)
+        seen.extend(payment.id for payment in page.items)
+        if not page.has_next:
+            break
+        cursor = page.next_cursor
+
+    assert len(seen) == len(set(seen)) == 53
+    expected = Payment.query.order_by(*(
+        (Payment.created_at.desc(), Payment.id.desc()) if descending else (Payment.created_at, Payment.id)
+    )).all()
+    assert seen == [payment.id for payment in expected]
+
+
+def test_keyset_columns_reject_null(app, seed_condo):
+    admin = seed_condo("pg-null", units=0)
+    # Una fila sin fecha no podría cerrar una página ni viajar en el cursor: la base no la admite
+    with pytest.raises(IntegrityError):
+        db.session.execute(insert(Payment.__table__).values(
+            amount=1, amount_with_tax=1, status='APPROVED', client_transaction_id="pg-null",
+            user_id=admin.id, condominium_id=admin.condominium_id, created_at=None))
+    db.session.rollback()
+    with pytest.raises(IntegrityError):
+        db.session.execute(insert(PettyCashTransaction.__table__).values(
+            description="Mov", amount=1, category='OTROS', condominium_id=admin.condominium_id,
+            transaction_date=None))
+    db.session.rollback()
+
+
+def test_finanzas_pages_pending_reviews(app, client, seed_condo):
+    tenant_resolver.clear()
+    admin = seed_condo("pg-fin", units=0)
+    _payments(admin, 30, status='PENDING_REVIEW', prefix='pend')
+    _payments(admin, 5, prefix='hist')
+    client.set_cookie('access_token_cookie', create_access_token(identity=str(admin.id)))
+
+    response = client.get('/pg-fin/admin/finanzas')
+    assert response.status_code == 200
+    html = response.get_data(as_text=True)
+    assert html.count('/admin/pagos/aprobar/') == 25
+    assert '?pendientes=' in html
+
+    next_url = html.split('href="/pg-fin/admin/finanzas?pendientes=', 1)[1].split('"', 1)[0]
+    second = client.get(f'/pg-fin/admin/finanzas?pendientes={next_url}').get_data(as_text=True)
+    assert second.count('/admin/pagos/aprobar/') == 5
+
+    assert client.get('/pg-fin/admin/finanzas?historial=basura').status_code == 400
+
+
+def test_payments_json_endpoint_is_tenant_scoped(app, client, seed_condo):
+    tenant_resolver.clear()
+    admin = seed_condo("pg-api", units=0)
+    other = seed_condo("pg-api-otro", units=0)
+    _payments(admin, 12, prefix='api')
+    _payments(other, 4, prefix='otro')
+    client.set_cookie('access_token_cookie', create_access_token(identity=str(admin.id)))
+
+    ids, url = [], '/pg-api/admin/api/pagos?per_page=5'
+    while url:
+        data = client.get(url).get_json()
+        ids.extend(item['id'] for item in data['items'])
+        url = f"/pg-api/admin/api/pagos?per_page=5&cursor={data['next_cursor']}" if data['has_next'] else None
+
+    own = {p.id for p in Payment.query.filter_by(condominium_id=admin.condominium_id)}
+    assert len(ids) == 12 and set(ids) == own
+
+    pending = client.get('/pg-api/admin/api/pagos?status=PENDING_REVIEW').get_json()
+    assert pending == {'items': [], 'next_cursor': None, 'has_next': False}
+
+
+def test_user_history_and_config_pagos_are_paginated(app, client, seed_condo):
+    tenant_resolver.clear()
+    admin = seed_condo("pg-user", units=0)
+    _payments(admin, 27, prefix='usr')
+    client.set_cookie('access_token_cookie', create_access_token(identity=str(admin.id)))
+
+    history = client.get('/reportes')
+    assert history.status_code == 200
+    assert history.get_data(as_text=True).count('usr-') == 25
+    assert '?pagos=' in history.get_data(as_text=True)
+
+    config = client.get('/pg-user/admin/configuracion-pagos')
+    assert config.status_code == 200
+    assert '?cursor=' in config.get_data(as_text=True)
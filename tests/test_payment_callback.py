@@ -0,0 +1,76 @@
+import threading
+import pytest
+from app import db
+from app.models import Condominium, Payment, PaymentCallbackAttempt
+
+CALLBACKS = 8
+
+
+def _pending_payment(seed_condo, slug):
+    admin = seed_condo(slug, units=0)
+    condo = Condominium.query.get(admin.condominium_id)
+    condo.payment_config = {'token': 'stub-token'}
+    payment = Payment(amount=25, amount_with_tax=25, status='PENDING', client_transaction_id=f"{slug}-tx",
+                      user_id=admin.id, condominium_id=condo.id)
+    db.session.add(payment)
+    db.session.commit()
+    return payment
+
+
+def _outcomes(payment_id):
+    return sorted(attempt.outcome for attempt in PaymentCallbackAttempt.query.filter_by(payment_id=payment_id))
+
+
+def test_parallel_callbacks_confirm_once(app, payphone_stub, seed_condo):
+    payment = _pending_payment(seed_condo, "cb-burst")
+    url = f"/pagos/callback?id=777&clientTransactionId={payment.client_transaction_id}"
+    barrier = threading.Barrier(CALLBACKS)
+    statuses = []
+
+    def callback():
+        client = app.test_client()
+        barrier.wait()
+        statuses.append(client.get(url).status_code)
+
+    threads = [threading.Thread(target=callback) for _ in range(CALLBACKS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=30)
+
+    assert statuses == [302] * CALLBACKS
+    assert payphone_stub.calls == 1
+    db.session.expire_all()
+    payment = Payment.query.get(payment.id)
+    assert payment.status == 'APPROVED'
+    assert payment.response_json['transactionId'] == 777
+
+    outcomes = _outcomes(payment.id)
+    assert len(outcomes) == CALLBACKS and outcomes.count('CONFIRMED') == 1
+    assert set(outcomes) <= {'CONFIRMED', 'IN_FLIGHT', 'DUPLICATE'}
+
+    # Un reintento posterior responde con lo guardado
+    assert app.test_client().get(url).status_code == 302
+    assert payphone_stub.calls == 1
+    assert _outcomes(payment.id).count('DUPLICATE') == outcomes.count('DUPLICATE') + 1
+
+
+def test_gateway_error_releases_the_claim(app, payphone_stub, seed_condo):
+    from app.services.payment_service import PaymentService
+    from app.exceptions import PaymentError
+    payment = _pending_payment(seed_condo, "cb-error")
+    payphone_stub.delay = 0
+    payphone_stub.fail = True
+
+    with pytest.raises(PaymentError):
+        PaymentService.process_payphone_callback(55, payment.client_transaction_id)
+    assert Payment.query.get(payment.id).status == 'PENDING'
+    # Confirm solo consulta: el cliente HTTP lo reintenta ante 502
+    retried = 1 + app.config['HTTP_RETRIES']
+    assert payphone_stub.calls == retried
+
+    payphone_stub.fail = False
+    payphone_stub.transaction_status = 'Canceled'
+    assert PaymentService.process_payphone_callback(55, payment.client_transaction_id).status == 'CANCELED'
+    assert payphone_stub.calls == retried + 1
+    assert _outcomes(payment.id) == ['CONFIRMED', 'ERROR']
@@ -0,0 +1,113 @@
+from datetime import date, datetime
+from decimal import Decimal
+from flask_jwt_extended import create_access_token
+from app import db
+from app.models import PettyCashTransaction, PettyCashPeriod
+from app.services.petty_cash_service import PettyCashService
+from app.services.tenant_service import tenant_resolver
+
+
+def _movement(admin, amount, day):
+    db.session.add(PettyCashTransaction(description="Mov", amount=Decimal(amount), category='OTROS',
+                                        transaction_date=day, condominium_id=admin.condominium_id,
+                                        created_by=admin.id))
+
+
+def test_close_periods_snapshots_each_month(app, seed_condo):
+    admin = seed_condo("caja-cierre", units=0)
+    other = seed_condo("caja-cierre-otro", units=0)
+    condo_id = admin.condominium_id
+    _movement(admin, '100.00', datetime(2025, 1, 5))
+    _movement(admin, '-30.50', datetime(2025, 1, 31, 23, 59))
+    _movement(admin, '-10.00', datetime(2025, 3, 1))
+    _movement(admin, '50.00', datetime(2025, 4, 2))
+    _movement(other, '999.00', datetime(2025, 1, 10))
+    db.session.commit()
+
+    periods = PettyCashService.close_periods(condo_id, admin.id, today=date(2025, 4, 15))
+
+    # Febrero no tuvo movimientos pero se cierra igual para no romper la cadena de saldos
+    assert [(p.period_start, p.opening_balance, p.income, p.expenses, p.closing_balance, p.transaction_count)
+            for p in periods] == [
+        (date(2025, 1, 1), 0, Decimal('100.00'), Decimal('-30.50'), Decimal('69.50'), 2),
+        (date(2025, 2, 1), Decimal('69.50'), 0, 0, Decimal('69.50'), 0),
+        (date(2025, 3, 1), Decimal('69.50'), 0, Decimal('-10.00'), Decimal('59.50'), 1),
+    ]
+    assert PettyCashService.balance(condo_id) == Decimal('109.50')
+
+    # Cerrar de nuevo en el mismo mes no crea nada; el mes siguiente cierra solo abril
+    assert PettyCashService.close_periods(condo_id, admin.id, today=date(2025, 4, 30)) == []
+    assert [p.period_start for p in PettyCashService.close_periods(condo_id, admin.id, today=date(2025, 5, 1))] \
+        == [date(2025, 4, 1)]
+    assert PettyCashPeriod.query.filter_by(condominium_id=other.condominium_id).count() == 0
+
+
+def test_balance_reads_only_the_open_period(app, seed_condo):
+    admin = seed_condo("caja-saldo", units=0)
+    condo_id = admin.condominium_id
+    _movement(admin, '40.00', datetime(2025, 6, 10))
+    db.session.commit()
+    PettyCashService.close_periods(condo_id, admin.id, today=date(2025, 7, 1))
+
+    # Un movimiento viejo insertado por fuera de la app no altera el saldo sellado
+    _movement(admin, '500.00', datetime(2025, 6, 11))
+    _movement(admin, '-15.00', datetime(2025, 7, 3))
+    db.session.commit()
+    assert PettyCashService.balance(condo_id) == Decimal('25.00')
+    assert PettyCashService.close_periods(condo_id, admin.id, today=date(2025, 6, 20)) == []
+    assert PettyCashService.balance(seed_condo("caja-vacia", units=0).condominium_id) == 0
+
+
+def test_close_command_closes_elapsed_months_of_every_condominium(app, seed_condo):
+    admin = seed_condo("caja-cron", units=0)
+    other = seed_condo("caja-cron-otro", units=0)
+    seed_condo("caja-cron-vacia", units=0)
+    _movement(admin, '20.00', datetime(2025, 1, 5))
+    _movement(other, '-5.00', datetime(2025, 2, 5))
+    db.session.commit()
+
+    assert {condominium_id: [p.period_start for p in periods] for condominium_id, periods
+            in PettyCashService.close_all_periods(today=date(2025, 3, 10)).items()} == {
+        admin.condominium_id: [date(2025, 1, 1), date(2025, 2, 1)], other.condominium_id: [date(2025, 2, 1)]}
+    assert PettyCashPeriod.query.filter_by(closed_by=None).count() == 3
+
+    result = app.test_cli_runner().invoke(args=['petty-cash', 'close'])
+    assert result.exit_code == 0, result.output
+    assert "Condominios: 2." in result.output
+    month = datetime.utcnow().date().replace(day=1)
+    assert PettyCashService.last_period(admin.condominium_id).period_end == month
+    assert app.test_cli_runner().invoke(args=['petty-cash', 'close']).output.startswith("Condominios: 0.")
+
+
+def test_routes_close_and_seal_periods(app, client, seed_condo):
+    tenant_resolver.clear()
+    admin = seed_condo("caja-rutas", units=0)
+    condo_id = admin.condominium_id
+    _movement(admin, '80.00', datetime(2025, 1, 15))
+    db.session.commit()
+    client.set_cookie('access_token_cookie', create_access_token(identity=str(admin.id)))
+
+    response = client.post('/caja-rutas/admin/caja-chica/cerrar')
+    assert response.status_code == 302
+    assert PettyCashPeriod.query.filter_by(condominium_id=condo_id).count() >= 1
+
+    # Un mes cerrado no admite movimientos
+    client.post('/caja-rutas/admin/caja-chica/nuevo', data={
+        'description': "Tardío", 'amount': '5', 'type': 'EXPENSE', 'category': 'OTROS', 'date': '2025-01-20'})
+    assert PettyCashTransaction.query.filter_by(description="Tardío").count() == 0
+
+    client.post('/caja-rutas/admin/caja-chica/nuevo', data={
+        'description': "Actual", 'amount': '5', 'type': 'EXPENSE', 'category': 'OTROS',
+        'date': datetime.utcnow().strftime('%Y-%m-%d')})
+    assert PettyCashTransaction.query.filter_by(description="Actual").count() == 1
+
+    html = client.get('/caja-rutas/admin/caja-chica').get_data(as_text=True)
+    assert '$75.00' in html
+    assert '01/2025' in html
+
+    for n in range(30):
+        _movement(admin, '1.00', datetime.utcnow())
+    db.session.commit()
+    html = client.get('/caja-rutas/admin/caja-chica').get_data(as_text=True)
+    assert '$105.00' in html
+    assert '/caja-rutas/admin/caja-chica?cursor=' in html
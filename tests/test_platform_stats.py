@@ -0,0 +1,121 @@
+from flask_jwt_extended import create_access_token
+from app import db
+from app.models import User, Condominium, Unit, Payment, Document, PlatformStat
+from app.services.platform_stats import platform_stats, STAT_KEYS
+from app.services.report_definitions import PLATFORM_KPIS, PLATFORM_TOTALS
+
+
+def _live():
+    return {**PLATFORM_KPIS.one(), **PLATFORM_TOTALS.one()}
+
+
+def _stored():
+    return dict(db.session.execute(db.select(PlatformStat.key, PlatformStat.value)).all())
+
+
+def _no_rebuild(monkeypatch):
+    def fail():
+        raise AssertionError("platform_stats se reconstruyó")
+    monkeypatch.setattr(platform_stats, 'rebuild', fail)
+
+
+def test_counters_follow_inserts_updates_and_deletes(app, monkeypatch, seed_condo):
+    admin = seed_condo("stats-a", units=3)
+    seed_condo("stats-b", units=1)
+    assert platform_stats.rebuild() == {key: _live()[key] for key in STAT_KEYS}
+    _no_rebuild(monkeypatch)
+
+    condo = Condominium.query.filter_by(subdomain="stats-a").first()
+    db.session.add(Payment(amount=10, amount_with_tax=10, status='PENDING_REVIEW', payment_method='TRANSFER',
+                           client_transaction_id="stats-pay", user_id=admin.id, condominium_id=condo.id))
+    db.session.add(Document(title="Acta", content="x", created_by_id=admin.id, condominium_id=condo.id))
+    db.session.add(User(email="nuevo@stats-a.com", first_name="N", last_name="U", cedula="STATS-N",
+                        tenant="stats-a", status="pending"))
+    db.session.commit()
+
+    resident = User.query.filter_by(email="r0@stats-a.com").first()
+    resident.status = 'active'
+    condo.status = 'SUSPENDIDO'
+    db.session.delete(Unit.query.filter_by(property_number="stats-a-2").first())
+    db.session.commit()
+
+    db.session.delete(Payment.query.filter_by(client_transaction_id="stats-pay").first())
+    db.session.commit()
+
+    assert platform_stats.snapshot() == {key: _live()[key] for key in STAT_KEYS}
+    assert _stored()['pending_payments'] == 0
+    assert _stored()['active_condos'] == 1
+
+
+def test_rollback_discards_deltas(app, seed_condo):
+    seed_condo("stats-rb", units=0)
+    before = platform_stats.rebuild()
+
+    db.session.add(Unit(property_number="rb-1", name="Casa", condominium_id=1, created_by=1))
+    db.session.flush()
+    assert _stored()['unidades_totales'] == before['unidades_totales'] + 1
+    db.session.rollback()
+
+    assert _stored()['unidades_totales'] == before['unidades_totales']
+
+
+def test_environment_change_and_bulk_updates_invalidate(app, seed_condo):
+    seed_condo("stats-env", units=2)
+    platform_stats.rebuild()
+
+    condo = Condominium.query.filter_by(subdomain="stats-env").first()
+    condo.environment = 'internal'
+    db.session.commit()
+    # Depende de otra tabla: se invalida (NULL) y se recalcula al leer
+    assert _stored()['total_users'] is None
+    assert _stored()['total_condos'] == 0
+
+    User.query.filter_by(tenant="stats-env").update({'status': 'pending'})
+    db.session.commit()
+    assert _stored()['usuarios_pendientes'] is None
+
+    assert platform_stats.snapshot() == {key: _live()[key] for key in STAT_KEYS}
+    assert _stored() == {key: _live()[key] for key in STAT_KEYS}
+
+
+def test_snapshot_keeps_the_callers_transaction(app, seed_condo):
+    seed_condo("stats-tx", units=1)
+    db.session.execute(db.delete(PlatformStat))
+    db.session.commit()
+
+    # Con escrituras pendientes solo cuenta: ni las confirma ni guarda un conteo sin confirmar
+    db.session.add(Unit(property_number="tx-1", name="Casa", condominium_id=1, created_by=1))
+    assert platform_stats.snapshot()['unidades_totales'] == 2
+    db.session.rollback()
+    assert Unit.query.filter_by(property_number="tx-1").count() == 0
+    assert _stored() == {}
+
+    # Sin escrituras propias reescribe platform_stats en su propia transacción
+    assert platform_stats.snapshot()['unidades_totales'] == 1
+    db.session.rollback()
+    assert _stored() == {key: _live()[key] for key in STAT_KEYS}
+
+
+def test_reports_and_api_read_the_summary(app, client, seed_condo):
+    seed_condo("stats-api", units=2)
+    master = User(email="master@stats.com", first_name="M", last_name="S", cedula="M-STATS", role="MASTER", status="active")
+    db.session.add(master)
+    db.session.commit()
+    client.set_cookie('access_token_cookie', create_access_token(identity=str(master.id)))
+
+    assert client.get('/master/reports').status_code == 200
+    assert set(_stored()) == set(STAT_KEYS)
+
+    data = client.get('/api/master/estadisticas').get_json()
+    assert data == {key: _live()[key] for key in ('total_condominios', 'total_usuarios', 'usuarios_pendientes', 'unidades_totales')}
+
+
+def test_cli_rebuild(app, seed_condo):
+    seed_condo("stats-cli", units=1)
+    db.session.execute(db.delete(PlatformStat))
+    db.session.commit()
+
+    result = app.test_cli_runner().invoke(args=['stats', 'rebuild'])
+    assert result.exit_code == 0
+    assert "unidades_totales: 1" in result.output
+    assert _stored()['unidades_totales'] == 1
@@ -0,0 +1,72 @@
+import os
+import threading
+import time
+from collections import Counter
+from flask_jwt_extended import create_access_token
+from app import db
+from app.models import User
+from app.profiling import SamplingProfiler, render_flamegraph, collapsed_text
+
+
+def _login(client, role):
+    user = User(email=f"{role.lower()}@profile.com", first_name="P", last_name=role, cedula=f"P-{role}",
+                role=role, status="active")
+    db.session.add(user)
+    db.session.commit()
+    client.set_cookie('access_token_cookie', create_access_token(identity=str(user.id)))
+    return user
+
+
+def test_master_can_profile_a_request(app, client, tmp_path):
+    app.config.update(PROFILES_DIR=str(tmp_path), PROFILER_INTERVAL_MS=1)
+    _login(client, 'MASTER')
+
+    response = client.get('/master/usuarios?_profile=1')
+    assert response.status_code == 200
+    profile_id = response.headers['X-Profile-Id']
+    for ext in ('collapsed', 'svg', 'json'):
+        assert os.path.exists(tmp_path / f"{profile_id}.{ext}")
+
+    listing = client.get('/master/perfiles')
+    assert listing.status_code == 200
+    assert profile_id.encode() in listing.data
+    assert b'/master/usuarios' in listing.data
+
+    svg = client.get(f'/master/perfiles/{profile_id}.svg')
+    assert svg.status_code == 200
+    assert svg.mimetype == 'image/svg+xml'
+    assert client.get('/master/perfiles/..%2Fsecret.svg').status_code == 404
+
+
+def test_profile_flag_ignored_for_non_master(app, client, tmp_path):
+    app.config['PROFILES_DIR'] = str(tmp_path)
+    _login(client, 'USER')
+
+    response = client.get('/dashboard', headers={'X-Profile': '1'})
+    assert 'X-Profile-Id' not in response.headers
+    assert os.listdir(tmp_path) == []
+
+
+def test_sampling_profiler_captures_busy_function():
+    def busy_loop():
+        deadline = time.perf_counter() + 0.1
+        while time.perf_counter() < deadline:
+            pass
+
+    profiler = SamplingProfiler(threading.get_ident(), interval=0.002)
+    profiler.start()
+    busy_loop()
+    profiler.stop()
+
+    assert profiler.samples > 0
+    assert any(stack.endswith('test_profiling:busy_loop') for stack in profiler.stacks)
+
+
+def test_flamegraph_rendering():
+    stacks = Counter({'run:main;views:index;db:query': 3, 'run:main;views:index;jinja:<render>': 1})
+    assert collapsed_text(stacks).splitlines()[0] == 'run:main;views:index;db:query 3'
+
+    svg = render_flamegraph(stacks, 'GET /x')
+    assert svg.startswith('<svg')
+    assert 'views:index (4 muestras, 100.0%)' in svg
+    assert 'jinja:&lt;render&gt;' in svg
@@ -0,0 +1,52 @@
+from flask_jwt_extended import create_access_token
+from app import db
+from app.models import User
+from app.query_counter import QueryStats, statement_shape
+from app.services.tenant_service import tenant_resolver
+
+
+def test_admin_panel_query_count_is_independent_of_units(client, query_budget, seed_condo):
+    """El panel del administrador no puede crecer en queries con el número de unidades/residentes."""
+    tenant_resolver.clear()
+    counts = []
+    for slug, units in (("budget-small", 3), ("budget-large", 40)):
+        admin = seed_condo(slug, units)
+        client.set_cookie('access_token_cookie', create_access_token(identity=str(admin.id)))
+        response = client.get(f'/{slug}/admin/panel')
+        assert response.status_code == 200
+        counts.append(query_budget.for_endpoint('admin.admin_condominio_panel')[-1].count)
+
+    assert counts[0] == counts[1]
+
+
+def test_export_admins_is_not_n_plus_one(app, client, query_budget, seed_condo):
+    master = User(email="master@budget.com", first_name="Master", last_name="User", cedula="M-1",
+                  role="MASTER", status="active")
+    db.session.add(master)
+    db.session.commit()
+    for n in range(8):
+        seed_condo(f"export-{n}", units=0)
+
+    client.set_cookie('access_token_cookie', create_access_token(identity=str(master.id)))
+    response = client.post('/master/reports', data={'action': 'export_admins'})
+    assert response.status_code == 200
+    assert response.data.count(b'admin@export-') == 8
+
+    stats = query_budget.for_endpoint('master.reports')[-1]
+    assert stats.repeated(app.config['QUERY_N_PLUS_ONE_THRESHOLD']) == {}
+
+
+def test_repeated_statement_shapes_are_flagged():
+    stats = QueryStats()
+    for n in range(6):
+        stats.record("SELECT * FROM condominiums WHERE admin_user_id = ?", 0.1)
+    stats.record("SELECT * FROM users WHERE id IN (?, ?, ?)", 0.1)
+    stats.record("SELECT * FROM users  WHERE id IN (?, ?)", 0.1)
+
+    assert stats.count == 8
+    assert stats.repeated(5) == {"SELECT * FROM condominiums WHERE admin_user_id = ?": 6}
+    assert statement_shape("SELECT * FROM users WHERE id IN (?, ?, ?)") == "SELECT * FROM users WHERE id IN (?)"
+    assert stats.repeated(2) == {
+        "SELECT * FROM condominiums WHERE admin_user_id = ?": 6,
+        "SELECT * FROM users WHERE id IN (?)": 2,
+    }
@@ -0,0 +1,122 @@
+import os
+import unittest
+from datetime import datetime, timedelta, date
+from unittest.mock import patch
+from sqlalchemy import insert, select
+from config import Config
+from app import create_app, db
+from app.models import Condominium, User, Payment, Document, ResidentSignature, UserSpecialRole, PettyCashTransaction
+from app.utils.query_plans import HOT_QUERIES, check_query_plans
+
+TEST_POSTGRES_URL = os.getenv('TEST_POSTGRES_URL')
+
+TENANTS = 5
+USERS = 2_000
+PAYMENTS = 5_000
+DOCUMENTS = 2_000
+SIGNATURES = 3_000
+PETTY_CASH = 3_000
+
+
+class QueryPlanScenarios:
+    """Siembra una base mediana y verifica que ninguna consulta caliente recorra tablas completas."""
+    database_uri = None
+
+    def setUp(self):
+        if self.database_uri:
+            with patch.object(Config, 'SQLALCHEMY_DATABASE_URI', self.database_uri):
+                self.app = create_app()
+        else:
+            self.app = create_app()
+        self.app.config['TESTING'] = True
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.drop_all()
+        db.create_all()
+        self.params = self.seed()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def seed(self):
+        condo_ids = [
+            db.session.execute(insert(Condominium).values(
+                name=f"Condo {i}", subdomain=f"plan-{i}", main_street="A", cross_street="B", city="Quito"
+            )).inserted_primary_key[0]
+            for i in range(TENANTS)
+        ]
+        db.session.execute(insert(User), [
+            {'email': f"u{n}@plan.com", 'first_name': "U", 'last_name': str(n), 'cedula': f"C{n}",
+             'status': ('active', 'pending', 'inactive')[n % 3], 'condominium_id': condo_ids[n % TENANTS]}
+            for n in range(USERS)
+        ])
+        user_ids = db.session.execute(select(User.id).order_by(User.id)).scalars().all()
+
+        base = datetime(2025, 1, 1)
+        db.session.execute(insert(Payment), [
+            {'amount': 10, 'amount_with_tax': 10, 'status': ('APPROVED', 'PENDING', 'PENDING_REVIEW')[n % 3],
+             'client_transaction_id': f"plan-{n}", 'user_id': user_ids[n % USERS],
+             'condominium_id': condo_ids[n % TENANTS], 'created_at': base + timedelta(minutes=n)}
+            for n in range(PAYMENTS)
+        ])
+        db.session.execute(insert(Document), [
+            {'title': f"Doc {n}", 'content': "...", 'status': ('draft', 'sent', 'signed')[n % 3],
+             'created_by_id': user_ids[0], 'condominium_id': condo_ids[n % TENANTS],
+             'created_at': base + timedelta(hours=n)}
+            for n in range(DOCUMENTS)
+        ])
+        document_id = db.session.execute(select(Document.id).limit(1)).scalar()
+        db.session.execute(insert(ResidentSignature), [
+            {'document_id': document_id + n % DOCUMENTS, 'full_name': "Residente", 'cedula': f"R{n}"}
+            for n in range(SIGNATURES)
+        ])
+        db.session.execute(insert(PettyCashTransaction), [
+            {'description': "Mov", 'amount': (-5, 20)[n % 2], 'category': 'OTROS',
+             'condominium_id': condo_ids[n % TENANTS], 'transaction_date': base + timedelta(hours=n)}
+            for n in range(PETTY_CASH)
+        ])
+        db.session.execute(insert(UserSpecialRole), [
+            {'user_id': user_ids[n], 'condominium_id': condo_ids[n % TENANTS], 'role': 'PRESIDENTE',
+             'assigned_by': user_ids[0], 'start_date': date(2025, 1, 1), 'is_active': n % 2 == 0}
+            for n in range(USERS)
+        ])
+        db.session.commit()
+
+        return {
+            'condominium_id': condo_ids[0], 'user_id': user_ids[0],
+            'document_id': document_id, 'cedula': "R0",
+        }
+
+    def test_hot_queries_use_indexes(self):
+        max_rows = self.app.config['QUERY_PLAN_MAX_SEQSCAN_ROWS']
+        with db.engine.connect() as connection:
+            issues = check_query_plans(connection, self.params, max_rows)
+        self.assertEqual(issues, [], f"Planes degradados a recorrido secuencial: {issues}")
+
+    def test_unindexed_query_is_reported(self):
+        """Control negativo: un filtro sin índice debe aparecer como recorrido secuencial"""
+        queries = {'payments.by_description': lambda p: select(Payment).where(Payment.description == 'x')}
+        with db.engine.connect() as connection:
+            issues = check_query_plans(connection, self.params, max_rows=1000, queries=queries)
+        self.assertEqual([(i['query'], i['table']) for i in issues], [('payments.by_description', 'payments')])
+
+    def test_registry_covers_hot_routes(self):
+        for name in ('admin.finanzas.pending', 'admin.panel.pending_users',
+                     'documents.public_signature.exists', 'user.dashboard.new_docs',
+                     'documents.index.active_role'):
+            self.assertIn(name, HOT_QUERIES)
+
+
+class TestQueryPlans(QueryPlanScenarios, unittest.TestCase):
+    """SQLite local."""
+
+
+@unittest.skipUnless(TEST_POSTGRES_URL, "TEST_POSTGRES_URL no configurado")
+class TestQueryPlansPostgres(QueryPlanScenarios, unittest.TestCase):
+    database_uri = TEST_POSTGRES_URL
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from app import db
+from app.models import Condominium, Payment, PaymentCallbackAttempt
+from app.services.payment_service import PaymentService
+from app.services.reconciliation_service import RateLimiter, ReconciliationService
+
+OLD = datetime.utcnow() - timedelta(hours=2)
+
+
+def _tenant(seed_condo, slug, token):
+    admin = seed_condo(slug, units=0)
+    condo = Condominium.query.get(admin.condominium_id)
+    condo.payment_config = {'token': token} if token else {}
+    db.session.commit()
+    return admin
+
+
+def _payment(admin, payphone_id, status='PENDING', created_at=OLD):
+    payment = Payment(amount=10, amount_with_tax=10, status=status, payphone_transaction_id=str(payphone_id),
+                      client_transaction_id=f"rec-{payphone_id}", user_id=admin.id,
+                      condominium_id=admin.condominium_id, created_at=created_at)
+    db.session.add(payment)
+    return payment
+
+
+def test_rate_limiter_spaces_calls():
+    limiter = RateLimiter(rate=20)
+    started = time.monotonic()
+    for _ in range(5):
+        limiter.wait()
+    assert time.monotonic() - started >= 0.2 - 0.01
+    unlimited = RateLimiter(rate=0)
+    started = time.monotonic()
+    for _ in range(50):
+        unlimited.wait()
+    assert time.monotonic() - started < 0.05
+
+
+def test_reconcile_command_end_to_end(app, payphone_stub, seed_condo):
+    payphone_stub.delay = 0.02
+    alpha = _tenant(seed_condo, "rec-alpha", "token-alpha")
+    beta = _tenant(seed_condo, "rec-beta", "token-beta")
+    no_token = _tenant(seed_condo, "rec-sin-token", None)
+
+    for payphone_id in (101, 102, 103):
+        _payment(alpha, payphone_id)
+    for payphone_id in (201, 202, 203):
+        _payment(beta, payphone_id)
+    _payment(alpha, 104, created_at=datetime.utcnow()) # reciente: el usuario aún puede volver
+    _payment(beta, 204, status='APPROVED')
+    _payment(no_token, 301)
+    db.session.commit()
+    payphone_stub.statuses.update({102: 'Canceled', 103: 'Pending', 202: 'Rejected'})
+    payphone_stub.failing.add(203)
+
+    result = app.test_cli_runner().invoke(args=['payments', 'reconcile', '--workers', '4', '--rate', '10',
+                                                '--batch-size', '2'])
+    assert result.exit_code == 0, result.output
+    assert "7/7 pagos" in result.output
+    assert "Actualizados: APPROVED: 2, CANCELED: 1, REJECTED: 1. Sin cambios: 1. Omitidos: 1. Errores: 1." \
+        in result.output
+    assert "pagos/s" in result.output
+
+    # Cada condominio consultó con su propio token, solo por sus pagos abandonados
+    # (sin reintentos del cliente HTTP: el 502 de 203 es una sola consulta)
+    by_token = defaultdict(list)
+    for token, payphone_id, at in payphone_stub.requests:
+        by_token[token].append((at, payphone_id))
+    assert {token: sorted(i for _, i in calls) for token, calls in by_token.items()} == {
+        'token-alpha': [101, 102, 103], 'token-beta': [201, 202, 203]}
+    # Límite por condominio: 10 consultas/s => al menos ~0.1s entre consultas del mismo token
+    for calls in by_token.values():
+        instants = sorted(at for at, _ in calls)
+        assert all(later - earlier >= 0.09 for earlier, later in zip(instants, instants[1:]))
+
+    db.session.expire_all()
+    statuses = {p.payphone_transaction_id: p.status for p in Payment.query.filter(Payment.client_transaction_id.like('rec-%'))}
+    assert statuses == {'101': 'APPROVED', '102': 'CANCELED', '103': 'PENDING', '104': 'PENDING',
+                        '201': 'APPROVED', '202': 'REJECTED', '203': 'PENDING', '204': 'APPROVED', '301': 'PENDING'}
+    attempts = sorted((a.payphone_id, a.outcome) for a in PaymentCallbackAttempt.query)
+    assert attempts == [('101', 'RECONCILED'), ('102', 'RECONCILED'), ('103', 'RECONCILED'),
+                        ('201', 'RECONCILED'), ('202', 'RECONCILED'), ('203', 'ERROR')]
+
+    # Segunda corrida: solo quedan los que PayPhone no cerró
+    payphone_stub.requests.clear()
+    payphone_stub.failing.clear()
+    result = app.test_cli_runner().invoke(args=['payments', 'reconcile', '--rate', '0'])
+    assert result.exit_code == 0, result.output
+    assert sorted(i for _, i, _ in payphone_stub.requests) == [103, 203]
+    assert Payment.query.filter_by(payphone_transaction_id='203').first().status == 'APPROVED'
+
+
+def test_stuck_confirmations_are_reclaimed(app, payphone_stub, seed_condo):
+    payphone_stub.delay = 0
+    admin = _tenant(seed_condo, "rec-stuck", "token-stuck")
+    stuck = _payment(admin, 401, status='CONFIRMING')
+    stuck.updated_at = OLD # el proceso que lo confirmaba se cayó
+    _payment(admin, 402, status='CONFIRMING') # un callback lo está confirmando ahora
+    _payment(admin, 403)
+    db.session.commit()
+    payphone_stub.statuses[403] = 'Pending'
+
+    report = ReconciliationService.reconcile(rate=0)
+    assert sorted(i for _, i, _ in payphone_stub.requests) == [401, 403]
+    assert dict(report.updated) == {'APPROVED': 1} and report.unchanged == 1
+    db.session.expire_all()
+    statuses = {p.payphone_transaction_id: p.status for p in Payment.query.filter_by(condominium_id=admin.condominium_id)}
+    # 403 sigue abierto en PayPhone: se libera el reclamo para la próxima corrida o el callback
+    assert statuses == {'401': 'APPROVED', '402': 'CONFIRMING', '403': 'PENDING'}
+
+
+def test_payment_claimed_by_a_callback_is_not_confirmed_twice(app, payphone_stub, seed_condo, monkeypatch):
+    payphone_stub.delay = 0
+    admin = _tenant(seed_condo, "rec-race", "token-race")
+    _payment(admin, 501)
+    db.session.commit()
+    stale = ReconciliationService.stale_payments
+    # El callback llega entre la búsqueda y el envío al pool
+    monkeypatch.setattr(ReconciliationService, 'stale_payments', staticmethod(lambda *args, **kwargs: [
+        payment for payment in stale(*args, **kwargs) if PaymentService.claim_confirmation(payment.id)]))
+
+    report = ReconciliationService.reconcile(rate=0)
+    assert payphone_stub.requests == [] and report.skipped == 1
+    assert Payment.query.filter_by(payphone_transaction_id='501').first().status == 'CONFIRMING'
@@ -0,0 +1,105 @@
+import csv
+import io
+from decimal import Decimal
+from flask_jwt_extended import create_access_token
+from app import db
+from app.models import User, Condominium, PettyCashTransaction
+from sqlalchemy import bindparam, func
+from app.services.report_definitions import ADMINS_BY_CONDOMINIUM, PLATFORM_KPIS
+from app.services.report_engine import Column, Report
+
+
+def _login_master(client, email="master@reports.com"):
+    master = User(email=email, first_name="Master", last_name="Reports", cedula=email,
+                  role="MASTER", status="active")
+    db.session.add(master)
+    db.session.commit()
+    client.set_cookie('access_token_cookie', create_access_token(identity=str(master.id)))
+    return master
+
+
+def test_platform_kpis_compile_to_a_single_statement(app, client, query_budget, seed_condo):
+    for n in range(3):
+        seed_condo(f"kpi-{n}", units=2)
+    Condominium.query.filter_by(subdomain="kpi-2").update({'environment': 'internal'})
+    db.session.commit()
+
+    stats = PLATFORM_KPIS.one()
+    assert stats['total_condos'] == 2
+    assert stats['active_condos'] == 2
+    # Admins de condominios de producción (los residentes no tienen tenant)
+    assert stats['total_users'] == 2
+
+    _login_master(client)
+    response = client.get('/master/reports')
+    assert response.status_code == 200
+    count = query_budget.for_endpoint('master.reports')[-1].count
+
+    # Más condominios no agregan consultas al panel
+    for n in range(3, 8):
+        seed_condo(f"kpi-{n}", units=1)
+    client.get('/master/reports')
+    assert query_budget.for_endpoint('master.reports')[-1].count == count
+
+
+def test_admins_report_lists_unassigned_admins(app, client, seed_condo):
+    seed_condo("rep-admins", units=0)
+    db.session.add(User(email="libre@admins.com", first_name="Sin", last_name="Condo", cedula="LIBRE-1",
+                        role="ADMIN", status="active"))
+    db.session.commit()
+
+    records = {r['email']: r for r in ADMINS_BY_CONDOMINIUM.records()}
+    assert records["admin@rep-admins.com"]['condominium'] == "Condo rep-admins"
+    assert records["libre@admins.com"]['condominium'] == "Sin Asignar"
+    assert records["libre@admins.com"]['ruc'] == "N/A"
+    assert records["libre@admins.com"]['name'] == "Sin Condo"
+
+    _login_master(client)
+    response = client.post('/master/reports', data={'action': 'export_admins'})
+    rows = list(csv.reader(io.StringIO(response.data.decode('utf-8-sig'))))
+    assert rows[0] == ADMINS_BY_CONDOMINIUM.header
+    assert ["Sin Asignar", "N/A", "Sin Condo", "libre@admins.com", "", "LIBRE-1"] in rows
+
+
+def test_master_report_view_formats(app, client, seed_condo):
+    seed_condo("rep-view", units=0)
+    _login_master(client)
+
+    data = client.get('/master/reportes/condominios.json').get_json()
+    assert data['report'] == 'condominios'
+    assert [c['name'] for c in data['columns']][:3] == ['id', 'legal_name', 'ruc']
+    assert data['rows'][0]['admin_name'] == "Admin rep-view"
+
+    html = client.get('/master/reportes/administradores.html')
+    assert html.status_code == 200
+    assert b'admin@rep-view.com' in html.data
+
+    assert client.get('/master/reportes/condominios.csv').status_code == 200
+    assert client.get('/master/reportes/condominios.xml').status_code == 404
+    assert client.get('/master/reportes/inexistente.json').status_code == 404
+
+
+def test_report_parameters_are_bound_at_execution(app, seed_condo):
+    report = Report(
+        name='caja_chica_total', title="Total de caja chica", source=PettyCashTransaction,
+        filters=(PettyCashTransaction.condominium_id == bindparam('condominium_id'),),
+        columns=(
+            Column('balance', "Saldo", func.coalesce(func.sum(PettyCashTransaction.amount), 0)),
+            Column('transactions', "Movimientos", func.count(PettyCashTransaction.id)),
+        ),
+    )
+    admin = seed_condo("rep-caja", units=0)
+    other = seed_condo("rep-caja-otro", units=0)
+    for amount in ('100.00', '-12.50', '-7.25'):
+        db.session.add(PettyCashTransaction(description="Mov", amount=Decimal(amount), category='OTROS',
+                                            condominium_id=admin.condominium_id, created_by=admin.id))
+    db.session.add(PettyCashTransaction(description="Otro", amount=Decimal('999'), category='OTROS',
+                                        condominium_id=other.condominium_id, created_by=other.id))
+    db.session.commit()
+
+    result = report.one(condominium_id=admin.condominium_id)
+    assert Decimal(str(result['balance'])) == Decimal('80.25')
+    assert result['transactions'] == 3
+
+    empty = seed_condo("rep-caja-vacia", units=0)
+    assert report.one(condominium_id=empty.condominium_id)['balance'] == 0
@@ -0,0 +1,74 @@
+import time
+from flask_jwt_extended import create_access_token
+from app import db
+from app.models import User
+from app.services.tenant_service import tenant_resolver
+from app.timing import RequestTiming, timed
+
+
+def _metrics(header):
+    """'tenant;dur=1.0, db;dur=2.0;desc="3 queries"' -> {'tenant': 1.0, 'db': 2.0}"""
+    metrics = {}
+    for metric in header.split(', '):
+        name, dur = metric.split(';')[:2]
+        metrics[name] = float(dur.split('=')[1])
+    return metrics
+
+
+def test_server_timing_hidden_by_default(client):
+    response = client.get('/global/ingresar')
+    assert response.status_code == 200
+    assert 'Server-Timing' not in response.headers
+
+
+def test_server_timing_breakdown_for_admin_page(app, client, seed_condo):
+    app.config['SERVER_TIMING_ENABLED'] = True
+    tenant_resolver.clear()
+    admin = seed_condo("timing", units=3)
+    client.set_cookie('access_token_cookie', create_access_token(identity=str(admin.id)))
+
+    response = client.get('/timing/admin/panel')
+    assert response.status_code == 200
+
+    header = response.headers['Server-Timing']
+    metrics = _metrics(header)
+    assert list(metrics) == ['tenant', 'jwt', 'db', 'tpl', 'http', 'total']
+    for phase in ('tenant', 'jwt', 'db', 'tpl'):
+        assert metrics[phase] > 0, phase
+    assert metrics['http'] == 0
+    assert metrics['total'] >= metrics['tpl']
+    assert 'queries"' in header
+
+
+def test_server_timing_sent_to_master_users(client):
+    master = User(email="master@timing.com", first_name="Master", last_name="User", cedula="M-T",
+                  role="MASTER", status="active")
+    db.session.add(master)
+    db.session.commit()
+    client.set_cookie('access_token_cookie', create_access_token(identity=str(master.id)))
+
+    response = client.get('/master/reports')
+    assert response.status_code == 200
+    assert 'jwt;dur=' in response.headers['Server-Timing']
+
+
+def test_timed_accumulates_phase(app):
+    with app.test_request_context('/'):
+        app.preprocess_request()
+        from flask import g
+        for _ in range(2):
+            with timed('http'):
+                time.sleep(0.005)
+        assert g.request_timing.phases['http'] >= 10
+
+    # Fuera de un request no mide ni falla
+    with timed('http'):
+        pass
+
+
+def test_header_format():
+    timing = RequestTiming()
+    timing.add('db', 1.234)
+    header = timing.header(db_queries=3)
+    assert header.startswith('tenant;dur=0.0, jwt;dur=0.0, db;dur=1.2;desc="3 queries", tpl;dur=0.0, http;dur=0.0')
+    assert header.split(', ')[-1].startswith('total;dur=')
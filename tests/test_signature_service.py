@@ -9,7 +9,7 @@ class TestNexxitOneshotProvider(unittest.TestCase):
         self.api_key = "test_key"
         self.service = NexxitOneshotProvider(self.api_key)
         
-    @patch('app.utils.signature_service.requests.post')
+    @patch('app.http_client.requests.Session.request')
     @patch('builtins.open', new_callable=unittest.mock.mock_open, read_data=b"pdf_content")
     def test_create_flow_success(self, mock_open, mock_post):
         # Mock user
@@ -32,8 +32,9 @@ class TestNexxitOneshotProvider(unittest.TestCase):
         
         self.assertEqual(response['id'], "flow_123")
         mock_post.assert_called_once()
+        self.assertEqual(mock_post.call_args.args[:2], ('POST', "https://wfdev.nexxit.dev/wf/flow"))
         
-    @patch('app.utils.signature_service.requests.get')
+    @patch('app.http_client.requests.Session.request')
     def test_get_flow_details(self, mock_get):
         mock_response = MagicMock()
         mock_response.status_code = 200
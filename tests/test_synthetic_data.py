@@ -0,0 +1,44 @@
+import unittest
+from sqlalchemy import create_engine, select
+from app import db
+from app.models import User, Payment, ResidentSignature
+from benchmarks.synthetic_data import SyntheticConfig, generate
+
+CONFIG = dict(condos=3, units_per_condo=4, residents_per_unit=2, months=2,
+              documents_per_condo=2, signatures_per_document=3, batch_size=7)
+
+
+class TestSyntheticData(unittest.TestCase):
+    def run_generator(self, seed):
+        engine = create_engine('sqlite://')
+        db.metadata.create_all(engine)
+        with engine.begin() as connection:
+            counts = generate(connection, SyntheticConfig(seed=seed, **CONFIG))
+            snapshot = {
+                model.__tablename__: connection.execute(select(model.__table__).order_by(model.id)).all()
+                for model in (User, Payment, ResidentSignature)
+            }
+        engine.dispose()
+        return counts, snapshot
+
+    def test_counts_follow_parameters(self):
+        counts, _ = self.run_generator(seed=1)
+        self.assertEqual(counts['condominiums'], 3)
+        self.assertEqual(counts['users'], 3 + 3 * 4 * 2)
+        self.assertEqual(counts['units'], 12)
+        self.assertEqual(counts['payments'], 12 * 2)
+        self.assertEqual(counts['documents'], 6)
+
+    def test_same_seed_produces_same_rows(self):
+        _, first = self.run_generator(seed=7)
+        _, second = self.run_generator(seed=7)
+        self.assertEqual(first, second)
+
+    def test_different_seed_changes_data(self):
+        _, first = self.run_generator(seed=7)
+        _, other = self.run_generator(seed=8)
+        self.assertNotEqual(first['payments'], other['payments'])
+
+
+if __name__ == '__main__':
+    unittest.main()
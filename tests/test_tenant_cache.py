@@ -0,0 +1,72 @@
+import unittest
+from unittest.mock import patch
+from app import create_app, db
+from app.models import Condominium
+from app.services.tenant_service import tenant_resolver, TenantSnapshot, CurrentTenant
+
+class TestTenantCache(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app()
+        self.app.config['TESTING'] = True
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        tenant_resolver.clear()
+
+        self.condo = Condominium(
+            name="Tenant 1", subdomain="t1", status="ACTIVO", environment="production",
+            main_street="Main St", cross_street="Cross St", city="Quito"
+        )
+        db.session.add(self.condo)
+        db.session.commit()
+
+    def tearDown(self):
+        tenant_resolver.clear()
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_resolve_counts_hits_and_misses(self):
+        before = tenant_resolver.stats()
+        first = tenant_resolver.resolve('t1')
+        second = tenant_resolver.resolve('t1')
+
+        self.assertIsInstance(first, TenantSnapshot)
+        self.assertIs(first, second)
+        self.assertEqual(first.id, self.condo.id)
+        stats = tenant_resolver.stats()
+        self.assertEqual(stats['misses'] - before['misses'], 1)
+        self.assertEqual(stats['hits'] - before['hits'], 1)
+
+    def test_unknown_slug_is_not_cached(self):
+        self.assertIsNone(tenant_resolver.resolve('no-existe'))
+        self.assertEqual(tenant_resolver.stats()['size'], 0)
+
+    def test_invalidate_reloads_changes(self):
+        tenant_resolver.resolve('t1')
+        self.condo.status = 'INACTIVO'
+        db.session.commit()
+
+        # Sin invalidar se sigue sirviendo el snapshot cacheado
+        self.assertEqual(tenant_resolver.resolve('t1').status, 'ACTIVO')
+
+        tenant_resolver.invalidate('t1')
+        self.assertEqual(tenant_resolver.resolve('t1').status, 'INACTIVO')
+
+    def test_entries_expire_after_ttl(self):
+        self.app.config['TENANT_CACHE_TTL'] = 10
+        with patch('app.tiered_cache.time.time', return_value=1000.0):
+            tenant_resolver.resolve('t1')
+        with patch('app.tiered_cache.time.time', return_value=1011.0):
+            misses = tenant_resolver.stats()['misses']
+            tenant_resolver.resolve('t1')
+            self.assertEqual(tenant_resolver.stats()['misses'], misses + 1)
+
+    def test_current_tenant_loads_full_row_lazily(self):
+        current = CurrentTenant(tenant_resolver.resolve('t1'))
+        self.assertEqual(current.subdomain, 't1')
+        self.assertEqual(current.name, "Tenant 1")
+        self.assertIs(current.instance, db.session.get(Condominium, self.condo.id))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,167 @@
+from datetime import datetime, timedelta
+from flask import g
+from flask_jwt_extended import create_access_token
+from app import db
+from app.models import Condominium, User, Unit, Document, ResidentSignature, TenantCounter
+from app.services.tenant_counters import FAMILIES, tenant_counters
+
+
+def _stored(condominium_id):
+    return dict(db.session.execute(
+        db.select(TenantCounter.name, TenantCounter.value).where(TenantCounter.condominium_id == condominium_id)
+    ).all())
+
+
+def _nonzero(counts):
+    # Un desglose que vuelve a 0 conserva su fila; el recálculo no la crea
+    return {name: value for name, value in counts.items() if value or ':' not in name}
+
+
+def test_counters_are_maintained_on_write(app, client, monkeypatch, seed_condo):
+    admin = seed_condo("tc-a", units=4)
+    condo_id = admin.condominium_id
+    other = seed_condo("tc-b", units=1)
+    tenant_counters.rebuild(condo_id)
+    tenant_counters.rebuild(other.condominium_id)
+    monkeypatch.setattr(tenant_counters, 'rebuild', lambda condominium_id: (_ for _ in ()).throw(
+        AssertionError("tenant_counters se reconstruyó")))
+
+    db.session.add(Unit(property_number="tc-a-extra", name="Casa extra", condominium_id=condo_id, created_by=admin.id))
+    pending = User.query.filter_by(email="r0@tc-a.com").first()
+    pending.status = 'active'
+    doc = Document(title="Circular", content="x", created_by_id=admin.id, condominium_id=condo_id,
+                   collect_signatures_from_residents=True, public_signature_link="tc-a-link")
+    db.session.add(doc)
+    db.session.commit()
+
+    doc.status = 'signed'
+    db.session.commit()
+
+    for n in range(3):
+        response = client.post('/documentos/firmar/tc-a-link', data={'name': f"Vecino {n}", 'cedula': f"TC-{n}"})
+        assert response.status_code == 302
+
+    counts = tenant_counters.get(condo_id, FAMILIES + ('documents:signed', 'documents:draft', f"signatures:{doc.id}"))
+    assert _nonzero(_stored(condo_id)) == tenant_counters.compute(condo_id)
+    assert counts['units'] == 5
+    assert counts['residents_active'] == 4
+    assert counts['residents_pending'] == 1
+    assert counts['documents'] == 1 and counts['documents:signed'] == 1 and counts.get('documents:draft', 0) == 0
+    assert counts[f"signatures:{doc.id}"] == 3
+    assert tenant_counters.published_since(condo_id, days=7) == 1
+    # El otro condominio no cambia
+    assert tenant_counters.get(other.condominium_id)['units'] == 1
+
+
+def test_deletes_and_rollback(app, seed_condo):
+    admin = seed_condo("tc-del", units=2)
+    condo_id = admin.condominium_id
+    tenant_counters.rebuild(condo_id)
+
+    doc = Document(title="Acta", content="x", created_by_id=admin.id, condominium_id=condo_id, status='sent')
+    db.session.add(doc)
+    db.session.commit()
+    db.session.add(ResidentSignature(document_id=doc.id, full_name="V", cedula="TC-DEL"))
+    db.session.commit()
+    db.session.delete(ResidentSignature.query.filter_by(cedula="TC-DEL").first())
+    db.session.commit()
+    assert _stored(condo_id)[f"signatures:{doc.id}"] == 0
+
+    db.session.add(Unit(property_number="tc-del-x", name="X", condominium_id=condo_id, created_by=admin.id))
+    db.session.flush()
+    db.session.rollback()
+
+    assert _stored(condo_id)['units'] == 2
+    assert tenant_counters.get(condo_id)['units'] == 2
+    assert _nonzero(_stored(condo_id)) == tenant_counters.compute(condo_id)
+
+
+def test_published_window_uses_creation_day(app, seed_condo):
+    admin = seed_condo("tc-days", units=0)
+    condo_id = admin.condominium_id
+    now = datetime.utcnow()
+    for days, status in ((0, 'signed'), (3, 'sent'), (10, 'signed'), (1, 'draft')):
+        db.session.add(Document(title=f"Doc {days}", content="x", created_by_id=admin.id,
+                                condominium_id=condo_id, status=status, created_at=now - timedelta(days=days)))
+    db.session.commit()
+
+    counts = tenant_counters.get(condo_id)
+    assert counts['documents_published'] == 3
+    assert tenant_counters.published_since(condo_id, days=7) == 2
+
+
+def test_bulk_update_invalidates_and_pages_read_counters(app, client, seed_condo):
+    admin = seed_condo("tc-bulk", units=3)
+    condo_id = admin.condominium_id
+    tenant_counters.rebuild(condo_id)
+
+    User.query.filter_by(condominium_id=condo_id, status='pending').update({'status': 'active'})
+    db.session.commit()
+    assert _stored(condo_id)['residents_active'] is None
+
+    master = User(email="master@tc.com", first_name="M", last_name="TC", cedula="M-TC", role="MASTER", status="active")
+    db.session.add(master)
+    db.session.commit()
+    client.set_cookie('access_token_cookie', create_access_token(identity=str(master.id)))
+    response = client.get(f'/supervise/{condo_id}')
+    assert response.status_code == 200
+    # El administrador también pertenece al condominio
+    assert _stored(condo_id)['residents_active'] == 4
+    assert _stored(condo_id)['residents_pending'] == 0
+
+
+def test_bulk_update_in_a_tenant_invalidates_only_that_tenant(app, seed_condo):
+    admin = seed_condo("tc-scope-a", units=2)
+    other = seed_condo("tc-scope-b", units=2)
+    tenant_counters.rebuild(admin.condominium_id)
+    tenant_counters.rebuild(other.condominium_id)
+
+    g.condominium = Condominium.query.get(admin.condominium_id)
+    try:
+        # Sin filtro explícito: el criterio de tenant limita el UPDATE al condominio actual
+        User.query.filter_by(status='pending').update({'status': 'active'})
+        db.session.commit()
+    finally:
+        g.condominium = None
+
+    assert _stored(admin.condominium_id)['residents_active'] is None
+    assert User.query.filter_by(condominium_id=other.condominium_id, status='pending').count() == 1
+    assert _stored(other.condominium_id)['residents_pending'] == 1
+    assert _nonzero(_stored(other.condominium_id)) == tenant_counters.compute(other.condominium_id)
+
+
+def test_reads_fetch_only_the_requested_rows(app, seed_condo):
+    admin = seed_condo("tc-rows", units=1)
+    condo_id = admin.condominium_id
+    docs = [Document(title=f"Doc {n}", content="x", created_by_id=admin.id, condominium_id=condo_id, status='sent')
+            for n in range(3)]
+    db.session.add_all(docs)
+    db.session.commit()
+    db.session.add(ResidentSignature(document_id=docs[0].id, full_name="V", cedula="TC-ROWS"))
+    db.session.commit()
+
+    assert set(tenant_counters.get(condo_id)) == set(FAMILIES)
+    assert tenant_counters.get(condo_id, (f"signatures:{docs[0].id}", f"signatures:{docs[1].id}")) == {
+        f"signatures:{docs[0].id}": 1}
+    assert tenant_counters.get(condo_id, ()) == {}
+
+
+def test_rebuild_keeps_the_callers_transaction(app, seed_condo):
+    admin = seed_condo("tc-tx", units=2)
+    condo_id = admin.condominium_id
+    tenant_counters.rebuild(condo_id)
+    Unit.query.filter_by(condominium_id=condo_id).update({'name': "Renombrada"})
+    db.session.commit()
+    assert _stored(condo_id)['units'] is None
+
+    # La lectura ve lo pendiente del request pero no lo confirma ni guarda un conteo sin confirmar
+    db.session.add(Unit(property_number="tc-tx-x", name="X", condominium_id=condo_id, created_by=admin.id))
+    assert tenant_counters.get(condo_id)['units'] == 3
+    db.session.rollback()
+    assert Unit.query.filter_by(property_number="tc-tx-x").count() == 0
+    assert _stored(condo_id)['units'] is None
+
+    # Sin escrituras propias recalcula en su propia transacción
+    assert tenant_counters.get(condo_id)['units'] == 2
+    db.session.rollback()
+    assert _stored(condo_id)['units'] == 2
@@ -0,0 +1,87 @@
+import unittest
+from cachelib import SimpleCache
+from app import create_app, db
+from app.models import CondominiumConfig
+from app.services.tenant_service import tenant_resolver
+from app.services.branding_service import branding_service, TenantBranding
+from app.tiered_cache import TieredCache
+
+
+class TestTieredCache(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app()
+        self.app.config['TESTING'] = True
+        self.shared = SimpleCache()
+        # Dos "workers" con su propio nivel local y el mismo backend compartido
+        self.worker_a = TieredCache()
+        self.worker_b = TieredCache()
+        for worker in (self.worker_a, self.worker_b):
+            worker.init_app(self.app, self.shared)
+
+    def test_shared_tier_serves_other_workers(self):
+        calls = []
+        load = lambda: calls.append(1) or {'value': 42}
+
+        self.assertEqual(self.worker_a.get_or_load('tenant:x', 'k', load, timeout=60), {'value': 42})
+        self.assertEqual(self.worker_b.get_or_load('tenant:x', 'k', load, timeout=60), {'value': 42})
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(self.worker_b.stats()['shared_hits'], 1)
+
+    def test_bump_invalidates_namespace_across_workers(self):
+        self.app.config['CACHE_VERSION_TTL'] = 0
+        self.worker_b.init_app(self.app, self.shared)
+        self.worker_a.get_or_load('tenant:x', 'a', lambda: 'old-a', timeout=60)
+        self.worker_b.get_or_load('tenant:x', 'b', lambda: 'old-b', timeout=60)
+        self.worker_b.get_or_load('tenant:y', 'a', lambda: 'other', timeout=60)
+
+        self.worker_a.bump('tenant:x')
+
+        self.assertEqual(self.worker_b.get_or_load('tenant:x', 'a', lambda: 'new-a', timeout=60), 'new-a')
+        self.assertEqual(self.worker_b.get_or_load('tenant:x', 'b', lambda: 'new-b', timeout=60), 'new-b')
+        self.assertEqual(self.worker_b.get_or_load('tenant:y', 'a', lambda: 'x', timeout=60), 'other')
+
+    def test_local_tier_is_bounded(self):
+        self.app.config['CACHE_LOCAL_MAXSIZE'] = 3
+        self.worker_a.init_app(self.app, self.shared)
+        for n in range(10):
+            self.worker_a.get_or_load('global', f'k{n}', lambda: n, timeout=60)
+        self.assertLessEqual(self.worker_a.stats()['local_size'], 3)
+
+    def test_none_is_not_stored_on_request(self):
+        calls = []
+        for _ in range(2):
+            self.worker_a.get_or_load('tenant:x', 'k', lambda: calls.append(1), timeout=60, cache_none=False)
+        self.assertEqual(len(calls), 2)
+
+
+class TestTenantConfigCache(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app()
+        self.app.config['TESTING'] = True
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        tenant_resolver.clear()
+        db.session.add(CondominiumConfig(tenant='t1', primary_color='#111111', commercial_name="Uno"))
+        db.session.commit()
+
+    def tearDown(self):
+        tenant_resolver.clear()
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_config_is_cached_until_tenant_is_invalidated(self):
+        config = branding_service.get('t1')
+        self.assertEqual(config, TenantBranding('t1', '#111111', None, "Uno"))
+
+        db.session.get(CondominiumConfig, 't1').primary_color = '#222222'
+        db.session.commit()
+        self.assertEqual(branding_service.get('t1').primary_color, '#111111')
+
+        tenant_resolver.invalidate('t1')
+        self.assertEqual(branding_service.get('t1').primary_color, '#222222')
+
+
+if __name__ == '__main__':
+    unittest.main()